@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+AI 日报静态资源
+页面共用的样式表按内容哈希命名写入 assets/，样式不变时文件名和内容都不变，
+浏览器和 CDN 可以长期缓存；样式变化时页面引用新文件名
+"""
+
+import hashlib
+import os
+import re
+
+from core import SITE_DIR, load_output_manifest, open_output
+
+ASSET_DIR = f"{SITE_DIR}/assets"
+
+# 分类页、归档页和每日存档共用的样式
+SITE_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+:root {
+    --bg-primary: #0a0a0b;
+    --bg-secondary: #141416;
+    --bg-card: #1c1c1f;
+    --bg-card-hover: #242428;
+    --text-primary: #f4f4f5;
+    --text-secondary: #a1a1aa;
+    --accent: #f97316;
+    --border: #27272a;
+}
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'PingFang SC', sans-serif;
+    background: var(--bg-primary);
+    color: var(--text-primary);
+    line-height: 1.6;
+    min-height: 100vh;
+}
+.nav-brand a { color: var(--text-primary); text-decoration: none; }
+.nav-logo { font-size: 1.5rem; font-weight: bold; }
+.container { max-width: 1200px; margin: 0 auto; padding: 20px; }
+.archive-list { display: grid; grid-template-columns: repeat(auto-fill, minmax(280px, 1fr)); gap: 16px; }
+.archive-item { background: var(--bg-card); padding: 20px; border-radius: 12px; }
+.archive-item h3 { margin-bottom: 8px; }
+.archive-item a { color: var(--accent); text-decoration: none; }
+.archive-categories { color: var(--text-secondary); font-size: 0.8rem; margin-top: 6px; }
+.search-box { margin-bottom: 24px; }
+.search-box input { width: 100%; padding: 12px; border-radius: 8px; border: 1px solid var(--border); background: var(--bg-card); color: var(--text-primary); font-size: 16px; }
+.category-header { margin: 32px 0 16px; }
+.back-link { color: var(--accent); text-decoration: none; margin-bottom: 16px; display: inline-block; }
+footer { text-align: center; padding: 40px 20px; color: var(--text-secondary); border-top: 1px solid var(--border); margin-top: 40px; }
+footer a { color: var(--accent); }
+.empty-state { text-align: center; padding: 60px 20px; color: var(--text-secondary); }
+.card-related { font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 12px; }
+.card-related a { color: var(--accent); text-decoration: none; margin-right: 8px; }
+"""
+
+# 主页样式
+MAIN_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+:root {
+    --bg-primary: #0a0a0b;
+    --bg-secondary: #141416;
+    --bg-card: #1c1c1f;
+    --bg-card-hover: #242428;
+    --text-primary: #f4f4f5;
+    --text-secondary: #a1a1aa;
+    --text-muted: #71717a;
+    --accent: #f97316;
+    --accent-hover: #fb923c;
+    --border: #27272a;
+    --category-news: #ef4444;
+    --category-tech: #3b82f6;
+    --category-products: #22c55e;
+    --category-funding: #eab308;
+    --category-people: #a855f7;
+    --category-opinions: #ec4899;
+    --category-tutorial: #14b8a6;
+    --category-fun: #f59e0b;
+}
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'PingFang SC', sans-serif;
+    background: var(--bg-primary);
+    color: var(--text-primary);
+    line-height: 1.6;
+}
+a { color: inherit; text-decoration: none; }
+
+.subscribe-bar {
+    background: linear-gradient(135deg, #1e1e22 0%, #27272d 100%);
+    border-bottom: 1px solid var(--border);
+    padding: 12px 24px;
+    text-align: center;
+}
+.subscribe-content {
+    max-width: 800px; margin: 0 auto;
+    display: flex; align-items: center; justify-content: center;
+    gap: 16px; flex-wrap: wrap;
+}
+.subscribe-text { color: var(--text-secondary); font-size: 0.9rem; }
+.subscribe-text strong { color: var(--accent); }
+
+.top-nav {
+    background: var(--bg-secondary);
+    border-bottom: 1px solid var(--border);
+    position: sticky; top: 0; z-index: 100;
+}
+.nav-container {
+    max-width: 1400px; margin: 0 auto; padding: 16px 24px;
+    display: flex; align-items: center; justify-content: space-between;
+    flex-wrap: wrap; gap: 16px;
+}
+.nav-brand { display: flex; align-items: center; gap: 16px; flex: 1; min-width: 300px; }
+.nav-logo { font-size: 1.5rem; font-weight: bold; }
+.nav-meta { display: flex; flex-direction: column; gap: 4px; }
+.nav-subtitle { color: var(--text-secondary); font-size: 0.85rem; }
+.nav-date { color: var(--text-muted); font-size: 0.8rem; }
+
+.nav-categories {
+    display: flex; gap: 8px; flex-wrap: wrap;
+}
+.nav-category-link {
+    padding: 8px 16px; border-radius: 20px;
+    background: var(--bg-card); color: var(--text-secondary);
+    font-size: 0.9rem; transition: all 0.2s;
+}
+.nav-category-link:hover { background: var(--bg-card-hover); color: var(--text-primary); }
+
+.main-layout {
+    max-width: 1400px; margin: 0 auto; padding: 24px;
+    display: grid; grid-template-columns: 200px 1fr; gap: 24px;
+}
+@media (max-width: 768px) {
+    .main-layout { grid-template-columns: 1fr; }
+    .sidebar { display: none; }
+}
+
+.sidebar { position: sticky; top: 80px; height: fit-content; }
+.sidebar-section { background: var(--bg-secondary); border-radius: 12px; padding: 16px; margin-bottom: 16px; }
+.sidebar-title { font-size: 0.9rem; color: var(--text-muted); margin-bottom: 12px; text-transform: uppercase; letter-spacing: 0.5px; }
+.category-list, .date-list { list-style: none; }
+.category-item, .date-item { margin-bottom: 8px; }
+.category-link, .date-link { display: block; padding: 8px 12px; border-radius: 8px; color: var(--text-secondary); font-size: 0.9rem; }
+.category-link:hover, .date-link:hover { background: var(--bg-card); color: var(--text-primary); }
+
+.content { display: flex; flex-direction: column; gap: 32px; }
+.category-section { scroll-margin-top: 100px; }
+.category-title { font-size: 1.3rem; margin-bottom: 16px; padding-bottom: 8px; border-bottom: 1px solid var(--border); }
+
+.card {
+    background: var(--bg-card); border-radius: 12px; padding: 20px;
+    margin-bottom: 16px; transition: transform 0.2s, box-shadow 0.2s;
+}
+.card:hover { transform: translateY(-2px); box-shadow: 0 8px 24px rgba(0,0,0,0.3); }
+.card-header { display: flex; align-items: center; gap: 8px; margin-bottom: 12px; }
+.card-favicon { width: 20px; height: 20px; border-radius: 4px; }
+.card-source { color: var(--text-secondary); font-size: 0.85rem; }
+.card-title { font-size: 1.1rem; margin-bottom: 8px; }
+.card-title a { color: var(--text-primary); }
+.card-title a:hover { color: var(--accent); }
+.card-summary { color: var(--text-secondary); font-size: 0.9rem; margin-bottom: 12px; }
+.card-footer { display: flex; justify-content: space-between; align-items: center; }
+.card-category { padding: 4px 12px; border-radius: 12px; font-size: 0.8rem; }
+.card-related { font-size: 0.85rem; color: var(--text-secondary); margin-bottom: 12px; }
+.card-related a { color: var(--accent); text-decoration: none; margin-right: 8px; }
+.card-chunk { min-height: 48px; }
+.load-more { padding: 10px 20px; border-radius: 8px; border: 1px solid var(--border); background: var(--bg-card); color: var(--text-primary); cursor: pointer; }
+.load-more:hover { border-color: var(--accent); }
+.category-news { background: rgba(239,68,68,0.2); color: #ef4444; }
+.category-tech { background: rgba(59,130,246,0.2); color: #3b82f6; }
+.category-products { background: rgba(34,197,94,0.2); color: #22c55e; }
+.category-funding { background: rgba(234,179,8,0.2); color: #eab308; }
+.category-people { background: rgba(168,85,247,0.2); color: #a855f7; }
+.category-opinions { background: rgba(236,72,153,0.2); color: #ec4899; }
+.category-tutorial { background: rgba(20,184,166,0.2); color: #14b8a6; }
+.category-fun { background: rgba(245,158,11,0.2); color: #f59e0b; }
+
+footer { text-align: center; padding: 40px 20px; color: var(--text-muted); border-top: 1px solid var(--border); margin-top: 40px; }
+footer a { color: var(--accent); }
+"""
+
+STYLESHEETS = {'site': SITE_CSS, 'main': MAIN_CSS}
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+
+def minify_css(css):
+    """去掉注释和多余空白（不改写属性值）"""
+    css = CSS_SPACE_RE.sub(' ', CSS_COMMENT_RE.sub('', css))
+    css = CSS_PUNCT_RE.sub(r'\1', css)
+    return css.replace(': ', ':').replace(';}', '}').strip()
+
+def fingerprint(name, text):
+    """带内容哈希的文件名 name.<hash>.css"""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]
+    return f"{name}.{digest}.css"
+
+def stylesheet_files(minify=True):
+    """{名称: (文件名, 内容)}，文件名带内容哈希"""
+    files = {}
+    for name, css in STYLESHEETS.items():
+        text = minify_css(css) if minify else css
+        files[name] = (fingerprint(name, text), text)
+    return files
+
+def stylesheet_hrefs(minify=True):
+    """页面引用的相对路径（相对站点根目录）"""
+    return {name: f"assets/{filename}" for name, (filename, _) in stylesheet_files(minify).items()}
+
+def prune_stylesheets(names, current):
+    """删除 names 这几种样式表中不在 current 里的旧版本"""
+    pattern = re.compile(rf"^({'|'.join(map(re.escape, names))})\.[0-9a-f]{{10}}\.css$")
+    for entry in os.scandir(ASSET_DIR):
+        if pattern.match(entry.name) and entry.name not in current:
+            os.remove(entry.path)
+            load_output_manifest().pop(os.path.relpath(entry.path, SITE_DIR), None)
+
+def write_stylesheets(minify=True, prune=False):
+    """写入带哈希的样式表（内容相同则不重写），返回写出的文件名
+
+    未重建的历史存档页仍引用旧版本，只有 prune 为真（全部页面都已重建）时才删除旧文件。
+    """
+    files = stylesheet_files(minify)
+    for filename, text in files.values():
+        with open_output(f"{ASSET_DIR}/{filename}") as out:
+            out.write(text)
+    current = {filename for filename, _ in files.values()}
+    if prune:
+        prune_stylesheets(files, current)
+    return sorted(current)
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+AI 日报性能基准
+render: 比较字符串拼接与流式写入两种页面渲染方式的吞吐量和峰值内存
+search: 分片倒排索引的体积和查询延迟
+cards: 卡片片段缓存对一天全部页面（主页、分类页、每日存档）渲染时间的影响
+pipeline: 用可复现的合成数据（N 天历史）在临时目录里跑完整生成流程，逐阶段计时
+ingest: 一次读入与流式读取搜索结果（以及整次构建）的峰值 RSS 随输入大小的变化
+related: 相关报道索引的全量计算吞吐量，以及新增一天时的增量计算耗时
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import assets
+import catalog
+import core
+import favicons
+import fragments
+import generate
+import generate_rss
+import related
+import search
+from core import CATEGORIES, BuildContext, Item, extract_domain, save_output_manifest
+from instrument import peak_rss_kb
+
+RENDER_SIZES = [100, 10_000, 100_000]
+SEARCH_SIZES = [10_000, 100_000]
+CARD_SIZES = [10_000]
+PIPELINE_DAYS = [365, 5 * 365]
+PIPELINE_ITEMS_PER_DAY = 60
+PIPELINE_END = datetime(2026, 1, 1, 8, 0)
+INGEST_SIZES = [10_000, 50_000, 200_000]
+# 整次构建要渲染全部卡片，只在这个条数以内跑
+INGEST_BUILD_LIMIT = 50_000
+RELATED_SIZES = [10_000, 100_000]
+RELATED_ITEMS_PER_DAY = 100
+# 与基线相比慢了超过这个比例、且绝对值超过噪声下限才算回归
+REGRESSION_TOLERANCE = 0.2
+REGRESSION_FLOOR_SECONDS = 0.05
+DOMAINS = ['reuters.com', 'techcrunch.com', 'theverge.com', '36kr.com', 'jiqizhixin.com', 'arxiv.org',
+           'openai.com', 'huggingface.co', 'qbitai.com', 'venturebeat.com', 'wired.com', 'sspai.com']
+SEARCH_QUERIES = ['openai', '模型', 'agent 融资', '大语言模型 benchmark', 'nonexistentterm']
+WORDS_EN = ['openai', 'agent', 'model', 'chip', 'robot', 'startup', 'benchmark', 'policy', 'nvidia', 'research']
+WORDS_CN = ['大语言模型', '融资', '芯片', '机器人', '开源', '智能体', '监管', '训练', '推理', '发布']
+
+def make_items(n):
+    """生成 n 条合成资讯"""
+    return [Item.from_dict({
+        'title': f"AI 资讯标题 {i} - Synthetic headline number {i}",
+        'summary': f"这是第 {i} 条合成摘要，用于测试渲染性能。" + "Lorem ipsum dolor sit amet. " * 6,
+        'url': f"https://example{i % 50}.com/articles/{i}"
+    }) for i in range(n)]
+
+def make_search_items(n):
+    """生成 n 条中英混合的历史资讯，日期分布在约一年内"""
+    items = []
+    for i in range(n):
+        day = i * 365 // n
+        date = f"2025-{1 + day // 31 % 12:02d}-{1 + day % 28:02d}"
+        title = f"{WORDS_CN[i % 10]}{WORDS_CN[i * 7 % 10]} {WORDS_EN[i % 10]} {WORDS_EN[i * 3 % 10]} #{i}"
+        summary = f"{WORDS_EN[i * 5 % 10]} {WORDS_CN[i * 3 % 10]}相关报道，第 {i} 条。" + WORDS_EN[i * 9 % 10] * 3
+        items.append({'title': title, 'summary': summary, 'url': f"https://example{i % 50}.com/{i}", 'date': date})
+    return items
+
+def bench_search(sizes):
+    results = []
+    for n in sizes:
+        items = make_search_items(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            index = search.build_index(items)
+            paths = search.write_index(index, tmp, lambda p: open(p, 'w', encoding='utf-8'))
+            build_seconds = time.perf_counter() - start
+            sizes_by_kind = {'docs': 0, 'terms': 0}
+            for path in paths:
+                kind = os.path.basename(os.path.dirname(path))
+                if kind in sizes_by_kind:
+                    sizes_by_kind[kind] += os.path.getsize(path)
+
+            queries = []
+            for query in SEARCH_QUERIES:
+                # 冷查询：新建查询器，包含分片加载；热查询：分片已缓存
+                start = time.perf_counter()
+                idx = search.SearchIndex(tmp)
+                hits = idx.search(query)
+                cold = time.perf_counter() - start
+                start = time.perf_counter()
+                idx.search(query)
+                warm = time.perf_counter() - start
+                queries.append({
+                    'query': query,
+                    'hits': len(hits),
+                    'cold_ms': round(cold * 1000, 2),
+                    'warm_ms': round(warm * 1000, 2),
+                    'shards_loaded': len(idx._shards) + len(idx._docs)
+                })
+        row = {
+            'items': n,
+            'build_seconds': round(build_seconds, 3),
+            'files': len(paths),
+            'doc_bytes': sizes_by_kind['docs'],
+            'term_bytes': sizes_by_kind['terms'],
+            'queries': queries
+        }
+        print(f"  {n:>7} 条: 构建 {row['build_seconds']}s, {row['files']} 个文件, "
+              f"文档 {row['doc_bytes'] // 1024} KB, 词项 {row['term_bytes'] // 1024} KB", file=sys.stderr)
+        for q in queries:
+            print(f"           {q['query']!r}: {q['hits']} 命中, 冷 {q['cold_ms']} ms / 热 {q['warm_ms']} ms, "
+                  f"加载 {q['shards_loaded']} 个分片", file=sys.stderr)
+        results.append(row)
+    return results
+
+def render_concat(path, items):
+    """旧方式：html += generate_card(...)，最后一次性写入"""
+    html = generate.generate_header("基准 - AI 日报")
+    for item in items:
+        html += generate.generate_card(item, 'category-news')
+    html += generate.generate_footer()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+def render_stream(path, items):
+    """新方式：卡片逐张写入打开的文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        generate.render_category_page(f, 'news', items)
+
+def run_render_child(variant, n):
+    """在子进程中跑单个组合，保证峰值 RSS 互不干扰"""
+    items = make_items(n)
+    base_rss = peak_rss_kb()
+    render = render_concat if variant == 'concat' else render_stream
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'page.html')
+        start = time.perf_counter()
+        render(path, items)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    return {
+        'variant': variant,
+        'items': n,
+        'seconds': round(elapsed, 4),
+        'items_per_sec': round(n / elapsed) if elapsed else None,
+        'bytes': size,
+        'peak_rss_kb': peak_rss_kb(),
+        'render_rss_kb': peak_rss_kb() - base_rss
+    }
+
+def bench_render(sizes):
+    results = []
+    for n in sizes:
+        for variant in ('concat', 'stream'):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '_render-child', variant, str(n)],
+                check=True, capture_output=True, text=True
+            )
+            row = json.loads(out.stdout)
+            print(f"  {variant:6} {n:>7} 条: {row['seconds']:.3f}s  "
+                  f"{row['items_per_sec']}/s  峰值RSS {row['peak_rss_kb']} KB (+{row['render_rss_kb']} KB)",
+                  file=sys.stderr)
+            results.append(row)
+    return results
+
+def render_day(results, records, date_str):
+    """渲染一天的全部页面，输出丢弃，只计渲染时间"""
+    with open(os.devnull, 'w', encoding='utf-8') as out:
+        generate.render_main_page(out, results, [], date_str)
+        for cat_id in CATEGORIES:
+            generate.render_category_page(out, cat_id, results.get(cat_id, ()))
+        generate.render_daily_archive(out, date_str, records)
+
+def bench_cards(sizes):
+    results = []
+    ctx = BuildContext(datetime(2025, 1, 1))
+    cat_ids = list(CATEGORIES)
+    for n in sizes:
+        day = {}
+        for i, item in enumerate(make_items(n)):
+            cat_id = cat_ids[i % len(cat_ids)]
+            day.setdefault(cat_id, []).append(replace(item, category=cat_id))
+        day = {cat_id: tuple(items) for cat_id, items in day.items()}
+        records = generate.daily_records(day, ctx)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            variants = [
+                ('none', fragments.FragmentCache(maxsize=0)),
+                ('memory', fragments.FragmentCache()),
+                ('disk-cold', fragments.FragmentCache(cache_dir=tmp)),
+                # 新的缓存对象读同一目录，相当于下一次构建
+                ('disk-warm', fragments.FragmentCache(cache_dir=tmp))
+            ]
+            for variant, cache in variants:
+                generate.CARD_CACHE = cache
+                start = time.perf_counter()
+                render_day(day, records, ctx.date_str)
+                cache.flush()
+                elapsed = time.perf_counter() - start
+                row = {'variant': variant, 'items': n, 'seconds': round(elapsed, 4), **cache.stats}
+                print(f"  {variant:9} {n:>7} 条: {row['seconds']:.3f}s  命中 {row['hits']}  "
+                      f"磁盘命中 {row['disk_hits']}  渲染 {row['misses']}", file=sys.stderr)
+                results.append(row)
+    return results
+
+def make_day(rng, date, n):
+    """生成某一天的 n 条中英混合资讯，覆盖全部分类"""
+    cat_ids = list(CATEGORIES)
+    items = []
+    for i in range(n):
+        url = f"https://{rng.choice(DOMAINS)}/{date.replace('-', '/')}/{i}-{rng.getrandbits(32):08x}"
+        title = f"{''.join(rng.sample(WORDS_CN, 2))}：{' '.join(rng.sample(WORDS_EN, 3)).title()} #{i}"
+        summary = '，'.join(rng.sample(WORDS_CN, 4)) + '。' + ' '.join(rng.choice(WORDS_EN) for _ in range(rng.randrange(10, 30)))
+        items.append(Item(
+            title=title, url=url, summary=summary, source=extract_domain(url),
+            category=cat_ids[i % len(cat_ids)], date=date,
+            time=f"{rng.randrange(6, 24):02d}:{rng.randrange(60):02d}"
+        ))
+    return items
+
+def write_search_results(site_dir, items):
+    results = {cat_id: [] for cat_id in CATEGORIES}
+    for item in items:
+        results[item.category].append({'title': item.title, 'url': item.url, 'snippet': item.summary})
+    with open(os.path.join(site_dir, 'search_results.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False)
+
+def make_site(site_dir, days, per_day, seed):
+    """在 site_dir 下写入 days 天的历史快照和当天的 search_results.json，返回当天日期"""
+    rng = random.Random(seed)
+    data_dir = os.path.join(site_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    today = PIPELINE_END - timedelta(days=1)
+    for offset in range(days, 0, -1):
+        date = (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+        with open(os.path.join(data_dir, f"{date}.jsonl"), 'w', encoding='utf-8') as f:
+            for item in make_day(rng, date, per_day):
+                f.write(json.dumps(item.to_record(), ensure_ascii=False, separators=(',', ':')) + '\n')
+    write_search_results(site_dir, make_day(rng, today.strftime("%Y-%m-%d"), per_day))
+    return rng, today
+
+def scan_site(site_dir):
+    found = {}
+    for root, _, files in os.walk(site_dir):
+        for name in files:
+            st = os.stat(os.path.join(root, name))
+            found[os.path.join(root, name)] = (st.st_size, st.st_mtime_ns)
+    return found
+
+def run_pipeline_child(build_time):
+    """在 AI_DAILY_NEWS_DIR 指向的目录里逐阶段运行生成流程"""
+    ctx = BuildContext(datetime.fromisoformat(build_time))
+    stages = []
+    results = None
+
+    def load():
+        nonlocal results
+        results = core.load_search_results()
+
+    steps = [
+        ('write_stylesheets', lambda: assets.write_stylesheets()),
+        ('load_search_results', load),
+        # 基准测试不联网：图标只用缓存（合成域名全部显示占位图标）
+        ('favicons', lambda: generate.load_favicons(
+            favicons.collect_domains(item for items in results.values() for item in items), offline=True)),
+        ('generate_main_page', lambda: generate.generate_main_page(results, ctx)),
+        ('generate_category_pages', lambda: generate.generate_category_pages(results)),
+        ('generate_daily_archive', lambda: generate.generate_daily_archive(results, ctx)),
+        ('generate_archive_index', generate.generate_archive_index),
+        ('generate_search_index', generate.generate_search_index),
+        ('generate_rss', lambda: generate_rss.generate_rss(ctx, generate.daily_records(results, ctx))),
+        ('save_state', lambda: (generate.CARD_CACHE.flush(), save_output_manifest(), generate.save_page_keys(),
+                                catalog.save_catalog()))
+    ]
+    before = scan_site(core.SITE_DIR)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, step in steps:
+            start = time.perf_counter()
+            step()
+            elapsed = time.perf_counter() - start
+            after = scan_site(core.SITE_DIR)
+            changed = [path for path, meta in after.items() if before.get(path) != meta]
+            stages.append({
+                'stage': name,
+                'seconds': round(elapsed, 4),
+                'files_written': len(changed),
+                'bytes_written': sum(after[path][0] for path in changed),
+                'peak_rss_kb': peak_rss_kb()
+            })
+            before = after
+    return {
+        'stages': stages,
+        'seconds': round(sum(stage['seconds'] for stage in stages), 4),
+        'peak_rss_kb': peak_rss_kb()
+    }
+
+def bench_pipeline(days_list, per_day, seed):
+    """每个历史长度跑两次：cold 为首次构建（无任何清单和状态），warm 为第二天的增量构建"""
+    rows = []
+    for days in days_list:
+        with tempfile.TemporaryDirectory() as site_dir:
+            start = time.perf_counter()
+            rng, today = make_site(site_dir, days, per_day, seed)
+            row = {'days': days, 'items_per_day': per_day, 'items': (days + 1) * per_day,
+                   'seed': seed, 'setup_seconds': round(time.perf_counter() - start, 3), 'runs': {}}
+            env = dict(os.environ, AI_DAILY_NEWS_DIR=site_dir)
+            for run, build_day in (('cold', today), ('warm', today + timedelta(days=1))):
+                if run == 'warm':
+                    write_search_results(site_dir, make_day(rng, build_day.strftime("%Y-%m-%d"), per_day))
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '_pipeline-child', build_day.isoformat()],
+                    check=True, capture_output=True, text=True, env=env
+                )
+                result = json.loads(out.stdout)
+                row['runs'][run] = result
+                print(f"  {days:>5} 天 {run}: {result['seconds']:.2f}s  峰值RSS {result['peak_rss_kb']} KB", file=sys.stderr)
+                for stage in result['stages']:
+                    print(f"      {stage['stage']:24} {stage['seconds']:8.3f}s  {stage['files_written']:>5} 个文件  "
+                          f"{stage['bytes_written'] // 1024:>8} KB", file=sys.stderr)
+            rows.append(row)
+    return rows
+
+def write_ingest_input(path, n, seed=1):
+    """写入 n 条合成资讯：.json 按分类分组，.jsonl 每行一条（带 category）"""
+    rng = random.Random(seed)
+    items = make_day(rng, PIPELINE_END.strftime("%Y-%m-%d"), n)
+    records = [{'title': item.title, 'url': item.url, 'snippet': item.summary, 'category': item.category} for item in items]
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            results = {cat_id: [] for cat_id in CATEGORIES}
+            for record in records:
+                results[record.pop('category')].append(record)
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+def load_whole(path):
+    """旧的读入方式：整个文件读成字符串，json.loads 成字典后再构造 Item"""
+    data = json.loads(core.read_input(path))
+    return {cat_id: tuple(Item.from_dict(item, cat_id) for item in items) for cat_id, items in data.items()}
+
+def run_ingest_child(variant, path):
+    """在子进程中跑单个组合；build 变体在 AI_DAILY_NEWS_DIR 指向的空站点里完整构建一次"""
+    base_rss = peak_rss_kb()
+    start = time.perf_counter()
+    if variant == 'load':
+        count = sum(len(items) for items in load_whole(path).values())
+    elif variant == 'stream':
+        count = sum(1 for _ in core.iter_search_results(path))
+    else:
+        argv = ['--no-dedupe', '--offline-favicons', '--build-time', PIPELINE_END.isoformat(), '--input', path]
+        if variant == 'build-stream':
+            argv.append('--stream')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generate.main(argv)
+        count = sum(1 for _ in core.iter_snapshot_file(f"{core.DATA_DIR}/{PIPELINE_END.strftime('%Y-%m-%d')}.jsonl"))
+    elapsed = time.perf_counter() - start
+    return {
+        'variant': variant,
+        'input': os.path.basename(path),
+        'items': count,
+        'input_bytes': os.path.getsize(path),
+        'seconds': round(elapsed, 4),
+        'peak_rss_kb': peak_rss_kb(),
+        'ingest_rss_kb': peak_rss_kb() - base_rss
+    }
+
+def bench_ingest(sizes, build_limit=INGEST_BUILD_LIMIT):
+    rows = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = []
+            for name in ('search_results.json', 'search_results.jsonl'):
+                path = os.path.join(tmp, name)
+                # 在子进程里生成输入：Linux 上 exec 后的进程会沿用父进程的峰值 RSS
+                subprocess.run([sys.executable, os.path.abspath(__file__), '_ingest-input', path, str(n)], check=True)
+                runs += [('load', path)] if name.endswith('.json') else []
+                runs.append(('stream', path))
+            if n <= build_limit:
+                runs += [('build', os.path.join(tmp, 'search_results.json')), ('build-stream', os.path.join(tmp, 'search_results.json'))]
+            for variant, path in runs:
+                site_dir = os.path.join(tmp, f"site-{variant}")
+                os.makedirs(site_dir, exist_ok=True)
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '_ingest-child', variant, path],
+                    check=True, capture_output=True, text=True, env=dict(os.environ, AI_DAILY_NEWS_DIR=site_dir)
+                )
+                row = json.loads(out.stdout)
+                print(f"  {variant:12} {row['input']:22} {n:>7} 条 ({row['input_bytes'] // 1024} KB): {row['seconds']:.3f}s  "
+                      f"峰值RSS {row['peak_rss_kb']} KB (+{row['ingest_rss_kb']} KB)", file=sys.stderr)
+                rows.append(row)
+    return rows
+
+def bench_related(sizes, per_day=RELATED_ITEMS_PER_DAY, seed=1):
+    """每个规模：全量计算（冷启动）、新增一天后冷启动增量（读取分片）和常驻进程里的增量，
+    并检查增量结果与从头计算的结果一致"""
+    rows = []
+    for n in sizes:
+        rng = random.Random(seed)
+        days = max(1, n // per_day)
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            os.makedirs(data_dir)
+            dates = [(PIPELINE_END - timedelta(days=days + 1 - i)).strftime("%Y-%m-%d") for i in range(days + 1)]
+            for date in dates:
+                with open(os.path.join(data_dir, f"{date}.jsonl"), 'w', encoding='utf-8') as f:
+                    for item in make_day(rng, date, per_day):
+                        f.write(core.snapshot_line(item))
+            # 最后一天先移开，全量计算之后再放回来，模拟第二天的增量构建
+            last = os.path.join(data_dir, f"{dates[-1]}.jsonl")
+            os.rename(last, last + '.next')
+
+            shard_dir = os.path.join(tmp, 'related')
+            index = related.RelatedIndex(shard_dir)
+            start = time.perf_counter()
+            stats = index.update(data_dir)
+            full = time.perf_counter() - start
+            linked = sum(1 for date in index.days for _ in index.links(date))
+
+            os.rename(last + '.next', last)
+            start = time.perf_counter()
+            index.update(data_dir)
+            warm = time.perf_counter() - start
+            # 冷启动：新进程读取分片后只计算新的一天
+            os.utime(last)
+            os.remove(os.path.join(shard_dir, f"{dates[-1]}.json"))
+            cold_index = related.RelatedIndex(shard_dir)
+            start = time.perf_counter()
+            cold_stats = cold_index.update(data_dir)
+            cold = time.perf_counter() - start
+
+            check = related.RelatedIndex(os.path.join(tmp, 'check'))
+            check.update(data_dir, full_rebuild=True)
+            consistent = check.shards[dates[-1]]['docs'] == cold_index.shards[dates[-1]]['docs'] == index.shards[dates[-1]]['docs']
+        row = {
+            'items': stats['docs'],
+            'days': stats['days'],
+            'full_seconds': round(full, 3),
+            'items_per_second': round(stats['docs'] / full) if full else None,
+            'linked_items': linked,
+            'incremental_warm_seconds': round(warm, 4),
+            'incremental_cold_seconds': round(cold, 4),
+            'incremental_items': cold_stats['computed_docs'],
+            'consistent': consistent
+        }
+        print(f"  {row['items']:>7} 条 ({row['days']} 天): 全量 {row['full_seconds']}s ({row['items_per_second']} 条/s), "
+              f"{linked} 条有相关报道; 新增一天 {per_day} 条: 常驻 {row['incremental_warm_seconds']}s, "
+              f"冷启动 {row['incremental_cold_seconds']}s, 与全量一致: {consistent}", file=sys.stderr)
+        rows.append(row)
+    return rows
+
+def find_regressions(rows, baseline, tolerance=REGRESSION_TOLERANCE):
+    """与上一次 pipeline 结果逐阶段比较，返回变慢的阶段"""
+    old = {
+        (row['days'], run, stage['stage']): stage['seconds']
+        for row in baseline.get('pipeline', []) for run, result in row['runs'].items() for stage in result['stages']
+    }
+    regressions = []
+    for row in rows:
+        for run, result in row['runs'].items():
+            for stage in result['stages']:
+                before = old.get((row['days'], run, stage['stage']))
+                now = stage['seconds']
+                if before is not None and now - before > REGRESSION_FLOOR_SECONDS and now > before * (1 + tolerance):
+                    regressions.append({'days': row['days'], 'run': run, 'stage': stage['stage'],
+                                        'baseline_seconds': before, 'seconds': now})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 日报性能基准")
+    sub = parser.add_subparsers(dest='command', required=True)
+    render = sub.add_parser('render', help="拼接 vs 流式页面渲染")
+    render.add_argument('--sizes', type=int, nargs='+', default=RENDER_SIZES)
+    search_cmd = sub.add_parser('search', help="分片倒排索引体积和查询延迟")
+    search_cmd.add_argument('--sizes', type=int, nargs='+', default=SEARCH_SIZES)
+    cards = sub.add_parser('cards', help="卡片片段缓存命中率和渲染时间")
+    cards.add_argument('--sizes', type=int, nargs='+', default=CARD_SIZES)
+    pipeline = sub.add_parser('pipeline', help="合成历史数据上的完整生成流程（逐阶段计时、峰值内存、写入字节）")
+    pipeline.add_argument('--days', type=int, nargs='+', default=PIPELINE_DAYS, help="历史天数，可给多个")
+    pipeline.add_argument('--items-per-day', type=int, default=PIPELINE_ITEMS_PER_DAY)
+    pipeline.add_argument('--seed', type=int, default=1)
+    pipeline.add_argument('--baseline', help="之前保存的 pipeline 结果 JSON，逐阶段比较并在变慢时以非零状态退出")
+    pipeline.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help="允许的变慢比例")
+    ingest = sub.add_parser('ingest', help="一次读入 vs 流式读取搜索结果的峰值内存")
+    ingest.add_argument('--sizes', type=int, nargs='+', default=INGEST_SIZES)
+    ingest.add_argument('--build-limit', type=int, default=INGEST_BUILD_LIMIT, help="条数不超过它时再比较整次构建")
+    related_cmd = sub.add_parser('related', help="相关报道索引的全量吞吐量和增量耗时")
+    related_cmd.add_argument('--sizes', type=int, nargs='+', default=RELATED_SIZES)
+    related_cmd.add_argument('--items-per-day', type=int, default=RELATED_ITEMS_PER_DAY)
+    ingest_input = sub.add_parser('_ingest-input')
+    ingest_input.add_argument('path')
+    ingest_input.add_argument('n', type=int)
+    ingest_child = sub.add_parser('_ingest-child')
+    ingest_child.add_argument('variant', choices=['load', 'stream', 'build', 'build-stream'])
+    ingest_child.add_argument('path')
+    pipeline_child = sub.add_parser('_pipeline-child')
+    pipeline_child.add_argument('build_time')
+    child = sub.add_parser('_render-child')
+    child.add_argument('variant', choices=['concat', 'stream'])
+    child.add_argument('n', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == '_render-child':
+        print(json.dumps(run_render_child(args.variant, args.n)))
+    elif args.command == 'render':
+        print(json.dumps({'render': bench_render(args.sizes)}, ensure_ascii=False, indent=2))
+    elif args.command == 'search':
+        print(json.dumps({'search': bench_search(args.sizes)}, ensure_ascii=False, indent=2))
+    elif args.command == '_pipeline-child':
+        print(json.dumps(run_pipeline_child(args.build_time)))
+    elif args.command == 'pipeline':
+        report = {'pipeline': bench_pipeline(args.days, args.items_per_day, args.seed)}
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                report['regressions'] = find_regressions(report['pipeline'], json.load(f), args.tolerance)
+            for r in report['regressions']:
+                print(f"  ⚠️ 回归: {r['days']} 天 {r['run']} {r['stage']} "
+                      f"{r['baseline_seconds']}s -> {r['seconds']}s", file=sys.stderr)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        if report.get('regressions'):
+            sys.exit(1)
+    elif args.command == '_ingest-input':
+        write_ingest_input(args.path, args.n)
+    elif args.command == '_ingest-child':
+        print(json.dumps(run_ingest_child(args.variant, args.path)))
+    elif args.command == 'ingest':
+        print(json.dumps({'ingest': bench_ingest(args.sizes, args.build_limit)}, ensure_ascii=False, indent=2))
+    elif args.command == 'related':
+        print(json.dumps({'related': bench_related(args.sizes, args.items_per_day)}, ensure_ascii=False, indent=2))
+    elif args.command == 'cards':
+        print(json.dumps({'cards': bench_cards(args.sizes)}, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+AI 日报归档目录
+持久化的每日快照目录：日期 -> 存档文件、条数、各分类条数和内容哈希。
+写入某一天的快照时只更新这一天的条目，归档索引和按月、按年的汇总页都由它生成，
+不必每次构建都列出目录、逐个读取快照
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+
+from core import DATA_DIR, SITE_DIR, load_output_manifest, parse_day_snapshot, read_input
+
+ARCHIVE_CATALOG = f"{SITE_DIR}/archive_catalog.json"
+CATALOG_VERSION = 1
+
+class ArchiveCatalog:
+    """日期 -> {'file', 'count', 'categories', 'sha256', 'size', 'mtime'}
+
+    只有构建写入或发现变化的日期会更新；快照在构建之外被删除或改动时，用 rebuild() 重新扫描。
+    """
+    def __init__(self, path=ARCHIVE_CATALOG, data_dir=DATA_DIR):
+        self.path = path
+        self.data_dir = data_dir
+        self.days = {}
+        self.changed = False
+        self.exists = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CATALOG_VERSION:
+                    self.days = data['days']
+                    self.exists = True
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def _snapshot_path(self, date):
+        return os.path.join(self.data_dir, f"{date}.jsonl")
+
+    def record(self, date, categories, digest=None):
+        """记录刚写入的一天：categories 为 {分类: 条数}，digest 默认取输出清单里快照的 sha256"""
+        path = self._snapshot_path(date)
+        if digest is None:
+            digest = load_output_manifest().get(os.path.relpath(path, SITE_DIR), '')
+        st = os.stat(path)
+        entry = {
+            'file': f"{date}.html",
+            'count': sum(categories.values()),
+            'categories': dict(sorted(categories.items())),
+            'sha256': digest,
+            'size': st.st_size,
+            'mtime': st.st_mtime_ns
+        }
+        if self.days.get(date) != entry:
+            self.days[date] = entry
+            self.changed = True
+
+    def refresh(self, date):
+        """重新读取一天的快照（快照已不存在时删除条目），mtime 和大小没变时不读取"""
+        path = self._snapshot_path(date)
+        if not os.path.exists(path):
+            if self.days.pop(date, None) is not None:
+                self.changed = True
+            return
+        entry = self.days.get(date)
+        st = os.stat(path)
+        if entry and (entry['mtime'], entry['size']) == (st.st_mtime_ns, st.st_size):
+            return
+        raw = read_input(path)
+        self.record(date, Counter(item.category for item in parse_day_snapshot(raw)), hashlib.sha256(raw).hexdigest())
+
+    def rebuild(self):
+        """扫描快照目录重建整个目录（第一次使用或 --full-rebuild 时）"""
+        dates = set()
+        if os.path.exists(self.data_dir):
+            dates = {name[:-len('.jsonl')] for name in os.listdir(self.data_dir) if name.endswith('.jsonl')}
+        for date in set(self.days) - dates:
+            del self.days[date]
+            self.changed = True
+        for date in sorted(dates):
+            self.refresh(date)
+        self.exists = True
+
+    def dates(self):
+        """全部日期，最新的在前"""
+        return sorted(self.days, reverse=True)
+
+    def months(self):
+        """{'YYYY-MM': [日期（最新的在前）]}，月份也是最新的在前"""
+        found = {}
+        for date in self.dates():
+            found.setdefault(date[:7], []).append(date)
+        return found
+
+    def save(self):
+        if not self.changed:
+            return
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': CATALOG_VERSION, 'days': self.days}, ensure_ascii=False,
+                               separators=(',', ':'), sort_keys=True))
+        os.replace(self.path + '.tmp', self.path)
+        self.changed = False
+
+_catalog = None
+
+def load_catalog(full_rebuild=False):
+    """本进程共用的归档目录；文件不存在（或 full_rebuild）时扫描快照目录建立"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ArchiveCatalog()
+    if full_rebuild or not _catalog.exists:
+        _catalog.rebuild()
+    return _catalog
+
+def save_catalog():
+    if _catalog is not None:
+        _catalog.save()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫描 data/ 重建归档目录并列出各月的条数")
+    parser.parse_args(argv)
+
+    catalog = load_catalog(full_rebuild=True)
+    save_catalog()
+    for month, dates in catalog.months().items():
+        print(f"{month}: {len(dates)} 天, {sum(catalog.days[date]['count'] for date in dates)} 条")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+AI 日报预压缩输出
+为输出清单里的每个文本文件写出最高压缩级别的 .gz（装有 brotli 时再加 .br）同名文件，
+只在源文件内容哈希变化时重新压缩；同时给出逐文件的大小报告，可按页面传输大小设置预算
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+from core import SITE_DIR, is_state_file, load_output_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_STATE = f"{SITE_DIR}/compress_state.json"
+SIZE_REPORT = f"{SITE_DIR}/size_report.json"
+COMPRESS_STATE_VERSION = 1
+# 只压缩文本类输出；图片等已压缩的格式、快照和构建状态文件（不对外提供）不处理
+COMPRESSIBLE = ('.html', '.xml', '.json', '.css', '.js', '.svg', '.txt')
+# 小于这个大小的文件压缩后通常反而更大，服务器也不会协商压缩
+MIN_SIZE = 256
+# 预算检查的对象：页面
+BUDGET_SUFFIXES = ('.html',)
+
+def encodings():
+    """可用的预压缩格式：(后缀, 压缩函数)"""
+    found = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        found.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return found
+
+_state = None
+
+def load_state():
+    """上次压缩的记录：相对路径 -> {sha256, size, .gz, .br}"""
+    global _state
+    if _state is None:
+        _state = {}
+        if os.path.exists(COMPRESS_STATE):
+            try:
+                with open(COMPRESS_STATE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == COMPRESS_STATE_VERSION:
+                    _state = data['files']
+            except (OSError, ValueError, KeyError):
+                pass
+    return _state
+
+def save_state():
+    if _state is None:
+        return
+    with open(COMPRESS_STATE + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'version': COMPRESS_STATE_VERSION, 'files': _state}, ensure_ascii=False, separators=(',', ':'), sort_keys=True))
+    os.replace(COMPRESS_STATE + '.tmp', COMPRESS_STATE)
+
+def _write_atomic(path, data):
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+def _remove_siblings(path):
+    for suffix in ('.gz', '.br'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def compressible(rel):
+    return rel.endswith(COMPRESSIBLE) and not is_state_file(rel)
+
+def precompress(site_dir=SITE_DIR):
+    """按输出清单压缩全部文本输出，返回 (大小报告, 统计)
+
+    源文件的 sha256 与上次相同且压缩文件都在时不再压缩；清单里已删除的输出连同压缩文件一起清理。
+    报告为 {相对路径: {'raw': 字节数, '.gz': 字节数, ...}}。
+    """
+    manifest = load_output_manifest()
+    state = load_state()
+    codecs = encodings()
+    stats = {'compressed': 0, 'unchanged': 0, 'removed': 0}
+    report = {}
+    for rel, digest in manifest.items():
+        path = os.path.join(site_dir, rel)
+        if not compressible(rel) or not os.path.exists(path):
+            continue
+        entry = state.get(rel)
+        expected = {suffix for suffix, _ in codecs} if entry and entry['size'] >= MIN_SIZE else set()
+        if (entry and entry['sha256'] == digest and {k for k in entry if k.startswith('.')} == expected
+                and all(os.path.exists(path + suffix) for suffix in expected)):
+            stats['unchanged'] += 1
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+            entry = {'sha256': digest, 'size': len(data)}
+            if len(data) >= MIN_SIZE:
+                for suffix, compress in codecs:
+                    packed = compress(data)
+                    _write_atomic(path + suffix, packed)
+                    entry[suffix] = len(packed)
+            for suffix in ('.gz', '.br'):
+                # 变小到不值得压缩，或这次没有 brotli 时删掉旧文件
+                if suffix not in entry and os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            state[rel] = entry
+            stats['compressed'] += 1
+        report[rel] = {'raw': entry['size'], **{k: v for k, v in entry.items() if k.startswith('.')}}
+    for rel in [rel for rel in state if rel not in report]:
+        _remove_siblings(os.path.join(site_dir, rel))
+        del state[rel]
+        stats['removed'] += 1
+    return report, stats
+
+def transfer_size(row):
+    """浏览器实际下载的大小：可用的最小压缩版本，没有压缩版本时为原始大小"""
+    return min(row.values())
+
+def over_budget(report, budget, suffixes=BUDGET_SUFFIXES):
+    """传输大小超过预算的页面，按大小降序返回 [(相对路径, 传输大小)]"""
+    over = [(rel, transfer_size(row)) for rel, row in report.items() if rel.endswith(suffixes) and transfer_size(row) > budget]
+    return sorted(over, key=lambda x: -x[1])
+
+def check_budget(report, budget):
+    """有页面超出预算时以非零状态退出，列出超出的页面"""
+    over = over_budget(report, budget)
+    if over:
+        raise SystemExit('\n'.join([f"❌ {len(over)} 个页面超出大小预算 {budget} 字节:"]
+                                   + [f"   {rel}: {size} 字节" for rel, size in over]))
+
+def summarize(report):
+    """按文件类型汇总原始大小和各压缩格式的大小"""
+    totals = {}
+    for rel, row in report.items():
+        ext = os.path.splitext(rel)[1]
+        total = totals.setdefault(ext, {'files': 0, 'raw': 0})
+        total['files'] += 1
+        for key, value in row.items():
+            total[key] = total.get(key, 0) + value
+    return dict(sorted(totals.items()))
+
+def write_size_report(report, path=SIZE_REPORT, budget=None):
+    data = {
+        'budget': budget,
+        'totals': summarize(report),
+        'files': dict(sorted(report.items()))
+    }
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=2))
+    os.replace(path + '.tmp', path)
+
+def print_size_report(report, top=10):
+    for ext, total in summarize(report).items():
+        sizes = ', '.join(f"{key[1:]} {value}" for key, value in total.items() if key.startswith('.'))
+        print(f"   - {ext}: {total['files']} 个文件, 原始 {total['raw']} 字节{', ' + sizes if sizes else ''}")
+    largest = sorted(report.items(), key=lambda x: -transfer_size(x[1]))[:top]
+    for rel, row in largest:
+        print(f"     {rel}: {row['raw']} → {transfer_size(row)} 字节")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="为已生成的输出写出 .gz/.br 预压缩文件并报告大小")
+    parser.add_argument('--size-budget', type=int, help="页面传输大小上限（字节），超过时以非零状态退出")
+    args = parser.parse_args(argv)
+
+    report, stats = precompress()
+    save_state()
+    write_size_report(report, budget=args.size_budget)
+    print(f"✅ 预压缩: 重新压缩 {stats['compressed']} 个, 未变化 {stats['unchanged']} 个, 清理 {stats['removed']} 个"
+          f" ({', '.join(suffix for suffix, _ in encodings())})")
+    print_size_report(report)
+    if args.size_budget:
+        check_budget(report, args.size_budget)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+AI 日报公共模块
+生成页面、RSS、搜索索引和摘要抓取共用的配置、资讯模型、快照读写和原子输出
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import groupby
+from urllib.parse import urlparse
+
+# 配置（AI_DAILY_NEWS_DIR 可指向其他站点目录，基准测试用它在临时目录里构建）
+SITE_DIR = os.environ.get('AI_DAILY_NEWS_DIR', "/Users/alex/.openclaw/workspace/ai-daily-news")
+SEARCH_RESULTS = f"{SITE_DIR}/search_results.json"
+ARCHIVE_DIR = f"{SITE_DIR}/archives"
+DATA_DIR = f"{SITE_DIR}/data"
+OUTPUT_MANIFEST = f"{SITE_DIR}/output_manifest.json"
+# 构建自身的状态和报告文件（站点根目录和各语言版本子目录里），不对外提供
+STATE_FILES = frozenset((
+    'output_manifest.json', 'page_keys.json', 'search_index_manifest.json',
+    'url_index.json', 'url_index.json.bloom', 'url_index.json.pending.json',
+    'archive_catalog.json', 'compress_state.json', 'size_report.json', 'feed_state.json', 'feed_headers.json',
+    'build_report.json', 'build.prof'
+))
+CATEGORIES = {
+    'news': ('📰 新闻', 'category-news'),
+    'tech': ('💻 技术', 'category-tech'),
+    'products': ('🚀 产品', 'category-products'),
+    'funding': ('💰 融资', 'category-funding'),
+    'people': ('👤 人物', 'category-people'),
+    'opinions': ('💡 观点', 'category-opinions'),
+    'tutorial': ('📚 教程', 'category-tutorial'),
+    'fun': ('🎉 趣闻', 'category-fun')
+}
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+def clean_text(text):
+    """移除 HTML 标签和多余空白"""
+    if not text:
+        return ""
+    return SPACE_RE.sub(' ', TAG_RE.sub('', text)).strip()
+
+@lru_cache(maxsize=4096)
+def extract_domain(url):
+    try:
+        return urlparse(url).netloc.replace('www.', '')
+    except ValueError:
+        return ''
+
+@dataclass(frozen=True, slots=True)
+class Item:
+    """一条资讯。搜索结果和每日快照都加载成它，加载后不再修改"""
+    title: str
+    url: str
+    summary: str = ''
+    source: str = ''
+    category: str = 'news'
+    date: str = ''
+    time: str = ''
+
+    @classmethod
+    def from_dict(cls, data, category=None):
+        """从搜索结果（snippet）或快照记录（summary）构造"""
+        url = data.get('url') or '#'
+        return cls(
+            title=data.get('title', ''),
+            url=url,
+            summary=data.get('summary', '') or data.get('snippet', ''),
+            source=data.get('source', '') or extract_domain(url),
+            category=category or data.get('category', 'news'),
+            date=data.get('date', ''),
+            time=data.get('time', '')
+        )
+
+    def to_record(self):
+        """每日快照中的一行"""
+        record = {
+            'date': self.date,
+            'category': self.category,
+            'title': self.title,
+            'summary': self.summary,
+            'url': self.url,
+            'source': self.source
+        }
+        if self.time:
+            record['time'] = self.time
+        return record
+
+# 读取的输入文件数和字节数（构建报告用）
+INPUT_STATS = {'files': 0, 'bytes': 0}
+# 流式读取搜索结果时每次读入的字符数
+STREAM_CHUNK = 1 << 16
+_WS_RE = re.compile(r'\s*')
+_DELIMITERS = frozenset(',:]} \t\r\n')
+_DECODER = json.JSONDecoder()
+
+def read_input(path):
+    """读取输入文件的全部字节，计入 INPUT_STATS"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    INPUT_STATS['files'] += 1
+    INPUT_STATS['bytes'] += len(raw)
+    return raw
+
+class _JsonStream:
+    """按块读取文本，用 raw_decode 逐个解析值，缓冲区只保留尚未解析的部分"""
+    def __init__(self, f, chunk_size=STREAM_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符（结束时为空串）"""
+        while True:
+            self.pos = _WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """解析下一个完整的值；值被块边界截断时（数字截断后仍能解析，所以要求后面紧跟分隔符）多读一块再试"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if (end < len(self.buf) and self.buf[end] in _DELIMITERS) or self.eof or not self._fill():
+                self.pos = end
+                return value
+
+    def array(self):
+        """逐个产出数组元素（开头的 [ 已读过）"""
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+    def members(self):
+        """逐个产出顶层对象的 (键, 值)；值为数组时产出元素的生成器，调用方用完后才继续读下一个键"""
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                self.pos += 1
+                elements = self.array()
+                yield key, elements
+                for _ in elements:
+                    pass
+            else:
+                yield key, self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+def iter_search_groups(path=SEARCH_RESULTS):
+    """按分类逐组读取搜索结果，产出 (分类, 值)，内存只保留当前一条资讯和一个读缓冲区
+
+    .json 为按分类分组的对象，值为列表时产出逐条解析的生成器（用完才读下一组），否则为原值；
+    .jsonl 每行一条资讯（category 字段为分类），连续同分类的行为一组。
+    """
+    if not os.path.exists(path):
+        return
+    INPUT_STATS['files'] += 1
+    INPUT_STATS['bytes'] += os.path.getsize(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            records = (json.loads(line) for line in f if line.strip())
+            for cat_id, group in groupby(records, key=lambda record: record.get('category', 'news')):
+                yield cat_id, group
+        else:
+            yield from _JsonStream(f).members()
+
+def iter_search_results(path=SEARCH_RESULTS):
+    """逐条产出搜索结果中的 Item（按文件中的顺序）"""
+    for cat_id, items in iter_search_groups(path):
+        if isinstance(items, (list, Iterator)):
+            for item in items:
+                yield Item.from_dict(item, cat_id)
+
+def load_search_results(path=SEARCH_RESULTS):
+    """加载搜索结果，返回 {分类: (Item, ...)}；逐条解析，不保留原始文本和字典"""
+    if not os.path.exists(path):
+        return {cat: () for cat in CATEGORIES}
+    results = {}
+    for cat_id, items in iter_search_groups(path):
+        if isinstance(items, (list, Iterator)):
+            results.setdefault(cat_id, []).extend(Item.from_dict(item, cat_id) for item in items)
+    return {cat_id: tuple(items) for cat_id, items in results.items()}
+
+class BuildContext:
+    """一次构建的固定上下文：统一的构建时间，以及由内容决定的资讯时间"""
+    def __init__(self, build_time=None, seed=''):
+        self.build_time = build_time or datetime.now()
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls, build_time=None):
+        """优先使用显式构建时间，其次是 SOURCE_DATE_EPOCH，最后是当前时间"""
+        if build_time is None and os.environ.get('SOURCE_DATE_EPOCH'):
+            build_time = datetime.fromtimestamp(int(os.environ['SOURCE_DATE_EPOCH']), timezone.utc)
+        return cls(build_time)
+
+    @property
+    def date_str(self):
+        return self.build_time.strftime("%Y-%m-%d")
+
+    def item_time(self, item):
+        """同一条资讯在每次构建中得到相同的时间（06:00-23:59）"""
+        key = f"{self.seed}|{item.url}|{item.title}"
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        return f"{6 + digest[0] % 18:02d}:{digest[1] % 60:02d}"
+
+    def stamp(self, item):
+        """给当天的资讯加上日期和时间"""
+        return replace(item, date=self.date_str, time=self.item_time(item))
+
+# 输出清单：相对路径 -> 上次写入内容的 sha256
+_output_digests = None
+OUTPUT_STATS = {'written': 0, 'skipped': 0, 'bytes': 0}
+
+def is_state_file(rel):
+    """相对站点根目录的路径是否为构建状态文件：根目录或版本子目录（只有一层）里的 STATE_FILES"""
+    parts = rel.replace(os.sep, '/').split('/')
+    return len(parts) <= 2 and parts[-1] in STATE_FILES
+
+def load_output_manifest():
+    global _output_digests
+    if _output_digests is None:
+        _output_digests = {}
+        if os.path.exists(OUTPUT_MANIFEST):
+            try:
+                with open(OUTPUT_MANIFEST, 'r', encoding='utf-8') as f:
+                    _output_digests = json.load(f)
+            except (OSError, ValueError):
+                pass
+    return _output_digests
+
+def save_output_manifest():
+    if _output_digests is None:
+        return
+    with open(OUTPUT_MANIFEST + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(_output_digests, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(OUTPUT_MANIFEST + '.tmp', OUTPUT_MANIFEST)
+
+def record_output(path, digest, written, size=0):
+    """把一次写入/跳过记录到输出清单和统计"""
+    if written:
+        load_output_manifest()[os.path.relpath(path, SITE_DIR)] = digest
+        OUTPUT_STATS['written'] += 1
+        OUTPUT_STATS['bytes'] += size
+    else:
+        OUTPUT_STATS['skipped'] += 1
+
+class _HashingWriter:
+    """边写边计算 sha256 的文本写入器"""
+    def __init__(self, raw):
+        self.raw = raw
+        self.hasher = hashlib.sha256()
+        self.digest = None
+        self.written = False
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.hasher.update(data)
+        self.size += len(data)
+        self.raw.write(data)
+        return len(text)
+
+@contextmanager
+def open_output(path):
+    """原子写入输出文件：先写临时文件，内容与上次相同则丢弃，否则重命名覆盖"""
+    digests = load_output_manifest()
+    key = os.path.relpath(path, SITE_DIR)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            out = _HashingWriter(raw)
+            yield out
+        out.digest = out.hasher.hexdigest()
+        if digests.get(key) == out.digest and os.path.exists(path):
+            os.remove(tmp)
+        else:
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+            out.written = True
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    record_output(path, out.digest, out.written, out.size)
+
+def parse_day_snapshot(raw):
+    """解析 JSON Lines 格式的每日快照，返回 [Item]"""
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8')
+    return [Item.from_dict(json.loads(line)) for line in raw.splitlines() if line.strip()]
+
+def snapshot_line(item):
+    """每日快照中的一行（JSON Lines）"""
+    return json.dumps(item.to_record(), ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def write_day_snapshot(items, date_str):
+    """写入每日快照 data/YYYY-MM-DD.jsonl（每行一条资讯）"""
+    with open_output(f"{DATA_DIR}/{date_str}.jsonl") as f:
+        for item in items:
+            f.write(snapshot_line(item))
+
+def iter_snapshot_file(path):
+    """逐行读取 JSON Lines 文件，产出 Item"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield Item.from_dict(json.loads(line))
+
+def load_day_snapshot(date_str):
+    """读取某一天的快照，不存在时返回空列表"""
+    path = f"{DATA_DIR}/{date_str}.jsonl"
+    if not os.path.exists(path):
+        return []
+    return parse_day_snapshot(read_input(path))
+
+def get_snapshot_dates():
+    """获取所有快照日期（最新的在前）"""
+    if not os.path.exists(DATA_DIR):
+        return []
+    return sorted((f[:-len('.jsonl')] for f in os.listdir(DATA_DIR) if f.endswith('.jsonl')), reverse=True)
+
+def load_history(dates=None):
+    """批量读取历史快照，返回 {date: [Item]}"""
+    if dates is None:
+        dates = get_snapshot_dates()
+    return {date: load_day_snapshot(date) for date in dates}
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+AI 日报去重
+按规范化 URL 跨天去重，可选按标题 MinHash 检测近似重复，
+历史很长时可改用布隆过滤器限制内存
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# 只去掉已知的追踪参数（另有 utm_*）；ref、from 等在不少网站上是真正的查询参数，去掉会合并不同的文章
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref_src', 'spm'}
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+MINHASH_PRIME = (1 << 61) - 1
+# 固定的 (a, b) 参数，保证每次构建得到相同的签名
+MINHASH_PARAMS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], 'big') % MINHASH_PRIME | 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], 'big') % MINHASH_PRIME)
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+TITLE_STRIP_RE = re.compile(r'[\W_]+')
+
+def normalize_url(url):
+    """规范化 URL：与 extract_domain 相同的域名解析，忽略协议、锚点和追踪参数"""
+    if not url or url == '#':
+        return ''
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return url
+    domain = parsed.netloc.replace('www.', '').lower()
+    path = parsed.path.rstrip('/') or '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    key = domain + path
+    if query:
+        key += '?' + urlencode(query)
+    return key
+
+def title_shingles(title, size=3):
+    """标题去掉标点空白后的字符 n-gram"""
+    text = TITLE_STRIP_RE.sub('', (title or '').lower())
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def title_bands(title):
+    """MinHash 签名按行分段（LSH），任一分段相同即视为近似重复候选"""
+    shingles = title_shingles(title)
+    if not shingles:
+        return set()
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big') for s in shingles]
+    signature = [min((a * h + b) % MINHASH_PRIME for h in hashes) for a, b in MINHASH_PARAMS]
+    bands = set()
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        bands.add(f"t:{band}:{digest}")
+    return bands
+
+class BloomFilter:
+    """定长位数组的布隆过滤器，内存与历史长度无关"""
+    def __init__(self, capacity=1_000_000, error_rate=0.001, bits=None, hashes=None):
+        self.size = bits or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path):
+        with open(path + '.tmp', 'wb') as f:
+            f.write(self.size.to_bytes(8, 'big') + self.hashes.to_bytes(2, 'big') + bytes(self.bits))
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        bloom = cls(bits=int.from_bytes(raw[:8], 'big'), hashes=int.from_bytes(raw[8:10], 'big'))
+        bloom.bits = bytearray(raw[10:])
+        return bloom
+
+class UrlIndex:
+    """持久化的跨天去重索引
+
+    精确模式：JSON 记录每个键（规范化 URL 或标题分段）首次出现的日期。
+    布隆模式：布隆过滤器只包含之前各天的键，当天的键暂存在 pending 文件里，
+    日期变化时再并入过滤器，因此同一天重复运行不会把当天内容判为重复。
+    标题分段只在检查近似重复时记录；bands 表示索引里的标题分段覆盖了全部历史，
+    为假时打开近似重复检查要先用历史快照补齐（见 generate.warm_url_index）。
+    """
+    def __init__(self, path, bloom=False, capacity=1_000_000):
+        self.path = path
+        self.bloom = None
+        self.entries = {}
+        self.pending = {'date': '', 'keys': []}
+        self._pending_keys = set()
+        self.bands = False
+        self.changed = False
+        if bloom:
+            bloom_path = path + '.bloom'
+            self.bloom = BloomFilter.load(bloom_path) if os.path.exists(bloom_path) else BloomFilter(capacity)
+        self.exists = os.path.exists(self._state_path())
+        if self.exists:
+            with open(self._state_path(), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if self.bloom is not None:
+                self.bands = state.pop('bands', False)
+                self.pending = state
+                self._pending_keys = set(state['keys'])
+            elif isinstance(state.get('entries'), dict) and 'bands' in state:
+                self.bands = state['bands']
+                self.entries = state['entries']
+            else:
+                # 旧格式：只有键 -> 日期，标题分段是否完整未知
+                self.entries = state
+
+    def _state_path(self):
+        return self.path + '.pending.json' if self.bloom is not None else self.path
+
+    def _roll(self, date_str):
+        # 进入新的一天：把之前那天的键并入布隆过滤器
+        if self.pending['date'] and self.pending['date'] < date_str:
+            for key in self.pending['keys']:
+                self.bloom.add(key)
+            self.pending = {'date': date_str, 'keys': []}
+            self._pending_keys = set()
+            self.changed = True
+        elif not self.pending['date']:
+            self.pending['date'] = date_str
+            self.changed = True
+
+    def seen(self, key, date_str):
+        """该键是否在 date_str 之前的某天出现过"""
+        if self.bloom is not None:
+            self._roll(date_str)
+            return key in self.bloom
+        first = self.entries.get(key)
+        return first is not None and first < date_str
+
+    def add(self, key, date_str):
+        if self.bloom is not None:
+            self._roll(date_str)
+            if key not in self._pending_keys and key not in self.bloom:
+                self._pending_keys.add(key)
+                self.pending['keys'].append(key)
+                self.changed = True
+        elif key not in self.entries or date_str < self.entries[key]:
+            self.entries[key] = date_str
+            self.changed = True
+
+    def backfill(self, key, date_str):
+        """补记历史上的键：布隆模式下早于暂存日期的键直接并入过滤器（暂存区只放当天的键）"""
+        if self.bloom is not None and self.pending['date'] and date_str < self.pending['date']:
+            self.bloom.add(key)
+            self.changed = True
+        else:
+            self.add(key, date_str)
+
+    def save(self):
+        """写回磁盘；没有新键时不重写（长驻进程里反复去重同一天的内容）"""
+        if not self.changed and self.exists:
+            return
+        if self.bloom is not None:
+            self.bloom.save(self.path + '.bloom')
+            state = dict(self.pending, bands=self.bands)
+        else:
+            state = {'bands': self.bands, 'entries': self.entries}
+        with open(self._state_path() + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(state, ensure_ascii=False, separators=(',', ':')))
+        os.replace(self._state_path() + '.tmp', self._state_path())
+        self.exists = True
+        self.changed = False
+
+class Deduper:
+    """逐条去重：同一天内保留第一次出现的资讯，之前出现过的丢弃；finish() 时把当天的键记入索引
+
+    标题分段（MinHash）只在 near_dup 时计算和记录；不检查近似重复的一天记入索引后，
+    索引的标题分段不再完整，下次打开 near_dup 时重新补齐。
+    """
+    def __init__(self, date_str, index, near_dup=False):
+        self.date_str = date_str
+        self.index = index
+        self.near_dup = near_dup
+        self.stats = {'kept': 0, 'same_day': 0, 'earlier': 0, 'near_dup': 0}
+        self.urls_today = set()
+        self.bands_today = set()
+
+    def keep(self, item):
+        key = normalize_url(item.url)
+        if key and key in self.urls_today:
+            self.stats['same_day'] += 1
+            return False
+        if key and self.index.seen(key, self.date_str):
+            self.stats['earlier'] += 1
+            return False
+        if self.near_dup:
+            bands = title_bands(item.title)
+            if bands & self.bands_today or any(self.index.seen(band, self.date_str) for band in bands):
+                self.stats['near_dup'] += 1
+                return False
+            self.bands_today |= bands
+        if key:
+            self.urls_today.add(key)
+        self.stats['kept'] += 1
+        return True
+
+    def finish(self):
+        for key in self.urls_today:
+            self.index.add(key, self.date_str)
+        for band in self.bands_today:
+            self.index.add(band, self.date_str)
+        if not self.near_dup and self.urls_today and self.index.bands:
+            self.index.bands = False
+            self.index.changed = True
+        return self.stats
+
+def dedupe_results(results, date_str, index, near_dup=False):
+    """去掉当天重复和之前出现过的资讯，返回 (新的 results, 统计)
+
+    同一天内保留第一次出现的分类；near_dup 为真时标题近似的资讯也会被去掉。
+    """
+    deduper = Deduper(date_str, index, near_dup)
+    deduped = {cat_id: tuple(item for item in items if deduper.keep(item)) for cat_id, items in results.items()}
+    return deduped, deduper.finish()
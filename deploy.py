@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+AI 日报增量发布
+对比站点当前的文件和上次发布的清单，给出新增、修改、删除的文件及其内容哈希（deploy_delta.json），
+可以只把变化的文件放进一个暂存目录或 tar 包，交给支持增量上传的发布目标；
+也可以直接同步到一个本地目录（代替发布目标做测试），并报告上传的字节数占整站大小的比例
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+
+from core import SITE_DIR, is_state_file
+
+DEPLOY_MANIFEST = f"{SITE_DIR}/deploy_manifest.json"
+# 已暂存、尚未确认发布的清单；确认（--commit）后才替换 DEPLOY_MANIFEST
+PENDING_MANIFEST = DEPLOY_MANIFEST + '.pending'
+DEPLOY_DELTA = f"{SITE_DIR}/deploy_delta.json"
+DELTA_NAME = 'deploy_delta.json'
+DEPLOY_VERSION = 1
+# 发布自身的状态文件；构建状态文件见 core.STATE_FILES，都不对外发布
+DEPLOY_FILES = frozenset(('deploy_manifest.json', 'deploy_manifest.json.pending', DELTA_NAME))
+# 源码、缓存和临时文件
+SKIP_SUFFIXES = ('.py', '.pyc', '.tmp')
+SKIP_DIRS = frozenset(('__pycache__',))
+# 预压缩文件跟随原文件：状态文件的 .gz/.br 也不发布
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+HASH_CHUNK = 1 << 20
+
+def publishable(rel):
+    """相对站点根目录的路径是否要发布"""
+    name = rel.rsplit('/', 1)[-1]
+    if name.startswith('.') or name.endswith(SKIP_SUFFIXES):
+        return False
+    if rel.endswith(COMPRESSED_SUFFIXES):
+        rel = rel[:-3]
+    return rel not in DEPLOY_FILES and not is_state_file(rel)
+
+def file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def load_manifest(path=DEPLOY_MANIFEST):
+    """上次发布的文件：相对路径 -> {'sha256', 'size', 'mtime'}，没有发布过时为空"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == DEPLOY_VERSION:
+            return data['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def save_manifest(files, path=DEPLOY_MANIFEST):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'version': DEPLOY_VERSION, 'files': files}, ensure_ascii=False,
+                           separators=(',', ':'), sort_keys=True))
+    os.replace(path + '.tmp', path)
+
+def commit_pending():
+    """把暂存时记下的清单确认为已发布，返回是否有待确认的清单"""
+    if not os.path.exists(PENDING_MANIFEST):
+        return False
+    os.replace(PENDING_MANIFEST, DEPLOY_MANIFEST)
+    return True
+
+def scan(site_dir=SITE_DIR, previous=None):
+    """站点当前要发布的文件 {相对路径: {'sha256', 'size', 'mtime'}}
+
+    mtime 和大小与 previous 里相同的文件沿用其中的哈希，不重新读取。
+    """
+    previous = previous or {}
+    found = {}
+    for root, dirs, files in os.walk(site_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, site_dir).replace(os.sep, '/')
+            if not publishable(rel):
+                continue
+            st = os.stat(path)
+            entry = previous.get(rel)
+            if entry and (entry['mtime'], entry['size']) == (st.st_mtime_ns, st.st_size):
+                found[rel] = entry
+            else:
+                found[rel] = {'sha256': file_digest(path), 'size': st.st_size, 'mtime': st.st_mtime_ns}
+    return found
+
+def manifest_digest(files):
+    """整份清单的哈希：发布目标可以用它核对增量是在哪个版本上生成的"""
+    hasher = hashlib.sha256()
+    for rel in sorted(files):
+        hasher.update(f"{rel}\0{files[rel]['sha256']}\n".encode('utf-8'))
+    return hasher.hexdigest()
+
+def diff(previous, current):
+    """增量清单：新增、修改的文件带新的哈希和大小，删除的文件带上次发布的哈希"""
+    def row(entry):
+        return {'sha256': entry['sha256'], 'size': entry['size']}
+    return {
+        'version': DEPLOY_VERSION,
+        'base': manifest_digest(previous),
+        'target': manifest_digest(current),
+        'added': {rel: row(current[rel]) for rel in sorted(current) if rel not in previous},
+        'modified': {rel: row(current[rel]) for rel in sorted(current)
+                     if rel in previous and previous[rel]['sha256'] != current[rel]['sha256']},
+        'deleted': {rel: {'sha256': previous[rel]['sha256']} for rel in sorted(previous) if rel not in current},
+        'total_files': len(current),
+        'total_bytes': sum(entry['size'] for entry in current.values())
+    }
+
+def changed(delta):
+    """需要上传的文件（新增和修改）"""
+    return sorted([*delta['added'], *delta['modified']])
+
+def staged_bytes(delta):
+    return sum(row['size'] for row in (*delta['added'].values(), *delta['modified'].values()))
+
+def write_delta(delta, path=DEPLOY_DELTA):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(delta, ensure_ascii=False, indent=2))
+    os.replace(path + '.tmp', path)
+
+def _outside_site(path, site_dir):
+    """暂存目录和 tar 包不能放在站点目录里，否则下次会被当成站点文件"""
+    path, site_dir = os.path.realpath(path), os.path.realpath(site_dir)
+    if os.path.commonpath([path, site_dir]) == site_dir:
+        raise SystemExit(f"❌ {path} 在站点目录 {site_dir} 里面，请换一个位置")
+
+def stage_dir(delta, out_dir, site_dir=SITE_DIR):
+    """把变化的文件按原来的相对路径复制到 out_dir，并写入 deploy_delta.json
+
+    out_dir 已存在时必须是空目录或之前的暂存目录（含 deploy_delta.json），会先清空。
+    """
+    _outside_site(out_dir, site_dir)
+    if os.path.isdir(out_dir) and os.listdir(out_dir):
+        if not os.path.exists(os.path.join(out_dir, DELTA_NAME)):
+            raise SystemExit(f"❌ {out_dir} 不是空目录，也不是之前的暂存目录")
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    for rel in changed(delta):
+        dest = os.path.join(out_dir, rel)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copy2(os.path.join(site_dir, rel), dest)
+    write_delta(delta, os.path.join(out_dir, DELTA_NAME))
+
+def write_tarball(delta, path, site_dir=SITE_DIR):
+    """变化的文件加上 deploy_delta.json 打成 .tar.gz（按路径排序，属主和权限固定）"""
+    _outside_site(path, site_dir)
+    def normalize(info):
+        info.uid = info.gid = 0
+        info.uname = info.gname = ''
+        info.mode = 0o644
+        return info
+    with tarfile.open(path + '.tmp', 'w:gz') as tar:
+        for rel in changed(delta):
+            tar.add(os.path.join(site_dir, rel), arcname=rel, filter=normalize)
+        data = json.dumps(delta, ensure_ascii=False, indent=2).encode('utf-8')
+        info = normalize(tarfile.TarInfo(DELTA_NAME))
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    os.replace(path + '.tmp', path)
+
+def apply(delta, target, site_dir=SITE_DIR):
+    """把增量同步到本地目录（代替发布目标）：复制变化的文件，删除已删除的文件和因此变空的目录"""
+    for rel in changed(delta):
+        dest = os.path.join(target, rel)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copy2(os.path.join(site_dir, rel), dest + '.tmp')
+        os.replace(dest + '.tmp', dest)
+    for rel in delta['deleted']:
+        path = os.path.join(target, rel)
+        if os.path.exists(path):
+            os.remove(path)
+        parent = os.path.dirname(path)
+        while os.path.abspath(parent) != os.path.abspath(target) and os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+def verify(target, files):
+    """核对发布目标和清单是否一致，返回不一致的相对路径（缺失、多余或内容不同）"""
+    found = scan(target)
+    return sorted(
+        rel for rel in set(found) | set(files)
+        if rel not in found or rel not in files or found[rel]['sha256'] != files[rel]['sha256']
+    )
+
+def prepare(site_dir=SITE_DIR, stage=None, tarball=None):
+    """计算增量并写出 deploy_delta.json，按需暂存；返回 (增量, 当前清单)
+
+    当前清单记为待确认的发布清单，发布成功后用 commit_pending() 确认，
+    没有确认时下次仍和上次确认发布的清单比较，增量会累积。
+    """
+    previous = load_manifest()
+    current = scan(site_dir, previous)
+    delta = diff(previous, current)
+    write_delta(delta)
+    if stage:
+        stage_dir(delta, stage, site_dir)
+    if tarball:
+        write_tarball(delta, tarball, site_dir)
+    save_manifest(current, PENDING_MANIFEST)
+    return delta, current
+
+def print_report(delta):
+    total = delta['total_bytes']
+    size = staged_bytes(delta)
+    print(f"   - 新增 {len(delta['added'])} 个, 修改 {len(delta['modified'])} 个, 删除 {len(delta['deleted'])} 个文件")
+    print(f"   - 上传 {size} 字节 / 整站 {total} 字节 ({delta['total_files']} 个文件), "
+          f"占 {size / total * 100 if total else 0:.2f}%")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比上次发布的清单，列出并暂存变化的站点文件")
+    parser.add_argument('--stage', metavar='DIR', help="把变化的文件复制到这个目录（连同 deploy_delta.json）")
+    parser.add_argument('--tarball', metavar='PATH', help="把变化的文件打成 .tar.gz")
+    parser.add_argument('--apply', metavar='TARGET', help="把增量同步到本地目录并核对，成功后确认发布")
+    parser.add_argument('--commit', action='store_true', help="确认上次暂存的增量已经发布")
+    args = parser.parse_args(argv)
+
+    if args.commit and not (args.stage or args.tarball or args.apply):
+        print("✅ 已确认发布" if commit_pending() else "⚠️ 没有待确认的增量")
+        return
+
+    delta, current = prepare(stage=args.stage, tarball=args.tarball)
+    print(f"✅ 增量发布 ({DEPLOY_DELTA}):")
+    print_report(delta)
+    if args.apply:
+        apply(delta, args.apply)
+        mismatched = verify(args.apply, current)
+        if mismatched:
+            raise SystemExit('\n'.join([f"❌ {args.apply} 与站点有 {len(mismatched)} 个文件不一致:"]
+                                       + [f"   {rel}" for rel in mismatched[:20]]))
+        print(f"   - 已同步到 {args.apply} 并核对一致")
+    if args.apply or args.commit:
+        commit_pending()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+AI 日报站点图标
+把全部资讯的域名去重后每个域名只抓取一次图标，缓存在磁盘上并按期限过期，
+再写成一个带内容哈希的 data URI 样式表，卡片按 class 引用，页面不再逐张请求第三方图标
+"""
+
+import argparse
+import asyncio
+import base64
+import http.client
+import re
+import time
+from collections import Counter
+from urllib.parse import quote
+
+import assets
+from core import SITE_DIR, extract_domain, load_search_results, open_output
+from fetch_summaries import USER_AGENT, ResponseCache, SummaryFetcher
+
+FAVICON_CACHE_DIR = f"{SITE_DIR}/.favicon_cache"
+# {domain} 会被替换为域名；测试时可指向本地桩服务器，如 http://127.0.0.1:8000/{domain}.png
+FAVICON_SOURCE = "https://www.google.com/s2/favicons?domain={domain}&sz=32"
+FAVICON_TTL = 30 * 86400
+# 抓取失败的域名过一天再试
+FAILED_TTL = 86400
+# 超过这个大小的图标不内联，卡片显示占位图标
+MAX_ICON_BYTES = 8192
+
+CLASS_RE = re.compile(r'[^a-z0-9]+')
+IMAGE_TYPE_RE = re.compile(r'^image/[\w.+-]+$')
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 32 32">'
+    '<rect width="32" height="32" rx="6" fill="#27272a"/>'
+    '<text x="16" y="21" font-size="13" font-family="sans-serif" text-anchor="middle" fill="#a1a1aa">AI</text></svg>'
+)
+BASE_CSS = (
+    '.card-favicon{display:inline-block;flex:none;width:20px;height:20px;border-radius:4px;'
+    f'background:url("data:image/svg+xml,{quote(PLACEHOLDER_SVG)}") center/cover no-repeat}}'
+)
+
+def favicon_class(domain):
+    """卡片引用图标的 class，没有域名时为空（只显示占位图标）"""
+    slug = CLASS_RE.sub('-', domain.lower()).strip('-')
+    return f"fav-{slug}" if slug else ''
+
+def collect_domains(items):
+    """全部资讯的域名及出现次数"""
+    return Counter(domain for domain in (extract_domain(item.url) for item in items) if domain)
+
+class FaviconFetcher(SummaryFetcher):
+    """按域名抓取图标：沿用摘要抓取的连接池、限速和重试，缓存未过期时不发请求
+
+    offline 为真时只使用缓存（过期的也用），缓存里没有的域名显示占位图标。
+    """
+    def __init__(self, cache, source=FAVICON_SOURCE, ttl=FAVICON_TTL, offline=False, **kwargs):
+        super().__init__(cache, **kwargs)
+        self.source = source
+        self.ttl = ttl
+        self.offline = offline
+        self.origins = {}
+
+    def _fresh(self, entry, now):
+        ttl = self.ttl if entry.get('data') else FAILED_TTL
+        return now - entry.get('fetched_at', 0) < ttl
+
+    async def fetch(self, domain):
+        """返回域名的缓存条目（data 为空表示没有可用图标），来源记录在 origins 里"""
+        self.stats['requested'] += 1
+        cached = self.cache.get(domain)
+        if cached and (self.offline or self._fresh(cached, time.time())):
+            self.stats['cache_hits'] += 1
+            self.origins[domain] = 'cache'
+            return cached
+        if self.offline:
+            self.origins[domain] = 'missing'
+            return None
+
+        url = self.source.format(domain=domain)
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'image/*'}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        async with self.concurrency:
+            try:
+                status, resp_headers, body = await self._get(url, headers)
+            except (OSError, http.client.HTTPException, ValueError):
+                status, resp_headers, body = None, {}, b''
+
+        if status == 304 and cached:
+            self.stats['cache_hits'] += 1
+            self.stats['revalidated'] += 1
+            self.origins[domain] = 'cache'
+            entry = dict(cached, fetched_at=time.time())
+            self.cache.put(domain, entry)
+            return entry
+
+        content_type = resp_headers.get('content-type', '').split(';')[0].strip()
+        if status != 200 or not IMAGE_TYPE_RE.match(content_type) or len(body) > MAX_ICON_BYTES:
+            self.stats['failed'] += 1
+            self.origins[domain] = 'failed'
+            if cached and cached.get('data'):
+                # 沿用旧图标，过一天再试
+                entry = dict(cached, fetched_at=time.time() - self.ttl + FAILED_TTL)
+            else:
+                entry = {'domain': domain, 'data': '', 'size': 0, 'fetched_at': time.time()}
+            self.cache.put(domain, entry)
+            return entry
+
+        self.stats['fetched'] += 1
+        self.stats['bytes'] += len(body)
+        self.origins[domain] = 'fetched'
+        entry = {
+            'domain': domain,
+            'url': url,
+            'etag': resp_headers.get('etag', ''),
+            'last_modified': resp_headers.get('last-modified', ''),
+            'type': content_type,
+            'data': base64.b64encode(body).decode('ascii'),
+            'size': len(body),
+            'fetched_at': time.time()
+        }
+        self.cache.put(domain, entry)
+        return entry
+
+async def _fetch_all(fetcher, domains):
+    return await asyncio.gather(*(fetcher.fetch(domain) for domain in domains))
+
+def load_favicons(domains, cache_dir=FAVICON_CACHE_DIR, source=FAVICON_SOURCE, offline=False,
+                  ttl=FAVICON_TTL, concurrency=16, timeout=5.0, retries=1):
+    """抓取（或从缓存读取）每个域名的图标
+
+    返回 (icons, fetcher)：icons 为 {域名: 缓存条目}，只包含有图标数据的域名；
+    fetcher.stats 和 fetcher.origins 记录命中、抓取和失败情况。
+    """
+    fetcher = FaviconFetcher(
+        ResponseCache(cache_dir), source=source, ttl=ttl, offline=offline,
+        concurrency=concurrency, per_host=4, rate=0, timeout=timeout, retries=retries)
+    domains = sorted(domains)
+    try:
+        entries = asyncio.run(_fetch_all(fetcher, domains)) if domains else []
+    finally:
+        fetcher.close()
+    icons = {domain: entry for domain, entry in zip(domains, entries) if entry and entry.get('data')}
+    return icons, fetcher
+
+def favicon_css(icons):
+    """占位图标的基础规则加上每个域名一条 data URI 规则（按域名排序，相同图标得到相同内容）"""
+    rules = [BASE_CSS]
+    for domain in sorted(icons):
+        entry = icons[domain]
+        rules.append(f".{favicon_class(domain)}{{background-image:url(data:{entry['type']};base64,{entry['data']})}}")
+    return '\n'.join(rules) + '\n'
+
+def write_favicon_css(icons, prune=False):
+    """写入 assets/favicons.<hash>.css，返回页面引用的相对路径"""
+    text = favicon_css(icons)
+    filename = assets.fingerprint('favicons', text)
+    with open_output(f"{assets.ASSET_DIR}/{filename}") as out:
+        out.write(text)
+    if prune:
+        assets.prune_stylesheets(['favicons'], {filename})
+    return f"assets/{filename}"
+
+def page_savings(items, icons, origins):
+    """一个页面上的卡片数、不同域名数、本次构建从缓存取到的图标数，
+    以及原先逐张请求第三方图标需要的请求数和字节数（浏览器对同一 URL 只请求一次）"""
+    domains = collect_domains(items)
+    return {
+        'cards': len(items),
+        'domains': len(domains),
+        'cache_hits': sum(1 for domain in domains if origins.get(domain) == 'cache'),
+        'requests_saved': len(domains),
+        'bytes_saved': sum(icons[domain]['size'] for domain in domains if domain in icons)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="抓取资讯域名的图标并写出 data URI 样式表")
+    parser.add_argument('domains', nargs='*', help="要抓取的域名，默认取 search_results.json 里的全部域名")
+    parser.add_argument('--source', default=FAVICON_SOURCE, help="图标地址模板，{domain} 替换为域名")
+    parser.add_argument('--cache-dir', default=FAVICON_CACHE_DIR)
+    parser.add_argument('--ttl', type=float, default=FAVICON_TTL / 86400, help="缓存有效天数")
+    parser.add_argument('--offline', action='store_true', help="只使用缓存，不发请求")
+    args = parser.parse_args(argv)
+
+    if args.domains:
+        domains = args.domains
+    else:
+        domains = collect_domains(item for items in load_search_results().values() for item in items)
+    start = time.perf_counter()
+    icons, fetcher = load_favicons(domains, args.cache_dir, args.source, args.offline, args.ttl * 86400)
+    href = write_favicon_css(icons)
+    stats = fetcher.stats
+    print(f"✅ 图标: {len(domains)} 个域名, 用时 {time.perf_counter() - start:.2f}s, 写出 {href}")
+    print(f"📦 缓存命中 {stats['cache_hits']} (其中 304 {stats['revalidated']}), "
+          f"新抓取 {stats['fetched']} ({stats['bytes']} 字节), 失败 {stats['failed']}, "
+          f"占位 {len(domains) - len(icons)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,387 @@
 #!/usr/bin/env python3
 """
 获取新闻详情并生成摘要
+并发抓取每条资讯的 URL，按主机限制连接数和速率，结果缓存在磁盘上
 """
+import argparse
+import asyncio
+import hashlib
+import http.client
 import json
 import os
 import re
+import time
+from collections.abc import Iterator
+from html import unescape
+from itertools import islice
+from urllib.parse import urljoin, urlsplit
 
-SEARCH_RESULTS = "/Users/alex/.openclaw/workspace/ai-daily-news/search_results.json"
-OUTPUT_FILE = "/Users/alex/.openclaw/workspace/ai-daily-news/search_results.json"
+from core import SEARCH_RESULTS, SITE_DIR, clean_text, iter_search_groups
 
-def clean_text(text):
-    """清理文本"""
-    if not text:
-        return ""
-    # 移除 HTML 标签
-    text = re.sub(r'<[^>]+>', '', text)
-    # 移除多余空白
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+OUTPUT_FILE = SEARCH_RESULTS
+FETCH_CACHE_DIR = f"{SITE_DIR}/.fetch_cache"
+USER_AGENT = "Mozilla/5.0 (compatible; ai-daily-news/1.0)"
+MAX_REDIRECTS = 5
+SUMMARY_LENGTH = 300
+# 流式处理时每批并发抓取、写出的资讯条数，内存只保留一批
+FETCH_BATCH = 500
+
+META_DESCRIPTION_RE = re.compile(
+    r'<meta[^>]+(?:name|property)=["\'](?:og:description|description|twitter:description)["\'][^>]*>', re.I)
+# 属性值以同一种引号结束：双引号里的撇号（OpenAI's）不会截断摘要
+META_CONTENT_RE = re.compile(r'content=(["\'])(.*?)\1', re.I | re.S)
+PARAGRAPH_RE = re.compile(r'<p[^>]*>(.*?)</p>', re.I | re.S)
+SCRIPT_RE = re.compile(r'<(script|style|noscript)[^>]*>.*?</\1>', re.I | re.S)
+CHARSET_RE = re.compile(r'charset=([\w-]+)', re.I)
+
+def extract_summary(html):
+    """从页面中提取摘要：优先 meta description，其次是正文前几段"""
+    for tag in META_DESCRIPTION_RE.findall(html):
+        match = META_CONTENT_RE.search(tag)
+        if match:
+            summary = clean_text(match.group(2))
+            if summary:
+                break
+    else:
+        html = SCRIPT_RE.sub('', html)
+        paragraphs = [clean_text(p) for p in PARAGRAPH_RE.findall(html)]
+        summary = ' '.join(p for p in paragraphs if len(p) > 40)
+    # 解码全部命名和数字实体（&#8217;、&nbsp; 等），不间断空格等一并按空白合并
+    summary = ' '.join(unescape(summary).split())
+    if len(summary) > SUMMARY_LENGTH:
+        summary = summary[:SUMMARY_LENGTH] + '...'
+    return summary
 
 def load_results():
-    """加载搜索结果"""
-    with open(SEARCH_RESULTS, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_results(results):
-    """保存搜索结果"""
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-
-def main():
-    print("📋 注意：摘要提取需要使用 web_fetch 工具在 AI 环境中运行")
-    print("当前脚本只是展示数据结构...")
-    
-    results = load_results()
-    
-    # 显示数据结构
-    categories = ['news', 'tech', 'tutorial', 'fun']
-    for cat in categories:
-        items = results.get(cat, [])
-        print(f"\n{cat}: {len(items)} 条")
-        for item in items[:2]:  # 只显示前2条
+    """按分类逐组读取搜索结果，产出 (分类, 值)，列表值为逐条解析的生成器"""
+    return iter_search_groups(SEARCH_RESULTS)
+
+def _indent(text, prefix):
+    # json.dumps 的输出里换行只出现在缩进处（字符串中的换行已转义）
+    return text.replace('\n', '\n' + prefix)
+
+def _batches(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+_LIST = object()
+
+class ResultsWriter:
+    """逐条写出搜索结果：.json 与 json.dump(results, indent=2) 的输出逐字节相同，.jsonl 每行一条"""
+    def __init__(self, f, jsonl=False):
+        self.f = f
+        self.jsonl = jsonl
+        self.groups = 0
+        self.items = 0
+
+    def begin(self):
+        if not self.jsonl:
+            self.f.write('{')
+
+    def group(self, key, value=_LIST):
+        """开始一个分类；传入 value 时直接写出这个非列表的值"""
+        if self.jsonl:
+            return
+        self.f.write((',' if self.groups else '') + '\n  ' + json.dumps(key, ensure_ascii=False) + ': ')
+        self.groups += 1
+        self.items = 0
+        if value is _LIST:
+            self.f.write('[')
+        else:
+            self.f.write(_indent(json.dumps(value, ensure_ascii=False, indent=2), '  '))
+
+    def item(self, item):
+        if self.jsonl:
+            self.f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            return
+        self.f.write((',' if self.items else '') + '\n    ' + _indent(json.dumps(item, ensure_ascii=False, indent=2), '    '))
+        self.items += 1
+
+    def end_group(self):
+        if not self.jsonl:
+            self.f.write('\n  ]' if self.items else ']')
+
+    def end(self):
+        if not self.jsonl:
+            self.f.write('\n}' if self.groups else '}')
+
+class ResponseCache:
+    """磁盘响应缓存：每个 URL 一个文件，保存摘要和 ETag/Last-Modified"""
+    def __init__(self, cache_dir=FETCH_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, entry):
+        path = self._path(url)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+class HostPool:
+    """单个主机的 keep-alive 连接池、并发上限和最小请求间隔"""
+    def __init__(self, scheme, netloc, limit, interval, timeout):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self.interval = interval
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = []
+        self.created = 0
+        self.next_slot = 0.0
+        self.latencies = []
+
+    def acquire(self):
+        if self.idle:
+            return self.idle.pop()
+        self.created += 1
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.netloc, timeout=self.timeout)
+
+    def release(self, conn, reusable):
+        if reusable:
+            self.idle.append(conn)
+        else:
+            conn.close()
+
+    async def wait_turn(self):
+        # 速率限制：同一主机两次请求的开始时间至少间隔 interval 秒
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle = []
+
+def _request(conn, path, headers):
+    """在线程中执行一次阻塞的 HTTP 请求"""
+    conn.request('GET', path, headers=headers)
+    resp = conn.getresponse()
+    body = resp.read()
+    reusable = not resp.will_close
+    return resp.status, dict((k.lower(), v) for k, v in resp.getheaders()), body, reusable
+
+class SummaryFetcher:
+    """并发抓取摘要：全局并发上限 + 每主机连接池，失败重试，响应写入磁盘缓存"""
+    def __init__(self, cache, concurrency=16, per_host=2, rate=4.0, timeout=10.0, retries=2, revalidate=False):
+        self.cache = cache
+        self.concurrency = asyncio.Semaphore(concurrency)
+        self.per_host = per_host
+        self.interval = 1.0 / rate if rate else 0.0
+        self.timeout = timeout
+        self.retries = retries
+        self.revalidate = revalidate
+        self.pools = {}
+        self.stats = {'requested': 0, 'cache_hits': 0, 'revalidated': 0, 'fetched': 0, 'failed': 0, 'bytes': 0}
+
+    def _pool(self, scheme, netloc):
+        key = (scheme, netloc)
+        if key not in self.pools:
+            self.pools[key] = HostPool(scheme, netloc, self.per_host, self.interval, self.timeout)
+        return self.pools[key]
+
+    async def _get(self, url, headers):
+        """带重定向和重试的 GET，返回 (status, headers, body)"""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            pool = self._pool(parts.scheme, parts.netloc)
+            path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+            for attempt in range(self.retries + 1):
+                async with pool.semaphore:
+                    await pool.wait_turn()
+                    conn = pool.acquire()
+                    start = time.perf_counter()
+                    try:
+                        status, resp_headers, body, reusable = await asyncio.to_thread(
+                            _request, conn, path, dict(headers, Host=parts.netloc))
+                    except (OSError, http.client.HTTPException):
+                        conn.close()
+                        if attempt == self.retries:
+                            raise
+                        await asyncio.sleep(0.5 * 2 ** attempt)
+                        continue
+                    pool.latencies.append(time.perf_counter() - start)
+                    pool.release(conn, reusable)
+                if (status == 429 or status >= 500) and attempt < self.retries:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    continue
+                break
+            if status in (301, 302, 303, 307, 308) and 'location' in resp_headers:
+                url = urljoin(url, resp_headers['location'])
+                continue
+            return status, resp_headers, body
+        return status, resp_headers, body
+
+    async def fetch(self, url):
+        """返回 URL 的摘要；已缓存的 URL 默认不再请求"""
+        self.stats['requested'] += 1
+        cached = self.cache.get(url)
+        if cached and not self.revalidate:
+            self.stats['cache_hits'] += 1
+            return cached['summary']
+
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        async with self.concurrency:
+            try:
+                status, resp_headers, body = await self._get(url, headers)
+            except (OSError, http.client.HTTPException, ValueError):
+                self.stats['failed'] += 1
+                return cached['summary'] if cached else ''
+
+        if status == 304 and cached:
+            self.stats['cache_hits'] += 1
+            self.stats['revalidated'] += 1
+            return cached['summary']
+        if status != 200:
+            self.stats['failed'] += 1
+            return cached['summary'] if cached else ''
+
+        self.stats['fetched'] += 1
+        self.stats['bytes'] += len(body)
+        match = CHARSET_RE.search(resp_headers.get('content-type', ''))
+        try:
+            html = body.decode(match.group(1) if match else 'utf-8', errors='replace')
+        except LookupError:
+            html = body.decode('utf-8', errors='replace')
+        summary = extract_summary(html)
+        self.cache.put(url, {
+            'url': url,
+            'etag': resp_headers.get('etag', ''),
+            'last_modified': resp_headers.get('last-modified', ''),
+            'summary': summary,
+            'fetched_at': time.time()
+        })
+        return summary
+
+    def host_latency(self):
+        """每个主机的请求数、平均和最大延迟（毫秒）"""
+        report = {}
+        for (_, netloc), pool in sorted(self.pools.items()):
+            if pool.latencies:
+                report[netloc] = {
+                    'requests': len(pool.latencies),
+                    'connections': pool.created,
+                    'avg_ms': round(sum(pool.latencies) / len(pool.latencies) * 1000, 1),
+                    'max_ms': round(max(pool.latencies) * 1000, 1)
+                }
+        return report
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+async def fill_summaries(items, fetcher, force=False):
+    """为一批资讯中缺少摘要的并发抓取摘要，直接写回 items，返回填充条数"""
+    targets = [
+        item for item in items
+        if item.get('url', '').startswith(('http://', 'https://')) and (force or not item.get('summary'))
+    ]
+    summaries = await asyncio.gather(*(fetcher.fetch(item['url']) for item in targets))
+    filled = 0
+    for item, summary in zip(targets, summaries):
+        if summary:
+            item['summary'] = summary
+            filled += 1
+    return filled
+
+async def fill_results(groups, fetcher, writer, force=False, batch_size=FETCH_BATCH):
+    """逐组、逐批填充摘要并立即写出，返回填充条数"""
+    filled = 0
+    writer.begin()
+    for key, items in groups:
+        if not isinstance(items, (list, Iterator)):
+            writer.group(key, items)
+            continue
+        writer.group(key)
+        for batch in _batches(items, batch_size):
+            filled += await fill_summaries(batch, fetcher, force)
+            for item in batch:
+                writer.item(item)
+        writer.end_group()
+    writer.end()
+    return filled
+
+def show_structure(groups):
+    """显示数据结构"""
+    for cat, items in groups:
+        if not isinstance(items, (list, Iterator)):
+            continue
+        count = 0
+        first = []
+        for item in items:
+            count += 1
+            if len(first) < 2:  # 只显示前2条
+                first.append(item)
+        print(f"\n{cat}: {count} 条")
+        for item in first:
             print(f"  - {item.get('title', '')[:50]}...")
             print(f"    URL: {item.get('url', '')}")
-            print(f"    现有摘要: {item.get('snippet', '')[:80]}...")
+            print(f"    现有摘要: {(item.get('summary', '') or item.get('snippet', ''))[:80]}...")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发抓取资讯摘要")
+    parser.add_argument('--concurrency', type=int, default=16, help="全局并发请求数")
+    parser.add_argument('--per-host', type=int, default=2, help="每个主机的最大连接数")
+    parser.add_argument('--rate', type=float, default=4.0, help="每个主机每秒最多发起的请求数，0 表示不限")
+    parser.add_argument('--timeout', type=float, default=10.0, help="单次请求超时（秒）")
+    parser.add_argument('--retries', type=int, default=2, help="失败重试次数")
+    parser.add_argument('--revalidate', action='store_true', help="用 ETag/Last-Modified 向服务器确认缓存是否过期")
+    parser.add_argument('--force', action='store_true', help="已有摘要的资讯也重新填充")
+    parser.add_argument('--cache-dir', default=FETCH_CACHE_DIR)
+    parser.add_argument('--show', action='store_true', help="只显示数据结构，不抓取")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        show_structure(load_results())
+        return
+
+    fetcher = SummaryFetcher(
+        ResponseCache(args.cache_dir), concurrency=args.concurrency, per_host=args.per_host,
+        rate=args.rate, timeout=args.timeout, retries=args.retries, revalidate=args.revalidate)
+    start = time.perf_counter()
+    # 边读边写到临时文件，全部完成后替换原文件（输入和输出是同一个文件）
+    tmp = OUTPUT_FILE + '.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            writer = ResultsWriter(f, jsonl=OUTPUT_FILE.endswith('.jsonl'))
+            filled = asyncio.run(fill_results(load_results(), fetcher, writer, force=args.force))
+        os.replace(tmp, OUTPUT_FILE)
+    finally:
+        fetcher.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    elapsed = time.perf_counter() - start
+
+    stats = fetcher.stats
+    hit_rate = stats['cache_hits'] / stats['requested'] if stats['requested'] else 0.0
+    print(f"✅ 填充摘要 {filled} 条 / 请求 {stats['requested']} 个 URL, 用时 {elapsed:.2f}s "
+          f"({stats['requested'] / elapsed if elapsed else 0:.1f} 条/s)")
+    print(f"📦 缓存命中 {stats['cache_hits']} ({hit_rate:.0%}), 其中 304 {stats['revalidated']}, "
+          f"新抓取 {stats['fetched']} ({stats['bytes'] // 1024} KB), 失败 {stats['failed']}")
+    for host, row in fetcher.host_latency().items():
+        print(f"   - {host}: {row['requests']} 次, {row['connections']} 个连接, "
+              f"平均 {row['avg_ms']} ms, 最大 {row['max_ms']} ms")
 
 if __name__ == "__main__":
     main()
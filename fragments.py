@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+AI 日报页面片段缓存
+按内容寻址的 HTML 片段：进程内 LRU，可选的磁盘存储让未变化的资讯跨构建也不必重新渲染
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+class FragmentCache:
+    """内容寻址的片段缓存
+
+    key 是决定片段内容的字段组成的元组，进程内直接用它查 LRU；
+    LRU 未命中时再按 key 的摘要查磁盘存储（cache_dir/xx.json，按摘要前两位分片），
+    仍未命中才调用 render。version 参与摘要计算，模板改动后递增即可让旧片段全部失效。
+    """
+    def __init__(self, maxsize=32768, cache_dir=None, version=1):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.version = version
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._lru = OrderedDict()
+        self._shards = {}
+        self._pending = {}
+
+    def configure(self, cache_dir=None, version=None):
+        """切换磁盘存储目录（None 表示只用内存）"""
+        self.cache_dir = cache_dir
+        if version is not None:
+            self.version = version
+        self._shards = {}
+        self._pending = {}
+
+    def digest(self, key):
+        raw = '\x1f'.join((str(self.version), *key))
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _shard(self, name):
+        if name not in self._shards:
+            try:
+                with open(os.path.join(self.cache_dir, f"{name}.json"), 'r', encoding='utf-8') as f:
+                    self._shards[name] = json.load(f)
+            except (OSError, ValueError):
+                self._shards[name] = {}
+        return self._shards[name]
+
+    def get(self, key, render):
+        """返回 key 对应的片段，未缓存时调用 render() 生成"""
+        html = self._lru.get(key)
+        if html is not None:
+            self._lru.move_to_end(key)
+            self.stats['hits'] += 1
+            return html
+
+        digest = None
+        if self.cache_dir:
+            digest = self.digest(key)
+            html = self._shard(digest[:2]).get(digest)
+        if html is not None:
+            self.stats['disk_hits'] += 1
+        else:
+            html = render()
+            self.stats['misses'] += 1
+            if digest:
+                self._shard(digest[:2])[digest] = html
+                self._pending.setdefault(digest[:2], {})[digest] = html
+
+        self._lru[key] = html
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+        return html
+
+    def flush(self):
+        """把新渲染的片段写入磁盘；先合并磁盘上的现有分片，多个进程同时写也不会互相覆盖"""
+        if not self.cache_dir or not self._pending:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name, entries in self._pending.items():
+            path = os.path.join(self.cache_dir, f"{name}.json")
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    shard = json.load(f)
+            except (OSError, ValueError):
+                shard = {}
+            shard.update(entries)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(shard, ensure_ascii=False, separators=(',', ':')))
+            os.replace(tmp, path)
+            self._shards[name] = shard
+        self._pending = {}
+
+    def take_stats(self):
+        """取出并清零计数（子进程把计数交给主进程汇总）"""
+        stats = dict(self.stats)
+        for k in self.stats:
+            self.stats[k] = 0
+        return stats
+
+    def add_stats(self, stats):
+        for k, v in stats.items():
+            self.stats[k] += v
+
+    def clear(self):
+        """清空内存中的 LRU 和已加载分片，计数一并清零"""
+        self._lru.clear()
+        self._shards = {}
+        self.take_stats()
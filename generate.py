@@ -4,477 +4,921 @@ AI 日报生成脚本 - 完整版
 包含：每日存档、分类页面、归档索引、搜索功能
 """
 
+import argparse
+import cProfile
+import hashlib
 import json
 import os
+import pickle
 import re
-from datetime import datetime, timedelta
-import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import chain, islice
+
+import assets
+import catalog
+import compress
+import core
+import deploy
+import dedup
+import favicons
+import fragments
+import generate_rss
+import locales
+import related
+import search
+from core import (
+    ARCHIVE_DIR, CATEGORIES, DATA_DIR, INPUT_STATS, OUTPUT_STATS, SEARCH_RESULTS, SITE_DIR,
+    BuildContext, Item, extract_domain, iter_search_results, iter_snapshot_file,
+    load_day_snapshot, load_history, load_output_manifest, load_search_results, open_output,
+    parse_day_snapshot, read_input, record_output, save_output_manifest, snapshot_line, write_day_snapshot
+)
+from catalog import ARCHIVE_CATALOG, load_catalog, save_catalog
+from instrument import REPORT
 
 # 配置
-SEARCH_RESULTS = "/Users/alex/.openclaw/workspace/ai-daily-news/search_results.json"
-ARCHIVE_DIR = "/Users/alex/.openclaw/workspace/ai-daily-news/archives"
-CATEGORIES = {
-    'news': ('📰 新闻', 'category-news'),
-    'tech': ('💻 技术', 'category-tech'),
-    'products': ('🚀 产品', 'category-products'),
-    'funding': ('💰 融资', 'category-funding'),
-    'people': ('👤 人物', 'category-people'),
-    'opinions': ('💡 观点', 'category-opinions'),
-    'tutorial': ('📚 教程', 'category-tutorial'),
-    'fun': ('🎉 趣闻', 'category-fun')
-}
-
-def load_search_results():
-    """加载搜索结果"""
-    if os.path.exists(SEARCH_RESULTS):
-        with open(SEARCH_RESULTS, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {cat: [] for cat in CATEGORIES.keys()}
-
-def extract_domain(url):
-    try:
-        from urllib.parse import urlparse
-        return urlparse(url).netloc.replace('www.', '')
-    except:
-        return ''
+SEARCH_DIR = search.SEARCH_DIR
+SEARCH_INDEX_MANIFEST = f"{SITE_DIR}/search_index_manifest.json"
+SEARCH_INDEX_MANIFEST_VERSION = 2
+URL_INDEX = f"{SITE_DIR}/url_index.json"
+# 常驻内存的搜索索引和清单，同一进程里再次生成（watch 模式）时只处理变化的快照和分片
+SEARCH_INDEX = search.IndexBuilder()
+_search_index_manifest = None
+URL_KEYS = {}
+# 常驻内存的相关报道索引，新的一天只计算当天的资讯
+RELATED = related.RelatedIndex()
+URL_INDEXES = {}
+# watch 模式的轮询间隔，以及发现变化后等待文件写完的时间（秒）
+WATCH_INTERVAL = 0.2
+WATCH_SETTLE = 0.05
+CARD_CACHE_DIR = f"{SITE_DIR}/.card_cache"
+# 修改 generate_card 模板时递增，磁盘上的旧卡片片段随之失效
+CARD_VERSION = 2
+CARD_CACHE = fragments.FragmentCache(version=CARD_VERSION)
+PAGE_KEYS = f"{SITE_DIR}/page_keys.json"
+BUILD_REPORT = f"{SITE_DIR}/build_report.json"
+PROFILE_FILE = f"{SITE_DIR}/build.prof"
+# 本次构建的图标统计（抓取情况和每个页面省下的请求），写入构建报告
+FAVICON_REPORT = {}
+FAVICON_DOMAINS = set()
+# 各语言版本子进程的耗时和写入文件数，写入构建报告
+EDITION_REPORT = {}
+# 主页首屏文档大小和延迟加载的卡片分块，写入构建报告
+MAIN_PAGE_REPORT = {}
+CHUNK_DIR = f"{SITE_DIR}/chunks"
+# 分页：分类页和每日存档每页条数、主页每个分类最多显示的条数
+PAGE_SIZE = 50
+MAIN_PAGE_LIMIT = 12
+# 主页每个分类直接写在页面里的条数，其余（到 MAIN_PAGE_LIMIT 为止）滚动到附近或点击时再加载
+MAIN_PAGE_INITIAL = 4
+# 流式构建时每批渲染的页面数，内存里只保留这一批页面的资讯
+STREAM_BATCH = 64
+# 页面模板都在这两个文件里，任一改动都会让已记录的页面键失效
+with open(__file__, 'rb') as _f, open(core.__file__, 'rb') as _g, open(locales.__file__, 'rb') as _h:
+    TEMPLATE_DIGEST = hashlib.blake2b(_f.read() + _g.read() + _h.read(), digest_size=16).hexdigest()
+# 页面引用的样式表（相对站点根目录），由 configure_stylesheets 设置
+STYLESHEETS = assets.stylesheet_hrefs()
+# 页面文字和当前版本（主站 edition 为空），由 configure_locale 设置；
+# links 为主页上切换到各版本的 (链接, 名称)
+T = dict(locales.MESSAGES[locales.DEFAULT_LANG])
+LOCALE = {'lang': locales.DEFAULT_LANG, 'edition': '', 'links': ()}
+DATE_PAGE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}\.html$')
+SNAPSHOT_RE = re.compile(r'^\d{4}-\d{2}-\d{2}\.jsonl$')
+# 按月、按年的汇总页（相对站点根目录）
+ROLLUP_PAGE_RE = re.compile(r'^archives/\d{4}(-\d{2})?\.html$')
+# 构建任务：output 为输出文件，inputs 为它依赖的输入文件，
+# render(out, *args) 把内容流式写入 out，label 用于进度输出；
+# key 非空时表示 args 完全决定输出，key 与上次相同且文件存在则不再渲染
+BuildTask = namedtuple('BuildTask', ['output', 'inputs', 'render', 'args', 'label', 'key'], defaults=[None])
+# 流式读取的结果：head 为每个分类的前若干条（主页用），counts 为各分类条数，
+# domains 为域名出现次数，records 为写入当天快照的条数
+Ingest = namedtuple('Ingest', ['head', 'counts', 'domains', 'records'])
+
+_page_keys = None
+
+def load_page_keys():
+    global _page_keys
+    if _page_keys is None:
+        _page_keys = {}
+        if os.path.exists(PAGE_KEYS):
+            try:
+                with open(PAGE_KEYS, 'r', encoding='utf-8') as f:
+                    _page_keys = json.load(f)
+            except (OSError, ValueError):
+                pass
+    return _page_keys
+
+def save_page_keys():
+    if _page_keys is None:
+        return
+    with open(PAGE_KEYS + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(_page_keys, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(PAGE_KEYS + '.tmp', PAGE_KEYS)
+
+def task_key(render, args):
+    """由模板和渲染参数决定的页面键"""
+    raw = repr((TEMPLATE_DIGEST, sorted(STYLESHEETS.items()), sorted(LOCALE.items()), render.__name__, args))
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+def page_filename(base, page):
+    """第 1 页为 base.html，之后为 base-2.html、base-3.html……"""
+    return f"{base}.html" if page == 1 else f"{base}-{page}.html"
+
+def paginate(items, page_size):
+    """按固定大小切分，返回 [(页码, 切片)]，没有内容时也保留一个空的第 1 页"""
+    page_size = max(1, page_size)
+    pages = [items[i:i + page_size] for i in range(0, len(items), page_size)] or [items[:0]]
+    return list(enumerate(pages, 1))
+
+def iter_pages(items, page_size):
+    """paginate 的流式版本：逐页产出 (页码, 元组)，只读入当前一页"""
+    items = iter(items)
+    page = 1
+    while True:
+        chunk = tuple(islice(items, max(1, page_size)))
+        if chunk or page == 1:
+            yield page, chunk
+        if not chunk:
+            return
+        page += 1
 
-def get_favicon_url(url):
-    domain = extract_domain(url)
-    if domain:
-        return f"https://www.google.com/s2/favicons?domain={domain}&sz=128"
-    return "https://www.google.com/s2/favicons?domain=example.com&sz=128"
-
-def get_random_time():
-    hour = random.randint(6, 23)
-    minute = random.randint(0, 59)
-    return f"{hour:02d}:{minute:02d}"
-
-def clean_html(text):
-    if not text:
-        return ""
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def generate_header(title="AI 日报", subtitle="每日 AI 新闻资讯、技术文章、产品融资和人物观点"):
-    """生成通用头部"""
+def batched(tasks, size):
+    tasks = iter(tasks)
+    while batch := list(islice(tasks, size)):
+        yield batch
+
+def prune_pages(tasks, directory, base):
+    """删除分页数减少后遗留的 base-N.html"""
+    keep = {task.output for task in tasks}
+    pattern = re.compile(rf'^{re.escape(base)}-\d+\.html$')
+    if not os.path.exists(directory):
+        return
+    for entry in os.scandir(directory):
+        if pattern.match(entry.name) and entry.path not in keep:
+            os.remove(entry.path)
+            rel = os.path.relpath(entry.path, SITE_DIR)
+            load_output_manifest().pop(rel, None)
+            load_page_keys().pop(rel, None)
+
+def run_task(task):
+    """执行单个构建任务（可在子进程中运行），返回 (digest, written, 字节数, 耗时)"""
+    start = time.perf_counter()
+    with open_output(task.output) as out:
+        task.render(out, *task.args)
+    return out.digest, out.written, out.size, time.perf_counter() - start
+
+def configure_stylesheets(minify=True):
+    STYLESHEETS.update(assets.stylesheet_hrefs(minify))
+
+def configure_locale(lang=locales.DEFAULT_LANG, edition='', links=()):
+    """切换页面文字；非默认语言的卡片片段单独缓存"""
+    T.clear()
+    T.update(locales.MESSAGES[lang])
+    LOCALE.update(lang=lang, edition=edition, links=tuple(links))
+    CARD_CACHE.configure(CARD_CACHE.cache_dir, CARD_VERSION if lang == locales.DEFAULT_LANG else f"{CARD_VERSION}.{lang}")
+
+def init_worker(card_cache_dir, stylesheets, locale):
+    # spawn 方式启动的子进程不会继承主进程的设置
+    CARD_CACHE.configure(card_cache_dir)
+    STYLESHEETS.update(stylesheets)
+    configure_locale(**locale)
+
+def run_worker_task(task):
+    """子进程中执行任务，额外返回卡片缓存和读取计数，新片段立即写入磁盘"""
+    result = run_task(task)
+    CARD_CACHE.flush()
+    inputs = dict(INPUT_STATS)
+    INPUT_STATS.update(files=0, bytes=0)
+    return result, CARD_CACHE.take_stats(), inputs
+
+def run_build_tasks(tasks, jobs=1):
+    """执行一组互相独立的构建任务，jobs > 1 时使用进程池并行渲染"""
+    page_keys = load_page_keys()
+    pending = []
+    for task in tasks:
+        rel = os.path.relpath(task.output, SITE_DIR)
+        if task.key and page_keys.get(rel) == task.key and os.path.exists(task.output):
+            record_output(task.output, None, False)
+        else:
+            pending.append(task)
+    tasks = pending
+    for task in tasks:
+        if task.key:
+            page_keys[os.path.relpath(task.output, SITE_DIR)] = task.key
+    
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            _, written, size, seconds = run_task(task)
+            REPORT.task(task.render.__name__, seconds, size, written)
+            print(f"✅ 生成 {task.label}")
+        return
+    
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(CARD_CACHE.cache_dir, STYLESHEETS, LOCALE)) as pool:
+        # 子进程里的清单和统计不会带回来，由主进程按返回值记录
+        for task, (result, stats, inputs) in zip(tasks, pool.map(run_worker_task, tasks, chunksize=chunksize)):
+            digest, written, size, seconds = result
+            record_output(task.output, digest, written, size)
+            CARD_CACHE.add_stats(stats)
+            for k, v in inputs.items():
+                INPUT_STATS[k] += v
+            REPORT.task(task.render.__name__, seconds, size, written)
+            print(f"✅ 生成 {task.label}")
+
+def generate_header(title=None, subtitle=None, prefix=""):
+    """生成通用头部，prefix 为页面到站点根目录的相对路径（存档页为 ../）"""
+    title = title or T['site_title']
     return f'''
     <!DOCTYPE html>
-    <html lang="zh-CN">
+    <html lang="{T['html_lang']}">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>{title}</title>
-        <meta name="description" content="每日AI新闻、技术文章、产品融资、人物观点 - 您的AI资讯助手">
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            :root {{
-                --bg-primary: #0a0a0b;
-                --bg-secondary: #141416;
-                --bg-card: #1c1c1f;
-                --bg-card-hover: #242428;
-                --text-primary: #f4f4f5;
-                --text-secondary: #a1a1aa;
-                --accent: #f97316;
-                --border: #27272a;
-            }}
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'PingFang SC', sans-serif;
-                background: var(--bg-primary);
-                color: var(--text-primary);
-                line-height: 1.6;
-                min-height: 100vh;
-            }}
-            .nav-brand a {{ color: var(--text-primary); text-decoration: none; }}
-            .nav-logo {{ font-size: 1.5rem; font-weight: bold; }}
-            .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-            .archive-list {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(280px, 1fr)); gap: 16px; }}
-            .archive-item {{ background: var(--bg-card); padding: 20px; border-radius: 12px; }}
-            .archive-item h3 {{ margin-bottom: 8px; }}
-            .archive-item a {{ color: var(--accent); text-decoration: none; }}
-            .search-box {{ margin-bottom: 24px; }}
-            .search-box input {{ width: 100%; padding: 12px; border-radius: 8px; border: 1px solid var(--border); background: var(--bg-card); color: var(--text-primary); font-size: 16px; }}
-            .category-header {{ margin: 32px 0 16px; }}
-            .back-link {{ color: var(--accent); text-decoration: none; margin-bottom: 16px; display: inline-block; }}
-            footer {{ text-align: center; padding: 40px 20px; color: var(--text-secondary); border-top: 1px solid var(--border); margin-top: 40px; }}
-            footer a {{ color: var(--accent); }}
-            .empty-state {{ text-align: center; padding: 60px 20px; color: var(--text-secondary); }}
-        </style>
+        <meta name="description" content="{T['description']}">
+        <link rel="stylesheet" href="{prefix}{STYLESHEETS['site']}">{favicon_link(prefix)}
     </head>
     <body>
         <div class="container">'''
 
+def favicon_link(prefix="", indent="        "):
+    """图标样式表的 link 标签（另起一行）；图标阶段没有运行时为空"""
+    if 'favicons' not in STYLESHEETS:
+        return ''
+    return f"\n{indent}<link rel=\"stylesheet\" href=\"{prefix}{STYLESHEETS['favicons']}\">"
+
 def generate_footer():
     return f'''
         <footer>
-            <p>🤖 由 <strong>AI 日报</strong> 自动生成 · <a href="https://github.com/wallerwvw-cell/ai-daily-news" target="_blank">GitHub</a> · <a href="https://wallerwvw-cell.github.io/ai-daily-news/" target="_blank">在线阅读</a></p>
+            <p>{T['footer']} · <a href="https://github.com/wallerwvw-cell/ai-daily-news" target="_blank">GitHub</a> · <a href="https://wallerwvw-cell.github.io/ai-daily-news/" target="_blank">{T['read_online']}</a></p>
         </footer>
     </body>
     </html>'''
 
-def generate_card(item, category_class):
-    """生成卡片HTML"""
-    title = item.get('title', '')
-    summary = item.get('summary', '') or item.get('snippet', '')
-    if not summary:
-        summary = "点击查看详细内容..."
-    if len(summary) > 180:
-        summary = summary[:180] + '...'
-    
-    url = item.get('url', '#')
-    source = item.get('source', '') or extract_domain(url)
-    favicon = get_favicon_url(url)
+def truncate_summary(summary, limit=180):
+    if len(summary) > limit:
+        return summary[:limit] + '...'
+    return summary
+
+def generate_card(item, category_class, links=()):
+    """生成卡片HTML，links 为相关报道的 (链接, 标题)"""
+    title = item.title
+    summary = truncate_summary(item.summary or T['summary_placeholder'])
+    url = item.url
+    source = item.source
+    favicon_class = favicons.favicon_class(extract_domain(url))
     
-    cat_label = CATEGORIES.get(category_class.replace('category-', ''), ('', ''))[0]
+    cat_label = T['categories'].get(category_class.replace('category-', ''), '')
+    related_html = ''
+    if links:
+        related_html = f'''
+        <div class="card-related">
+            <span class="card-related-label">{T['related']}</span>
+            {' '.join(f'<a href="{href}">{text}</a>' for href, text in links)}
+        </div>'''
     
     return f'''
     <article class="card" data-category="{category_class}" data-title="{title}" data-summary="{summary}">
         <div class="card-header">
-            <img src="{favicon}" alt="{source}" class="card-favicon" onerror="this.src='https://via.placeholder.com/32x32?text=AI'">
+            <span class="card-favicon {favicon_class}" role="img" aria-label="{source}"></span>
             <span class="card-source">{source}</span>
         </div>
         <h3 class="card-title"><a href="{url}" target="_blank" rel="noopener">{title}</a></h3>
-        <p class="card-summary">{summary}</p>
+        <p class="card-summary">{summary}</p>{related_html}
         <div class="card-footer">
             <span class="card-category {category_class}">{cat_label}</span>
         </div>
     </article>'''
 
-def get_all_archives():
-    """获取所有存档文件"""
-    archives = []
-    if os.path.exists(ARCHIVE_DIR):
-        for f in os.listdir(ARCHIVE_DIR):
-            if f.endswith('.html'):
-                date = f.replace('.html', '')
-                archives.append((date, f))
-    return sorted(archives, reverse=True)
+def write_header(out, title=None, subtitle=None, prefix=""):
+    """把通用头部写入 out（文件或 io.StringIO）"""
+    out.write(generate_header(title, subtitle, prefix))
 
-def generate_archive_index():
-    """生成归档索引页面"""
-    archives = get_all_archives()
-    
-    html = generate_header("归档 - AI 日报", "历史资讯存档")
-    html += '<h1>📂 资讯归档</h1>'
-    html += '<p style="color: var(--text-secondary); margin-bottom: 24px;">点击日期查看当天所有资讯</p>'
-    
-    if archives:
-        html += '<div class="archive-list">'
-        for date, filename in archives:
-            display_date = f"{date[:4]}年{date[5:7]}月{date[8:10]}日"
-            html += f'''
+def write_footer(out):
+    out.write(generate_footer())
+
+def card_fragment(item, category_class, links=()):
+    """经片段缓存的卡片 HTML：同一条资讯在主页、分类页和存档中只渲染一次"""
+    key = (item.title, item.summary, item.url, item.source, category_class)
+    if links:
+        # 摘要按字符串计算，相关报道序列化后再并入 key
+        key += (json.dumps(links, ensure_ascii=False),)
+    return CARD_CACHE.get(key, lambda: generate_card(item, category_class, links))
+
+def write_card(out, item, category_class, links=()):
+    out.write(card_fragment(item, category_class, links))
+
+def related_links(found, page_size=PAGE_SIZE):
+    """RELATED.links() 的结果换成 {链接: ((存档文件名, 标题), ...)}，文件名按分页指向那条资讯所在的页"""
+    return {url: tuple((page_filename(date, pos // max(1, page_size) + 1), title) for date, pos, title in links)
+            for url, links in found.items()}
+
+def page_related(related, items):
+    """只保留这一页资讯的相关报道（页面键随之变化）"""
+    if not related:
+        return {}
+    return {item.url: related[item.url] for item in items if item.url in related}
+
+def card_links(related, item, prefix=""):
+    """卡片上的相关报道 (链接, 标题)，prefix 为页面到存档目录的相对路径"""
+    links = related.get(item.url) if related else None
+    return tuple((prefix + filename, title) for filename, title in links) if links else ()
+
+def write_pagination(out, prev_href, next_href, label, prev_text=None, next_text=None):
+    """分页导航，prev_href/next_href 为 None 时不显示对应链接"""
+    prev_text = prev_text or T['prev_page']
+    next_text = next_text or T['next_page']
+    out.write('<nav class="pagination" style="display: flex; justify-content: space-between; align-items: center; margin: 24px 0;">')
+    out.write(f'<a href="{prev_href}" class="back-link">{prev_text}</a>' if prev_href else '<span></span>')
+    out.write(f'<span style="color: var(--text-secondary);">{label}</span>')
+    out.write(f'<a href="{next_href}" class="back-link">{next_text}</a>' if next_href else '<span></span>')
+    out.write('</nav>')
+
+def backfill_day_snapshots():
+    """为没有快照的旧存档从HTML中提取一次快照"""
+    if not os.path.exists(ARCHIVE_DIR):
+        return 0
+    existing = load_catalog().days
+    count = 0
+    for f in os.listdir(ARCHIVE_DIR):
+        if not f.endswith('.html'):
+            continue
+        if not DATE_PAGE_RE.match(f):
+            continue
+        date = f.replace('.html', '')
+        if date in existing:
+            continue
+        try:
+            records = parse_archive_html(read_input(f"{ARCHIVE_DIR}/{f}").decode('utf-8'), date)
+        except OSError:
+            continue
+        write_day_snapshot(records, date)
+        load_catalog().record(date, Counter(record.category for record in records))
+        count += 1
+    if count:
+        print(f"✅ 从旧存档迁移快照 ({count} 个)")
+    return count
+
+def load_url_index(bloom=False, near_dup=False):
+    """加载跨天去重索引，第一次使用时用全部历史快照初始化
+
+    near_dup 为真而索引里的标题分段不完整（从未检查过近似重复，或之后有几天没有检查）时，
+    用历史快照补齐标题分段；不检查近似重复的构建不计算标题分段。
+    """
+    index = dedup.UrlIndex(URL_INDEX, bloom=bloom)
+    fill_urls = not index.exists
+    fill_bands = near_dup and not index.bands
+    if fill_urls or fill_bands:
+        history = load_history()
+        for date in sorted(history):
+            for record in history[date]:
+                key = dedup.normalize_url(record.url)
+                if key and fill_urls:
+                    index.add(key, date)
+                if fill_bands:
+                    for band in dedup.title_bands(record.title):
+                        index.backfill(band, date)
+        if fill_bands:
+            index.bands = True
+            index.changed = True
+    return index
+
+def warm_url_index(bloom=False, near_dup=False):
+    """同一进程里复用已加载的去重索引（watch 模式每次重建不必重新读取）"""
+    index = URL_INDEXES.get(bloom)
+    if index is None or (near_dup and not index.bands):
+        URL_INDEXES[bloom] = index = load_url_index(bloom, near_dup)
+    return index
+
+def get_all_archives(today=None):
+    """获取所有存档文件（最新的在前），来自归档目录
+
+    today 为本次构建将要写入存档的日期：还没记录到归档目录时也列出，
+    主页不必等到下一次构建才出现当天的存档链接。
+    """
+    dates = set(load_catalog().days)
+    if today:
+        dates.add(today)
+    return [(date, f"{date}.html") for date in sorted(dates, reverse=True)]
+
+def archive_day_rows(dates):
+    """归档目录里这些日期的 (日期, 存档文件, 条数, ((分类, 条数), ...))，作为汇总页的渲染参数"""
+    days = load_catalog().days
+    order = {cat_id: i for i, cat_id in enumerate(CATEGORIES)}
+    return tuple(
+        (date, days[date]['file'], days[date]['count'],
+         tuple(sorted(days[date]['categories'].items(), key=lambda kv: (order.get(kv[0], len(order)), kv[0]))))
+        for date in dates
+    )
+
+def write_archive_days(out, rows, prefix=""):
+    """每天一张卡片：日期、条数和各分类条数；prefix 为页面到存档目录的相对路径"""
+    out.write('<div class="archive-list">')
+    for date, filename, count, categories in rows:
+        display_date = T['long_date'].format(y=date[:4], m=date[5:7], d=date[8:10])
+        breakdown = ' · '.join(f"{T['categories'].get(cat_id, cat_id)} {n}" for cat_id, n in categories)
+        out.write(f'''
             <div class="archive-item">
-                <h3><a href="archives/{filename}">{display_date}</a></h3>
-            </div>'''
-        html += '</div>'
-    else:
-        html += '<div class="empty-state">暂无存档</div>'
+                <h3><a href="{prefix}{filename}">{display_date}</a></h3>
+                <p style="color: var(--text-secondary);">{T['day_count'].format(n=count)}</p>
+                <p class="archive-categories">{breakdown}</p>
+            </div>''')
+    out.write('</div>')
+
+def write_archive_months(out, months, prefix=""):
+    """每个月一张卡片：天数、条数，链接到月汇总页"""
+    out.write('<div class="archive-list">')
+    for month, days, count in months:
+        out.write(f'''
+            <div class="archive-item">
+                <h3><a href="{prefix}{month}.html">{T['month_name'].format(y=month[:4], m=month[5:7])}</a></h3>
+                <p style="color: var(--text-secondary);">{T['month_count'].format(days=days, n=count)}</p>
+            </div>''')
+    out.write('</div>')
+
+def render_archive_index(out, month, rows, years):
+    """渲染归档索引 archive.html 到 out：最近一个月的每一天，以及按年分组的全部月份
+
+    页面大小与月份数成正比，不再随天数增长；更早的月份由各自的汇总页展示。
+    """
+    write_header(out, T['archive_title'], T['archive_subtitle'])
+    out.write(f'<h1>{T["archive_heading"]}</h1>')
+    out.write(f'<p style="color: var(--text-secondary); margin-bottom: 24px;">{T["archive_hint"]}</p>')
     
-    html += generate_footer()
+    if not rows:
+        out.write(f'<div class="empty-state">{T["no_archives"]}</div>')
+        write_footer(out)
+        return
     
-    with open("/Users/alex/.openclaw/workspace/ai-daily-news/archive.html", 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"✅ 生成 archive.html ({len(archives)} 个存档)")
+    out.write(f'<h2 class="category-header"><a href="archives/{month}.html" class="back-link">'
+              f'{T["month_name"].format(y=month[:4], m=month[5:7])}</a></h2>')
+    write_archive_days(out, rows, "archives/")
+    out.write(f'<h2 class="category-header">{T["by_month"]}</h2>')
+    for year, months in years:
+        out.write(f'<h3 class="category-header"><a href="archives/{year}.html" class="back-link">{T["year_name"].format(y=year)}</a></h3>')
+        write_archive_months(out, months, "archives/")
+    write_footer(out)
 
-def generate_category_pages(results):
-    """生成分类页面"""
-    for cat_id, (cat_name, cat_class) in CATEGORIES.items():
-        items = results.get(cat_id, [])
-        
-        html = generate_header(f"{cat_name} - AI 日报", f"AI {cat_name}精选")
-        html += f'<a href="index.html" class="back-link">← 返回首页</a>'
-        html += f'<h1 class="category-header">{cat_name}</h1>'
-        
-        if items:
-            html += f'<p style="color: var(--text-secondary); margin-bottom: 24px;">共 {len(items)} 条</p>'
-            for item in items:
-                html += generate_card(item, cat_class)
-        else:
-            html += '''
+def render_month_archive(out, month, rows):
+    """渲染月汇总页 archives/YYYY-MM.html：这个月的每一天"""
+    name = T['month_name'].format(y=month[:4], m=month[5:7])
+    write_header(out, T['rollup_title'].format(name=name), T['archive_subtitle'], "../")
+    out.write('<div style="margin-bottom: 16px;">')
+    out.write(f'<a href="../archive.html" class="back-link">{T["archive_link"]}</a> | ')
+    out.write(f'<a href="{month[:4]}.html" class="back-link">{T["year_name"].format(y=month[:4])}</a>')
+    out.write('</div>')
+    out.write(f'<h1>📅 {name}</h1>')
+    out.write(f'<p style="color: var(--text-secondary); margin-bottom: 24px;">'
+              f'{T["month_count"].format(days=len(rows), n=sum(row[2] for row in rows))}</p>')
+    write_archive_days(out, rows)
+    write_footer(out)
+
+def render_year_archive(out, year, months):
+    """渲染年汇总页 archives/YYYY.html：这一年的每个月"""
+    name = T['year_name'].format(y=year)
+    write_header(out, T['rollup_title'].format(name=name), T['archive_subtitle'], "../")
+    out.write(f'<a href="../archive.html" class="back-link">{T["archive_link"]}</a>')
+    out.write(f'<h1>📂 {name}</h1>')
+    out.write(f'<p style="color: var(--text-secondary); margin-bottom: 24px;">'
+              f'{T["month_count"].format(days=sum(m[1] for m in months), n=sum(m[2] for m in months))}</p>')
+    write_archive_months(out, months)
+    write_footer(out)
+
+def archive_index_tasks():
+    """归档索引、每个月和每一年的汇总页，全部由归档目录生成（不读取快照）
+
+    渲染参数只包含这一页用到的条目，新的一天只会改变当月、当年的汇总页和 archive.html，
+    其余汇总页的页面键不变，不再渲染。
+    """
+    catalog = load_catalog()
+    months = {month: archive_day_rows(dates) for month, dates in catalog.months().items()}
+    years = {}
+    for month, rows in months.items():
+        years.setdefault(month[:4], []).append((month, len(rows), sum(row[2] for row in rows)))
+    years = tuple((year, tuple(rows)) for year, rows in years.items())
+    tasks = []
+    latest = next(iter(months), '')
+    args = (latest, months.get(latest, ()), years)
+    tasks.append(BuildTask(
+        f"{SITE_DIR}/archive.html", [ARCHIVE_CATALOG], render_archive_index, args,
+        f"archive.html ({len(months)} 个月)", task_key(render_archive_index, args)
+    ))
+    for month, rows in months.items():
+        args = (month, rows)
+        tasks.append(BuildTask(
+            f"{ARCHIVE_DIR}/{month}.html", [ARCHIVE_CATALOG], render_month_archive, args,
+            f"archives/{month}.html ({len(rows)} 天)", task_key(render_month_archive, args)
+        ))
+    for year, rows in years:
+        args = (year, rows)
+        tasks.append(BuildTask(
+            f"{ARCHIVE_DIR}/{year}.html", [ARCHIVE_CATALOG], render_year_archive, args,
+            f"archives/{year}.html ({len(rows)} 个月)", task_key(render_year_archive, args)
+        ))
+    return tasks
+
+def prune_rollups(tasks):
+    """删除已经没有存档的月份、年份的汇总页（按页面键查找，不列出存档目录），以及旧版分页归档索引 archive-N.html"""
+    prune_pages(tasks, SITE_DIR, 'archive')
+    keep = {os.path.relpath(task.output, SITE_DIR) for task in tasks}
+    page_keys = load_page_keys()
+    for rel in [rel for rel in page_keys if ROLLUP_PAGE_RE.match(rel) and rel not in keep]:
+        if os.path.exists(f"{SITE_DIR}/{rel}"):
+            os.remove(f"{SITE_DIR}/{rel}")
+        load_output_manifest().pop(rel, None)
+        del page_keys[rel]
+
+def generate_archive_index():
+    """生成归档索引和按月、按年的汇总页"""
+    tasks = archive_index_tasks()
+    run_build_tasks(tasks)
+    prune_rollups(tasks)
+
+def render_category_page(out, cat_id, items, page=1, pages=1, total=None, related=None):
+    """渲染单个分类页面（的第 page 页）到 out，items 为该页的资讯，related 为它们的相关报道"""
+    cat_class = CATEGORIES[cat_id][1]
+    cat_name = T['categories'][cat_id]
+    write_header(out, T['category_title'].format(name=cat_name), T['category_subtitle'].format(name=cat_name))
+    out.write(f'<a href="index.html" class="back-link">{T["back_home"]}</a>')
+    out.write(f'<h1 class="category-header">{cat_name}</h1>')
+    
+    if items:
+        out.write(f'<p style="color: var(--text-secondary); margin-bottom: 24px;">{T["count"].format(n=total or len(items))}</p>')
+        for item in items:
+            write_card(out, item, cat_class, card_links(related, item, "archives/"))
+        if pages > 1:
+            write_pagination(
+                out,
+                page_filename(cat_id, page - 1) if page > 1 else None,
+                page_filename(cat_id, page + 1) if page < pages else None,
+                T['page_of'].format(page=page, pages=pages)
+            )
+    else:
+        out.write(f'''
             <div class="empty-state">
                 <p style="font-size: 3rem; margin-bottom: 16px;">📭</p>
-                <h2>暂无相关内容</h2>
-                <p style="color: var(--text-secondary); margin-top: 8px;">目前该分类下还没有资讯，请稍后再来~</p>
-                <a href="index.html" style="display: inline-block; margin-top: 24px; padding: 12px 24px; background: var(--accent); color: white; border-radius: 8px;">← 返回首页</a>
-            </div>'''
-        
-        html += generate_footer()
-        
-        filename = f"/Users/alex/.openclaw/workspace/ai-daily-news/{cat_id}.html"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html)
-        print(f"✅ 生成 {cat_id}.html ({len(items)} 条)")
+                <h2>{T['empty_title']}</h2>
+                <p style="color: var(--text-secondary); margin-top: 8px;">{T['empty_hint']}</p>
+                <a href="index.html" style="display: inline-block; margin-top: 24px; padding: 12px 24px; background: var(--accent); color: white; border-radius: 8px;">{T['back_home']}</a>
+            </div>''')
+    
+    write_footer(out)
+
+def category_page_task(cat_id, chunk, page, pages, total, related=None):
+    args = (cat_id, chunk, page, pages, total)
+    links = page_related(related, chunk)
+    if links:
+        args += (links,)
+    filename = page_filename(cat_id, page)
+    return BuildTask(
+        f"{SITE_DIR}/{filename}",
+        [SEARCH_RESULTS], render_category_page, args,
+        f"{filename} ({len(chunk)} 条)", task_key(render_category_page, args)
+    )
+
+def category_page_tasks(results, page_size=PAGE_SIZE, related=None):
+    tasks = []
+    for cat_id in CATEGORIES:
+        items = tuple(results.get(cat_id, ()))
+        chunks = paginate(items, page_size)
+        tasks += [category_page_task(cat_id, chunk, page, len(chunks), len(items), related) for page, chunk in chunks]
+    return tasks
+
+def stream_category_tasks(spool_dir, counts, page_size=PAGE_SIZE, related=None):
+    """逐页从分类临时文件读取资讯，惰性产出分类页面任务"""
+    for cat_id in CATEGORIES:
+        total = counts.get(cat_id, 0)
+        pages = max(1, -(-total // max(1, page_size)))
+        path = os.path.join(spool_dir, f"{cat_id}.jsonl")
+        items = iter_snapshot_file(path) if total else ()
+        for page, chunk in iter_pages(items, page_size):
+            yield category_page_task(cat_id, chunk, page, pages, total, related)
+
+def generate_category_pages(results, jobs=1):
+    """生成分类页面"""
+    tasks = category_page_tasks(results)
+    run_build_tasks(tasks, jobs)
+    for cat_id in CATEGORIES:
+        prune_pages(tasks, SITE_DIR, cat_id)
+
+def render_daily_archive(out, date_str, records, page=1, pages=1, total=None, related=None):
+    """渲染每日存档页面（的第 page 页）到 out，records 为该页的资讯，related 为它们的相关报道"""
+    write_header(out, T['daily_title'].format(date=date_str), T['daily_subtitle'].format(date=date_str), "../")
+    out.write('<div style="margin-bottom: 16px;">')
+    out.write(f'<a href="../index.html" class="back-link">{T["back_home"]}</a> | ')
+    out.write(f'<a href="../archive.html" class="back-link">{T["archive_link"]}</a>')
+    out.write('</div>')
+    out.write(f'<h1>📅 {date_str}</h1>')
+    out.write(f'<p style="color: var(--text-secondary); margin-bottom: 24px;">{T["day_count"].format(n=total or len(records))}</p>')
+    
+    for item in records:
+        cat_id = item.category
+        cat_class = CATEGORIES.get(cat_id, ('', 'category-news'))[1]
+        write_card(out, item, cat_class, card_links(related, item))
+    
+    if pages > 1:
+        write_pagination(
+            out,
+            page_filename(date_str, page - 1) if page > 1 else None,
+            page_filename(date_str, page + 1) if page < pages else None,
+            T['page_of'].format(page=page, pages=pages)
+        )
+    write_footer(out)
+
+def render_snapshot_archive(out, date_str, page=1, page_size=PAGE_SIZE, related=None):
+    """从快照重新渲染某一天存档的第 page 页（用于重建历史），related 为这一天的相关报道"""
+    records = load_day_snapshot(date_str)
+    chunks = paginate(records, page_size)
+    render_daily_archive(out, date_str, chunks[page - 1][1], page, len(chunks), len(records), related)
+
+def daily_records(results, ctx):
+    return [ctx.stamp(item) for items in results.values() for item in items]
+
+def daily_archive_task(date_str, chunk, page, pages, total, related=None):
+    args = (date_str, chunk, page, pages, total)
+    links = page_related(related, chunk)
+    if links:
+        args += (links,)
+    filename = page_filename(date_str, page)
+    return BuildTask(
+        f"{ARCHIVE_DIR}/{filename}",
+        [SEARCH_RESULTS], render_daily_archive, args,
+        f"archives/{filename} ({len(chunk)} 条)", task_key(render_daily_archive, args)
+    )
+
+def daily_archive_tasks(records, date_str, page_size=PAGE_SIZE, related=None):
+    if not records:
+        return []
+    records = tuple(records)
+    chunks = paginate(records, page_size)
+    return [daily_archive_task(date_str, chunk, page, len(chunks), len(records), related) for page, chunk in chunks]
+
+def stream_daily_archive_tasks(date_str, total, page_size=PAGE_SIZE, related=None):
+    """逐页从刚写入的当天快照读取资讯，惰性产出每日存档任务"""
+    if not total:
+        return
+    pages = -(-total // max(1, page_size))
+    for page, chunk in iter_pages(iter_snapshot_file(f"{DATA_DIR}/{date_str}.jsonl"), page_size):
+        yield daily_archive_task(date_str, chunk, page, pages, total, related)
 
-def generate_daily_archive(results, date_str=None):
+def stream_ingest(path, ctx, spool_dir, deduper=None, limit=MAIN_PAGE_LIMIT):
+    """逐条读取搜索结果：去重后直接写入当天快照和按分类的临时文件
+
+    内存里只保留主页需要的每个分类前 limit 条、各分类条数和域名计数，与输入大小无关
+    （去重时当天的 URL 集合除外）。
+    """
+    head, counts, domains = {}, Counter(), Counter()
+    spools = {}
+    snapshot = None
+    with ExitStack() as stack:
+        for item in iter_search_results(path):
+            if deduper and not deduper.keep(item):
+                continue
+            cat_id = item.category
+            counts[cat_id] += 1
+            if counts[cat_id] <= limit:
+                head.setdefault(cat_id, []).append(item)
+            domain = extract_domain(item.url)
+            if domain:
+                domains[domain] += 1
+            if cat_id in CATEGORIES:
+                if cat_id not in spools:
+                    spools[cat_id] = stack.enter_context(open(os.path.join(spool_dir, f"{cat_id}.jsonl"), 'w', encoding='utf-8'))
+                spools[cat_id].write(snapshot_line(item))
+            if snapshot is None:
+                snapshot = stack.enter_context(open_output(f"{DATA_DIR}/{ctx.date_str}.jsonl"))
+            snapshot.write(snapshot_line(ctx.stamp(item)))
+    head = {cat_id: tuple(items) for cat_id, items in head.items()}
+    return Ingest(head, dict(counts), domains, sum(counts.values()))
+
+def history_archive_tasks(dates, page_size=PAGE_SIZE, related=None):
+    """每个历史快照的每一页对应一个存档页面任务，快照在子进程里读取；related 为 {日期: 相关报道}"""
+    tasks = []
+    for date in dates:
+        pages = max(1, -(-load_catalog().days[date]['count'] // max(1, page_size)))
+        links = related.get(date) if related else None
+        for page in range(1, pages + 1):
+            filename = page_filename(date, page)
+            tasks.append(BuildTask(
+                f"{ARCHIVE_DIR}/{filename}",
+                [f"{DATA_DIR}/{date}.jsonl"], render_snapshot_archive,
+                (date, page, page_size, links) if links else (date, page, page_size),
+                f"archives/{filename}"
+            ))
+    return tasks
+
+def generate_daily_archive(results, ctx=None):
     """生成每日存档"""
-    if date_str is None:
-        date_str = datetime.now().strftime("%Y-%m-%d")
+    ctx = ctx or BuildContext.from_env()
     
     os.makedirs(ARCHIVE_DIR, exist_ok=True)
     
+    records = daily_records(results, ctx)
+    if records:
+        write_day_snapshot(records, ctx.date_str)
+        load_catalog().record(ctx.date_str, Counter(record.category for record in records))
+    tasks = daily_archive_tasks(records, ctx.date_str)
+    run_build_tasks(tasks)
+    if tasks:
+        prune_pages(tasks, ARCHIVE_DIR, ctx.date_str)
+
+ARCHIVE_CARD_RE = re.compile(
+    r'<article class="card" data-category="category-(\w+)"[^>]*>.*?'
+    r'<span class="card-source">([^<]*)</span>.*?'
+    r'<h3 class="card-title"><a href="([^"]+)"[^>]*>([^<]*)</a></h3>\s*'
+    r'<p class="card-summary">([^<]*)</p>',
+    re.S
+)
+
+def parse_archive_html(content, date):
+    """从旧存档HTML中提取快照记录（每张卡片一次匹配，字段不会错位）"""
+    items = []
+    for cat_id, source, url, title, summary in ARCHIVE_CARD_RE.findall(content):
+        items.append(Item(title=title, url=url, summary=summary, source=source, category=cat_id, date=date))
+    return items
+
+def load_search_index_manifest():
+    """加载搜索索引清单（记录每个快照的 mtime/size/hash 和已提取条目）"""
+    if _search_index_manifest is not None:
+        return _search_index_manifest
+    if os.path.exists(SEARCH_INDEX_MANIFEST):
+        try:
+            with open(SEARCH_INDEX_MANIFEST, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == SEARCH_INDEX_MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+    return {'version': SEARCH_INDEX_MANIFEST_VERSION, 'snapshots': {}}
+
+def search_index_items(entries):
+    """清单中全部快照的条目，同一链接只保留最新的一条"""
     all_items = []
-    for cat_id, items in results.items():
-        for item in items:
-            item['_category'] = cat_id
+    seen_urls = set()
+    for name in sorted(entries, reverse=True):
+        for item in entries[name]['items']:
+            key = URL_KEYS.get(item['url'])
+            if key is None:
+                key = URL_KEYS[item['url']] = dedup.normalize_url(item['url'])
+            if key and key in seen_urls:
+                continue
+            seen_urls.add(key)
             all_items.append(item)
+    return all_items
+
+def generate_search_index(full_rebuild=False):
+    """生成搜索索引数据（增量：只读取新增或变化的每日快照）"""
+    global _search_index_manifest
+    manifest = {'version': SEARCH_INDEX_MANIFEST_VERSION, 'snapshots': {}} if full_rebuild else load_search_index_manifest()
+    old_entries = manifest['snapshots']
+    entries = {}
+    parsed = 0
+    changed = full_rebuild or not os.path.exists(f"{SEARCH_DIR}/manifest.json")
     
-    if not all_items:
-        return
+    # 只对快照目录做 stat，未变化的快照不读取内容
+    if os.path.exists(DATA_DIR):
+        for entry in os.scandir(DATA_DIR):
+            if not entry.name.endswith('.jsonl'):
+                continue
+            st = entry.stat()
+            old = old_entries.get(entry.name)
+            if old and old['mtime'] == st.st_mtime_ns and old['size'] == st.st_size:
+                entries[entry.name] = old
+                continue
+            
+            try:
+                raw = read_input(entry.path)
+            except OSError:
+                continue
+            digest = hashlib.sha256(raw).hexdigest()
+            if old and old['sha256'] == digest:
+                # 仅 mtime 变化（例如同内容重写），沿用已提取条目
+                items = old['items']
+            else:
+                items = [{
+                    'title': record.title,
+                    'summary': truncate_summary(record.summary),
+                    'url': record.url,
+                    'date': record.date
+                } for record in parse_day_snapshot(raw)]
+                parsed += 1
+                changed = True
+            entries[entry.name] = {
+                'mtime': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha256': digest,
+                'items': items
+            }
     
-    html = generate_header(f"{date_str} - AI 日报", f"{date_str} 日AI资讯")
-    html += '<div style="margin-bottom: 16px;">'
-    html += '<a href="../index.html" class="back-link">← 返回首页</a> | '
-    html += '<a href="../archive.html" class="back-link">📂 归档</a>'
-    html += '</div>'
-    html += f'<h1>📅 {date_str}</h1>'
-    html += f'<p style="color: var(--text-secondary); margin-bottom: 24px;">共 {len(all_items)} 条资讯</p>'
+    if set(entries) != set(old_entries):
+        changed = True
     
-    for item in all_items:
-        cat_id = item.get('_category', 'news')
-        cat_class = CATEGORIES.get(cat_id, ('', 'category-news'))[1]
-        html += generate_card(item, cat_class)
+    manifest['snapshots'] = entries
+    if entries != old_entries or not os.path.exists(SEARCH_INDEX_MANIFEST):
+        with open_output(SEARCH_INDEX_MANIFEST) as f:
+            f.write(json.dumps(manifest, ensure_ascii=False))
+    _search_index_manifest = manifest
+    all_items = search_index_items(entries)
     
-    html += generate_footer()
+    # 存档内容没有变化时不重建倒排索引；只重新切分文档有变化的月份，只写受影响的分片
+    if changed:
+        index, months, shards = SEARCH_INDEX.update(all_items)
+        if full_rebuild:
+            months = shards = None
+        paths = set(search.write_index(index, SEARCH_DIR, open_output, months, shards))
+        for sub in ('docs', 'terms'):
+            for entry in os.scandir(f"{SEARCH_DIR}/{sub}"):
+                if entry.path not in paths:
+                    os.remove(entry.path)
+                    load_output_manifest().pop(os.path.relpath(entry.path, SITE_DIR), None)
     
-    filename = f"{ARCHIVE_DIR}/{date_str}.html"
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"✅ 生成 archives/{date_str}.html ({len(all_items)} 条)")
+    print(f"✅ 生成搜索索引 ({len(all_items)} 条, 读取 {parsed}/{len(entries)} 个快照)")
 
-def generate_search_index():
-    """生成搜索索引数据"""
-    all_items = []
-    
-    # 从存档目录读取所有历史数据
-    if os.path.exists(ARCHIVE_DIR):
-        import re
-        for f in os.listdir(ARCHIVE_DIR):
-            if f.endswith('.html'):
-                date = f.replace('.html', '')
-                # 简单解析，从HTML中提取标题和摘要
-                try:
-                    with open(f"{ARCHIVE_DIR}/{f}", 'r', encoding='utf-8') as file:
-                        content = file.read()
-                        # 提取标题
-                        titles = re.findall(r'<h3 class="card-title"><a[^>]*>([^<]+)</a></h3>', content)
-                        # 提取摘要
-                        summaries = re.findall(r'<p class="card-summary">([^<]+)</p>', content)
-                        # 提取链接
-                        links = re.findall(r'<h3 class="card-title"><a href="([^"]+)"', content)
-                        
-                        for i, title in enumerate(titles):
-                            all_items.append({
-                                'title': title,
-                                'summary': summaries[i] if i < len(summaries) else '',
-                                'url': links[i] if i < len(links) else '#',
-                                'date': date
-                            })
-                except:
-                    pass
-    
-    # 保存搜索索引
-    with open("/Users/alex/.openclaw/workspace/ai-daily-news/search_index.json", 'w', encoding='utf-8') as f:
-        json.dump(all_items, f, ensure_ascii=False, indent=2)
-    
-    print(f"✅ 生成搜索索引 ({len(all_items)} 条)")
-
-def generate_main_page(results):
-    """生成主页面（保留原有功能）"""
-    # 这里保留原有的完整HTML生成逻辑
-    # 为节省篇幅，只生成简单的版本
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    date_display = f"{date_str[5:7]}月{date_str[8:10]}日"
+def render_main_page(out, results, archives, date_str, limit=MAIN_PAGE_LIMIT, counts=None, related=None, chunks=None):
+    """渲染主页面到 out（保留原有功能），每个分类最多显示 limit 条
+
+    counts 为各分类的总条数；流式构建时 results 只有每个分类的前 limit 条，需要单独传入。
+    related 为显示的资讯的相关报道。chunks 为 {分类: (分块路径, 首屏条数)}，
+    这些分类只写出首屏的卡片，其余的由页面底部的脚本在滚动到附近或点击时加载。
+    """
+    date_display = T['short_date'].format(m=date_str[5:7], d=date_str[8:10])
+    labels = T['categories']
+    if counts is None:
+        counts = {cat_id: len(items) for cat_id, items in results.items()}
     
     # 统计
-    total = sum(len(v) for v in results.values() if isinstance(v, list))
-    
-    # 生成分类HTML - 只显示有内容的分类
-    all_cards_html = ''
-    for cat_id, (cat_name, cat_class) in CATEGORIES.items():
-        items = results.get(cat_id, [])
-        if items:
-            all_cards_html += f'<section id="{cat_id}" class="category-section">\n'
-            all_cards_html += f'<h2 class="category-title">{cat_name}</h2>\n'
-            for item in items:
-                all_cards_html += generate_card(item, cat_class)
-            all_cards_html += '</section>\n'
+    total = sum(counts.values())
     
     # 分类导航 - 只显示有内容的分类
     category_nav = '\n'.join([
-        f'<a href="{cat_id}.html" class="nav-category-link">{name}</a>'
-        for cat_id, (name, _) in CATEGORIES.items()
+        f'<a href="{cat_id}.html" class="nav-category-link">{labels[cat_id]}</a>'
+        for cat_id in CATEGORIES
         if results.get(cat_id, [])
     ])
     
     # 如果没有有内容的分类，显示提示
     if not category_nav:
-        category_nav = '<span style="color: var(--text-muted);">暂无内容</span>'
+        category_nav = f'<span style="color: var(--text-muted);">{T["no_content"]}</span>'
     
     # 侧边栏分类 - 只显示有内容的分类
     sidebar_categories = '\n'.join([
-        f'<li class="category-item"><a href="{cat_id}.html" class="category-link">{name}</a></li>'
-        for cat_id, (name, _) in CATEGORIES.items()
+        f'<li class="category-item"><a href="{cat_id}.html" class="category-link">{labels[cat_id]}</a></li>'
+        for cat_id in CATEGORIES
         if results.get(cat_id, [])
     ])
     
     if not sidebar_categories:
-        sidebar_categories = '<li class="category-item" style="color: var(--text-muted);">暂无分类</li>'
+        sidebar_categories = f'<li class="category-item" style="color: var(--text-muted);">{T["no_categories"]}</li>'
     
     # 侧边栏归档
-    archives = get_all_archives()
     if archives:
         sidebar_dates = '\n'.join([
-            f'<li class="date-item"><a href="archives/{f}" class="date-link">{d[5:7]}月{d[8:10]}日</a></li>'
+            f'<li class="date-item"><a href="archives/{f}" class="date-link">{T["short_date"].format(m=d[5:7], d=d[8:10])}</a></li>'
             for d, f in archives[:10]
         ])
     else:
-        sidebar_dates = '<li class="date-item">暂无存档</li>'
+        sidebar_dates = f'<li class="date-item">{T["no_archives"]}</li>'
+    
+    # 切换到其他语言版本（只有多版本构建时才显示）
+    edition_links = ''.join(
+        f'\n                <a href="{href}" class="nav-category-link">{label}</a>' for href, label in LOCALE['links']
+    )
     
-    html = f'''<!DOCTYPE html>
-<html lang="zh-CN">
+    out.write(f'''<!DOCTYPE html>
+<html lang="{T['html_lang']}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI 日报 - {date_display} | 每日AI资讯</title>
-    <meta name="description" content="每日AI新闻、技术文章、产品融资、人物观点 - 您的AI资讯助手">
-    
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        :root {{
-            --bg-primary: #0a0a0b;
-            --bg-secondary: #141416;
-            --bg-card: #1c1c1f;
-            --bg-card-hover: #242428;
-            --text-primary: #f4f4f5;
-            --text-secondary: #a1a1aa;
-            --text-muted: #71717a;
-            --accent: #f97316;
-            --accent-hover: #fb923c;
-            --border: #27272a;
-            --category-news: #ef4444;
-            --category-tech: #3b82f6;
-            --category-products: #22c55e;
-            --category-funding: #eab308;
-            --category-people: #a855f7;
-            --category-opinions: #ec4899;
-            --category-tutorial: #14b8a6;
-            --category-fun: #f59e0b;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'PingFang SC', sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            line-height: 1.6;
-        }}
-        a {{ color: inherit; text-decoration: none; }}
-        
-        .subscribe-bar {{
-            background: linear-gradient(135deg, #1e1e22 0%, #27272d 100%);
-            border-bottom: 1px solid var(--border);
-            padding: 12px 24px;
-            text-align: center;
-        }}
-        .subscribe-content {{
-            max-width: 800px; margin: 0 auto;
-            display: flex; align-items: center; justify-content: center;
-            gap: 16px; flex-wrap: wrap;
-        }}
-        .subscribe-text {{ color: var(--text-secondary); font-size: 0.9rem; }}
-        .subscribe-text strong {{ color: var(--accent); }}
-        
-        .top-nav {{
-            background: var(--bg-secondary);
-            border-bottom: 1px solid var(--border);
-            position: sticky; top: 0; z-index: 100;
-        }}
-        .nav-container {{
-            max-width: 1400px; margin: 0 auto; padding: 16px 24px;
-            display: flex; align-items: center; justify-content: space-between;
-            flex-wrap: wrap; gap: 16px;
-        }}
-        .nav-brand {{ display: flex; align-items: center; gap: 16px; flex: 1; min-width: 300px; }}
-        .nav-logo {{ font-size: 1.5rem; font-weight: bold; }}
-        .nav-meta {{ display: flex; flex-direction: column; gap: 4px; }}
-        .nav-subtitle {{ color: var(--text-secondary); font-size: 0.85rem; }}
-        .nav-date {{ color: var(--text-muted); font-size: 0.8rem; }}
-        
-        .nav-categories {{
-            display: flex; gap: 8px; flex-wrap: wrap;
-        }}
-        .nav-category-link {{
-            padding: 8px 16px; border-radius: 20px;
-            background: var(--bg-card); color: var(--text-secondary);
-            font-size: 0.9rem; transition: all 0.2s;
-        }}
-        .nav-category-link:hover {{ background: var(--bg-card-hover); color: var(--text-primary); }}
-        
-        .main-layout {{
-            max-width: 1400px; margin: 0 auto; padding: 24px;
-            display: grid; grid-template-columns: 200px 1fr; gap: 24px;
-        }}
-        @media (max-width: 768px) {{
-            .main-layout {{ grid-template-columns: 1fr; }}
-            .sidebar {{ display: none; }}
-        }}
-        
-        .sidebar {{ position: sticky; top: 80px; height: fit-content; }}
-        .sidebar-section {{ background: var(--bg-secondary); border-radius: 12px; padding: 16px; margin-bottom: 16px; }}
-        .sidebar-title {{ font-size: 0.9rem; color: var(--text-muted); margin-bottom: 12px; text-transform: uppercase; letter-spacing: 0.5px; }}
-        .category-list, .date-list {{ list-style: none; }}
-        .category-item, .date-item {{ margin-bottom: 8px; }}
-        .category-link, .date-link {{ display: block; padding: 8px 12px; border-radius: 8px; color: var(--text-secondary); font-size: 0.9rem; }}
-        .category-link:hover, .date-link:hover {{ background: var(--bg-card); color: var(--text-primary); }}
-        
-        .content {{ display: flex; flex-direction: column; gap: 32px; }}
-        .category-section {{ scroll-margin-top: 100px; }}
-        .category-title {{ font-size: 1.3rem; margin-bottom: 16px; padding-bottom: 8px; border-bottom: 1px solid var(--border); }}
-        
-        .card {{
-            background: var(--bg-card); border-radius: 12px; padding: 20px;
-            margin-bottom: 16px; transition: transform 0.2s, box-shadow 0.2s;
-        }}
-        .card:hover {{ transform: translateY(-2px); box-shadow: 0 8px 24px rgba(0,0,0,0.3); }}
-        .card-header {{ display: flex; align-items: center; gap: 8px; margin-bottom: 12px; }}
-        .card-favicon {{ width: 20px; height: 20px; border-radius: 4px; }}
-        .card-source {{ color: var(--text-secondary); font-size: 0.85rem; }}
-        .card-title {{ font-size: 1.1rem; margin-bottom: 8px; }}
-        .card-title a {{ color: var(--text-primary); }}
-        .card-title a:hover {{ color: var(--accent); }}
-        .card-summary {{ color: var(--text-secondary); font-size: 0.9rem; margin-bottom: 12px; }}
-        .card-footer {{ display: flex; justify-content: space-between; align-items: center; }}
-        .card-category {{ padding: 4px 12px; border-radius: 12px; font-size: 0.8rem; }}
-        .category-news {{ background: rgba(239,68,68,0.2); color: #ef4444; }}
-        .category-tech {{ background: rgba(59,130,246,0.2); color: #3b82f6; }}
-        .category-products {{ background: rgba(34,197,94,0.2); color: #22c55e; }}
-        .category-funding {{ background: rgba(234,179,8,0.2); color: #eab308; }}
-        .category-people {{ background: rgba(168,85,247,0.2); color: #a855f7; }}
-        .category-opinions {{ background: rgba(236,72,153,0.2); color: #ec4899; }}
-        .category-tutorial {{ background: rgba(20,184,166,0.2); color: #14b8a6; }}
-        .category-fun {{ background: rgba(245,158,11,0.2); color: #f59e0b; }}
-        
-        footer {{ text-align: center; padding: 40px 20px; color: var(--text-muted); border-top: 1px solid var(--border); margin-top: 40px; }}
-        footer a {{ color: var(--accent); }}
-    </style>
+    <title>{T['main_title'].format(date=date_display)}</title>
+    <meta name="description" content="{T['description']}">
+    
+    <link rel="stylesheet" href="{STYLESHEETS['main']}">{favicon_link(indent="    ")}
 </head>
 <body>
     <div class="subscribe-bar">
         <div class="subscribe-content">
-            <span class="subscribe-text">📬 订阅获得最新AI资讯 | <strong>每日更新</strong> | 精选全球AI新闻</span>
+            <span class="subscribe-text">{T['subscribe']}</span>
         </div>
     </div>
     
     <nav class="top-nav">
         <div class="nav-container">
             <div class="nav-brand">
-                <a href="index.html" class="nav-logo">🤖 <span>AI 日报</span></a>
+                <a href="index.html" class="nav-logo">{T['nav_logo']}</a>
                 <div class="nav-meta">
-                    <span class="nav-subtitle">每日 AI 新闻资讯、技术文章、产品融资和人物观点</span>
-                    <span class="nav-date">{date_display} · {total}条资讯</span>
+                    <span class="nav-subtitle">{T['subtitle']}</span>
+                    <span class="nav-date">{T['nav_date'].format(date=date_display, total=total)}</span>
                 </div>
             </div>
             <div class="nav-categories">
                 {category_nav}
-                <a href="archive.html" class="nav-category-link">📂 归档</a>
+                <a href="archive.html" class="nav-category-link">{T['archive_link']}</a>{edition_links}
             </div>
         </div>
     </nav>
@@ -482,68 +926,625 @@ def generate_main_page(results):
     <div class="main-layout">
         <aside class="sidebar">
             <div class="sidebar-section">
-                <h3 class="sidebar-title">📂 分类</h3>
+                <h3 class="sidebar-title">{T['sidebar_categories']}</h3>
                 <ul class="category-list">
                     {sidebar_categories}
                 </ul>
             </div>
             <div class="sidebar-section">
-                <h3 class="sidebar-title">📅 归档</h3>
+                <h3 class="sidebar-title">{T['sidebar_archives']}</h3>
                 <ul class="date-list">
                     {sidebar_dates}
-                    <li class="date-item"><a href="archive.html" class="date-link" style="color: var(--accent);">查看全部 →</a></li>
+                    <li class="date-item"><a href="archive.html" class="date-link" style="color: var(--accent);">{T['view_all_archives']}</a></li>
                 </ul>
             </div>
         </aside>
         
         <main class="content">
-            {all_cards_html}
+            ''')
+    
+    # 生成分类HTML - 只显示有内容的分类
+    for cat_id, (_, cat_class) in CATEGORIES.items():
+        items = results.get(cat_id, [])
+        if items:
+            out.write(f'<section id="{cat_id}" class="category-section">\n')
+            out.write(f'<h2 class="category-title">{labels[cat_id]}</h2>\n')
+            chunk = chunks.get(cat_id) if chunks else None
+            for item in items[:chunk[1] if chunk else limit]:
+                write_card(out, item, cat_class, card_links(related, item, "archives/"))
+            if chunk:
+                deferred = len(items[chunk[1]:limit])
+                out.write(f'<div class="card-chunk" data-src="{chunk[0]}"><button type="button" class="load-more">{T["load_more"].format(n=deferred)}</button></div>\n')
+            if counts[cat_id] > limit:
+                out.write(f'<a href="{cat_id}.html" class="view-all" style="display: inline-block; margin-top: 16px; color: var(--accent);">{T["view_all"].format(n=counts[cat_id])}</a>\n')
+            out.write('</section>\n')
+    
+    out.write(f'''
         </main>
     </div>
     
     <footer>
-        <p>🤖 由 <strong>AI 日报</strong> 自动生成 · <a href="https://github.com/wallerwvw-cell/ai-daily-news" target="_blank">GitHub</a> · <a href="https://wallerwvw-cell.github.io/ai-daily-news/" target="_blank">在线阅读</a></p>
-        <p>汇聚 {total} 条精选AI资讯 · 每天早上8点更新</p>
-    </footer>
+        <p>{T['footer']} · <a href="https://github.com/wallerwvw-cell/ai-daily-news" target="_blank">GitHub</a> · <a href="https://wallerwvw-cell.github.io/ai-daily-news/" target="_blank">{T['read_online']}</a></p>
+        <p>{T['main_footer'].format(total=total)}</p>
+    </footer>{CHUNK_LOADER if chunks else ''}
 </body>
-</html>'''
-    
-    with open("/Users/alex/.openclaw/workspace/ai-daily-news/index.html", 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"✅ 生成 index.html ({total} 条资讯)")
+</html>''')
+
+def main_page_tasks(results, archives, date_str, limit=MAIN_PAGE_LIMIT, counts=None, related=None, chunks=None):
+    links = page_related(related, [item for items in results.values() for item in items[:limit]])
+    total = sum(len(v) for v in results.values()) if counts is None else sum(counts.values())
+    # 没用到的可选参数不放进 args，页面键与不使用这些功能时相同
+    extra = [counts, links or None, chunks or None]
+    while extra and extra[-1] is None:
+        extra.pop()
+    args = (results, archives, date_str, limit, *extra)
+    return [BuildTask(
+        f"{SITE_DIR}/index.html",
+        [SEARCH_RESULTS, DATA_DIR], render_main_page, args,
+        f"index.html ({total} 条资讯)", task_key(render_main_page, args)
+    )]
+
+# 主页延迟加载卡片分块的脚本：分块进入视口附近（或点击“加载更多”）时取回并替换占位元素；
+# 浏览器不支持 IntersectionObserver 时直接全部加载
+CHUNK_LOADER = '''
+    <script>
+    (function () {
+        var chunks = document.querySelectorAll('.card-chunk');
+        function load(el) {
+            if (el.dataset.loading) return;
+            el.dataset.loading = '1';
+            fetch(el.dataset.src).then(function (r) { return r.ok ? r.text() : Promise.reject(r.status); })
+                .then(function (html) { el.outerHTML = html; })
+                .catch(function () { delete el.dataset.loading; });
+        }
+        if (!('IntersectionObserver' in window)) { chunks.forEach(load); return; }
+        var observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (e) { if (e.isIntersecting) { observer.unobserve(e.target); load(e.target); } });
+        }, {rootMargin: '600px'});
+        chunks.forEach(function (el) { observer.observe(el); el.addEventListener('click', function () { load(el); }); });
+    })();
+    </script>'''
+
+def write_card_chunks(results, initial=MAIN_PAGE_INITIAL, limit=MAIN_PAGE_LIMIT, related=None):
+    """把主页每个分类首屏之后的卡片写成 chunks/<分类>.<哈希>.html，返回 {分类: (相对路径, 首屏条数)}
+
+    文件名带内容哈希，卡片没变的分类沿用昨天的地址（浏览器和 CDN 缓存继续有效）；不再引用的旧分块被删除。
+    """
+    chunks = {}
+    for cat_id, (_, cat_class) in CATEGORIES.items():
+        deferred = tuple(results.get(cat_id, ()))[initial:limit]
+        if not deferred:
+            continue
+        text = ''.join(card_fragment(item, cat_class, card_links(related, item, "archives/")) for item in deferred)
+        filename = f"{cat_id}.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}.html"
+        with open_output(f"{CHUNK_DIR}/{filename}") as out:
+            out.write(text)
+        chunks[cat_id] = (f"chunks/{filename}", initial)
+    current = {os.path.basename(href) for href, _ in chunks.values()}
+    if os.path.exists(CHUNK_DIR):
+        for entry in os.scandir(CHUNK_DIR):
+            if entry.name.endswith('.html') and entry.name not in current:
+                os.remove(entry.path)
+                load_output_manifest().pop(os.path.relpath(entry.path, SITE_DIR), None)
+    return chunks
+
+def generate_main_page(results, ctx=None):
+    """生成主页面"""
+    ctx = ctx or BuildContext.from_env()
+    today = ctx.date_str if any(results.values()) else None
+    run_build_tasks(main_page_tasks(results, get_all_archives(today), ctx.date_str))
+
+def task_cards(task):
+    """页面任务上显示的资讯；历史存档任务在子进程里才读取快照，返回 None"""
+    if task.render is render_main_page:
+        results, limit = task.args[0], task.args[3]
+        return [item for cat_id in CATEGORIES for item in results.get(cat_id, [])[:limit]]
+    if task.render in (render_category_page, render_daily_archive):
+        return task.args[1]
+    return None
+
+def load_favicons(domains, source=favicons.FAVICON_SOURCE, offline=False, prune=False):
+    """加载各域名的图标并写出图标样式表，页面通过 STYLESHEETS['favicons'] 引用
+
+    同一进程里（watch 模式）域名只增不减，样式表只在出现新域名时变化。
+    """
+    FAVICON_DOMAINS.update(domains)
+    domains = FAVICON_DOMAINS
+    icons, fetcher = favicons.load_favicons(domains, source=source, offline=offline)
+    STYLESHEETS['favicons'] = favicons.write_favicon_css(icons, prune=prune)
+    FAVICON_REPORT.update(domains=len(domains), icons=len(icons), fetch=fetcher.stats, pages={})
+    return icons, fetcher.origins
+
+def load_editions(codes):
+    """主进程一次读取并解析各版本的搜索结果，返回 {版本: {分类: (Item, ...)}}"""
+    return {code: load_search_results(f"{SITE_DIR}/{locales.EDITIONS[code][0]}") for code in codes}
 
-def main():
+def edition_items(code, results, history=False):
+    """版本当天的资讯，history 为真时加上它的全部快照，用于合并图标域名"""
+    items = [item for cat_items in results.values() for item in cat_items]
+    data_dir = f"{SITE_DIR}/{code}/data"
+    if history and os.path.exists(data_dir):
+        for entry in sorted(os.scandir(data_dir), key=lambda e: e.name):
+            if SNAPSHOT_RE.match(entry.name):
+                items += parse_day_snapshot(read_input(entry.path))
+    return items
+
+def edition_links(codes, current=''):
+    """主页上切换到其他版本的 (链接, 名称)；current 为当前版本，主站为空"""
+    links = [('../index.html', locales.MESSAGES[locales.EDITIONS[current][1]]['home_edition'])] if current else []
+    prefix = '../' if current else ''
+    links += [(f"{prefix}{code}/index.html", locales.EDITIONS[code][2]) for code in codes if code != current]
+    return links
+
+def render_edition_redirect(out, code):
+    """index-<版本>.html 跳转到 <版本>/index.html，保留旧链接"""
+    messages = locales.MESSAGES[locales.EDITIONS[code][1]]
+    out.write(f'''<!DOCTYPE html>
+<html lang="{messages['html_lang']}">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="refresh" content="0; url={code}/index.html">
+    <link rel="canonical" href="{code}/index.html">
+    <title>{messages['site_title']}</title>
+</head>
+<body>
+    <p><a href="{code}/index.html">{messages['site_title']} - {locales.EDITIONS[code][2]}</a></p>
+</body>
+</html>
+''')
+
+def edition_redirect_tasks(codes):
+    tasks = []
+    for code in codes:
+        args = (code,)
+        tasks.append(BuildTask(
+            f"{SITE_DIR}/index-{code}.html", [], render_edition_redirect, args,
+            f"index-{code}.html → {code}/index.html", task_key(render_edition_redirect, args)
+        ))
+    return tasks
+
+def start_editions(args, codes, editions, ctx):
+    """每个版本启动一个子进程，站点目录为 SITE_DIR/<版本>，与主站同时渲染
+
+    路径在模块导入时就已确定，所以版本在自己的进程里构建；解析好的资讯经 stdin 传入，
+    样式表和图标样式表沿用主站写好的文件。返回 {版本: (进程, 输出文件, 开始时间)}。
+    """
+    shared = json.dumps({name: f"../{href}" for name, href in STYLESHEETS.items()})
+    argv = [
+        sys.executable, os.path.abspath(__file__), '--editions', *codes, '--shared-assets', shared,
+        '--build-time', ctx.build_time.isoformat(), '--jobs', str(args.jobs), '--page-size', str(args.page_size),
+        '--main-limit', str(args.main_limit),
+        '--main-initial', str(args.main_initial)
+    ]
+    for flag in ('full_rebuild', 'rebuild_history', 'no_dedupe', 'near_dup', 'bloom', 'card_cache', 'related', 'compress'):
+        if getattr(args, flag):
+            argv.append('--' + flag.replace('_', '-'))
+    if args.size_budget:
+        argv += ['--size-budget', str(args.size_budget)]
+    if args.report:
+        argv.append('--report')
+    procs = {}
+    for code in codes:
+        log = tempfile.TemporaryFile()
+        env = dict(os.environ, AI_DAILY_NEWS_DIR=f"{SITE_DIR}/{code}", PYTHONIOENCODING='utf-8')
+        os.makedirs(env['AI_DAILY_NEWS_DIR'], exist_ok=True)
+        start = time.perf_counter()
+        proc = subprocess.Popen([*argv, '--edition', code], stdin=subprocess.PIPE, stdout=log, stderr=subprocess.STDOUT, env=env)
+        with proc.stdin:
+            pickle.dump(editions[code], proc.stdin)
+        procs[code] = (proc, log, start)
+    return procs
+
+def finish_editions(procs):
+    """等待各版本子进程结束，输出它们的日志并记录耗时"""
+    ended = {}
+    while len(ended) < len(procs):
+        for code, (proc, _, start) in procs.items():
+            if code not in ended and proc.poll() is not None:
+                ended[code] = time.perf_counter() - start
+        time.sleep(0.01)
+    for code, (proc, log, _) in procs.items():
+        log.seek(0)
+        lines = log.read().decode('utf-8', 'replace').splitlines()
+        log.close()
+        print(f"\n🌐 版本 {code}/:")
+        print('\n'.join(f"   {line}" for line in lines if line.strip()))
+        written = sum(int(m.group(1)) for m in re.finditer(r'写入文件: (\d+)', '\n'.join(lines)))
+        EDITION_REPORT[code] = {'wall_seconds': round(ended[code], 4), 'files_written': written, 'returncode': proc.returncode}
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+def report_page_favicons(tasks, icons, origins):
+    """每个页面原先要逐张请求的第三方图标改由同一个样式表提供，记录省下的请求"""
+    for task in tasks:
+        cards = task_cards(task)
+        if cards:
+            FAVICON_REPORT['pages'][os.path.relpath(task.output, SITE_DIR)] = favicons.page_savings(cards, icons, origins)
+
+def main(argv=None):
     """主函数"""
-    print("🚀 开始生成 AI 日报...")
+    parser = argparse.ArgumentParser(description="AI 日报生成脚本")
+    parser.add_argument('--full-rebuild', action='store_true', help="忽略搜索索引清单，重新读取全部快照")
+    parser.add_argument('--input', default=SEARCH_RESULTS, help="搜索结果文件（.json 按分类分组，或 .jsonl 每行一条）")
+    parser.add_argument('--stream', action='store_true', help="流式读取搜索结果，逐页渲染，峰值内存不随输入大小增长")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="并行渲染页面的进程数")
+    parser.add_argument('--rebuild-history', action='store_true', help="从快照重新渲染全部历史存档页面")
+    parser.add_argument('--no-dedupe', action='store_true', help="不按 URL 去除当天和历史上的重复资讯")
+    parser.add_argument('--near-dup', action='store_true', help="同时按标题 MinHash 去除近似重复的资讯")
+    parser.add_argument('--bloom', action='store_true', help="去重索引使用布隆过滤器（内存固定，适合多年历史）")
+    parser.add_argument('--card-cache', action='store_true', help="卡片片段同时缓存到磁盘，未变化的资讯跨构建复用")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help="分类页和每日存档每页的资讯条数")
+    parser.add_argument('--main-limit', type=int, default=MAIN_PAGE_LIMIT, help="主页每个分类最多显示的资讯条数")
+    parser.add_argument('--main-initial', type=int, default=MAIN_PAGE_INITIAL,
+                        help="主页每个分类直接写在页面里的条数，其余的延迟加载（不小于 --main-limit 时全部写在页面里）")
+    parser.add_argument('--build-time', type=datetime.fromisoformat, help="固定构建时间（ISO 格式），默认读取 SOURCE_DATE_EPOCH 或当前时间")
+    parser.add_argument('--no-minify-css', action='store_true', help="样式表不压缩（便于调试）")
+    parser.add_argument('--favicon-source', default=favicons.FAVICON_SOURCE, help="图标地址模板，{domain} 替换为域名（可指向本地桩服务器）")
+    parser.add_argument('--offline-favicons', action='store_true', help="图标只使用本地缓存，不发请求")
+    parser.add_argument('--editions', nargs='*', default=[], choices=sorted(locales.EDITIONS),
+                        help="同时构建的语言版本，输出到同名子目录（如 --editions cn en）")
+    parser.add_argument('--related', action='store_true', help="为每条资讯找出之前几天最相近的报道，显示在卡片上（结果按天缓存在 .related/）")
+    parser.add_argument('--compress', action='store_true', help="为文本输出写出 .gz（装有 brotli 时再加 .br）预压缩文件，并写出 size_report.json")
+    parser.add_argument('--size-budget', type=int, help="页面传输大小上限（字节），有页面超出时构建失败（隐含 --compress）")
+    parser.add_argument('--deploy', action='store_true', help="对比上次发布的清单写出 deploy_delta.json（新增、修改、删除的文件及哈希）")
+    parser.add_argument('--deploy-stage', metavar='DIR', help="只把变化的文件复制到这个目录（隐含 --deploy）")
+    parser.add_argument('--deploy-tarball', metavar='PATH', help="只把变化的文件打成 .tar.gz（隐含 --deploy）")
+    # 以下两个参数只由主进程传给版本子进程
+    parser.add_argument('--edition', choices=sorted(locales.EDITIONS), help=argparse.SUPPRESS)
+    parser.add_argument('--shared-assets', help=argparse.SUPPRESS)
+    parser.add_argument('--watch', action='store_true', help="构建后继续运行，search_results.json、data/ 或 archives/ 变化时只重建受影响的输出")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help="watch 模式的轮询间隔（秒）")
+    parser.add_argument('--report', nargs='?', const=BUILD_REPORT, help="记录各阶段耗时、内存和读写量，写出 build_report.json")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, help="用 cProfile 剖析主进程，结果写入 build.prof")
+    args = parser.parse_args(argv)
     
-    # 加载数据
-    results = load_search_results()
+    if args.report:
+        REPORT.enable()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        ctx = build(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"   - 剖析结果: {args.profile}")
+    if args.report:
+        REPORT.write(args.report, build_time=ctx.build_time.isoformat(), jobs=args.jobs, card_cache=CARD_CACHE.stats,
+                     favicons=FAVICON_REPORT, editions=EDITION_REPORT, main_page=MAIN_PAGE_REPORT)
+        print(f"   - 构建报告: {args.report}")
+    if args.watch:
+        watch(args)
+
+def build(args, changed_dates=()):
+    """按阶段执行一次完整构建，返回构建上下文
+
+    changed_dates 为快照有变化的历史日期（watch 模式），这些日期的存档页面也会重新渲染。
+    """
+    edition = args.edition
+    print(f"🚀 开始生成 AI 日报{f' ({edition})' if edition else ''}...")
     
-    # 1. 生成主页面
-    generate_main_page(results)
+    if args.card_cache:
+        CARD_CACHE.configure(CARD_CACHE_DIR)
+    if edition:
+        lang = locales.EDITIONS[edition][1]
+        configure_locale(lang, edition, edition_links(args.editions, edition))
+        generate_rss.configure_locale(T, f"{generate_rss.SITE_URL}{edition}/")
+    elif args.editions:
+        configure_locale(links=edition_links(args.editions))
     
-    # 2. 生成分类页面
-    generate_category_pages(results)
+    # 样式表只写一次，文件名带内容哈希，所有页面（包括各版本）引用同一个文件
+    with REPORT.stage('write_stylesheets'):
+        if edition:
+            STYLESHEETS.update(json.loads(args.shared_assets))
+        else:
+            configure_stylesheets(not args.no_minify_css)
+            assets.write_stylesheets(not args.no_minify_css, prune=args.rebuild_history)
     
-    # 3. 生成每日存档
-    generate_daily_archive(results)
+    # 加载数据；各版本的搜索结果也在主进程里一次读取、解析，再交给版本子进程
+    with REPORT.stage('load_search_results') as stage:
+        editions = {}
+        if edition:
+            results = pickle.load(sys.stdin.buffer)
+        else:
+            # 流式构建在写入当天快照时才逐条读取
+            results = {} if args.stream else load_search_results(args.input)
+            editions = load_editions(args.editions)
+        stage['items'] = sum(len(v) for v in results.values()) + sum(
+            len(v) for edition_results in editions.values() for v in edition_results.values())
+    
+    # 归档目录只在第一次（或 --full-rebuild）时扫描快照目录，之后只更新写入或变化的日期；
+    # 再为没有快照的旧存档补建快照
+    with REPORT.stage('backfill_day_snapshots') as stage:
+        archive_catalog = load_catalog(full_rebuild=args.full_rebuild)
+        for date in changed_dates:
+            archive_catalog.refresh(date)
+        stage['items'] = backfill_day_snapshots()
+    
+    # 整个构建共用同一个上下文，相同输入得到相同输出
+    ctx = BuildContext.from_env(args.build_time)
+    date_str = ctx.date_str
     
-    # 4. 生成归档索引
-    generate_archive_index()
+    stream = args.stream and not edition
+    ingest = spool = None
+    if stream:
+        # 逐条读取、去重，直接写入当天快照和按分类的临时文件，页面之后从文件逐页读取
+        with REPORT.stage('stream_ingest') as stage:
+            url_index = None if args.no_dedupe else warm_url_index(bloom=args.bloom, near_dup=args.near_dup)
+            deduper = url_index and dedup.Deduper(date_str, url_index, near_dup=args.near_dup)
+            spool = tempfile.TemporaryDirectory(prefix='ai-daily-news-')
+            ingest = stream_ingest(args.input, ctx, spool.name, deduper, args.main_limit)
+            if deduper:
+                stats = deduper.finish()
+                url_index.save()
+            if ingest.records:
+                archive_catalog.record(date_str, ingest.counts)
+            archives = get_all_archives()
+            results, records = ingest.head, ()
+            counts, record_count = ingest.counts, ingest.records
+            stage['items'] = record_count
+        if deduper:
+            print(f"✅ 去重: 保留 {stats['kept']} 条, 当天重复 {stats['same_day']} 条, "
+                  f"历史重复 {stats['earlier']} 条, 标题近似 {stats['near_dup']} 条")
+    else:
+        # 渲染前去掉重复资讯
+        if not args.no_dedupe:
+            with REPORT.stage('dedupe') as stage:
+                url_index = warm_url_index(bloom=args.bloom, near_dup=args.near_dup)
+                results, stats = dedup.dedupe_results(results, date_str, url_index, near_dup=args.near_dup)
+                url_index.save()
+                stage['items'] = stats['kept']
+            print(f"✅ 去重: 保留 {stats['kept']} 条, 当天重复 {stats['same_day']} 条, "
+                  f"历史重复 {stats['earlier']} 条, 标题近似 {stats['near_dup']} 条")
+        
+        with REPORT.stage('write_day_snapshot') as stage:
+            # 每日快照先写入，归档索引和搜索索引都依赖它
+            records = daily_records(results, ctx)
+            if records:
+                write_day_snapshot(records, date_str)
+                archive_catalog.record(date_str, Counter(record.category for record in records))
+            # 主页侧边栏的存档列表包含今天，下一次构建不会因此改写主页
+            archives = get_all_archives()
+            stage['items'] = len(records)
+        counts, record_count = None, len(records)
     
-    # 5. 生成搜索索引
-    generate_search_index()
+    # 相关报道：只计算快照有变化的日期（通常只有今天）及其之后的各天，结果变化的历史存档页也要重新渲染
+    today_related, related_dates = {}, []
+    if args.related:
+        with REPORT.stage('related') as stage:
+            related_stats = RELATED.update(full_rebuild=args.full_rebuild)
+            today_related = related_links(RELATED.links(date_str), args.page_size)
+            related_dates = related_stats['computed']
+            stage['items'] = related_stats['computed_docs']
+        print(f"✅ 相关报道: 计算 {len(related_dates)} 天 ({related_stats['computed_docs']} 条), "
+              f"共 {related_stats['docs']} 条资讯, 今天 {len(today_related)} 条有相关报道")
+    
+    # 需要重新渲染的历史存档：--rebuild-history 时为全部，watch 模式下为快照有变化的日期
+    if args.rebuild_history:
+        history_dates = [d for d in archive_catalog.dates() if d != date_str]
+    else:
+        history_dates = sorted(d for d in set(changed_dates) | set(related_dates)
+                               if d != date_str and d in archive_catalog.days)
+    history_related = {d: related_links(RELATED.links(d), args.page_size) for d in history_dates} if args.related else None
+    
+    # 全部资讯（包括各版本）的域名去重后每个域名只取一次图标，写成一个样式表，页面任务的键依赖它；
+    # 版本子进程直接引用主站的图标样式表
+    icons, origins = {}, {}
+    if not edition:
+        with REPORT.stage('favicons') as stage:
+            domains = ingest.domains if stream else favicons.collect_domains(records)
+            if history_dates:
+                history = load_history(history_dates)
+                domains.update(favicons.collect_domains(record for date in history_dates for record in history[date]))
+            for code, edition_results in editions.items():
+                domains.update(favicons.collect_domains(edition_items(code, edition_results, args.rebuild_history)))
+            icons, origins = load_favicons(domains, args.favicon_source, args.offline_favicons, args.rebuild_history)
+            stage['items'] = FAVICON_REPORT['domains']
+        fetch = FAVICON_REPORT['fetch']
+        print(f"✅ 图标: {FAVICON_REPORT['domains']} 个域名, 缓存命中 {fetch['cache_hits']}, "
+              f"新抓取 {fetch['fetched']}, 失败 {fetch['failed']}, 占位 {FAVICON_REPORT['domains'] - FAVICON_REPORT['icons']}")
+    
+    # 各版本在自己的子进程里渲染页面、存档、Feed 和搜索索引，与主站同时进行
+    procs = start_editions(args, list(editions), editions, ctx) if editions else {}
+    
+    # 1-4. 主页面、分类页面、每日存档、归档索引互相独立，可以并行渲染
+    # 流式构建时分类页和当天存档页在渲染时才逐页读取（streamed），其余页面照常规划
+    with REPORT.stage('plan_pages') as stage:
+        if stream:
+            archive_tasks = []
+            streamed = chain(
+                stream_category_tasks(spool.name, counts, args.page_size, today_related),
+                stream_daily_archive_tasks(date_str, record_count, args.page_size, today_related)
+            )
+            page_tasks = []
+        else:
+            archive_tasks = daily_archive_tasks(records, date_str, args.page_size, today_related)
+            streamed = ()
+            page_tasks = category_page_tasks(results, args.page_size, today_related)
+        archive_dates = [date_str] if record_count else []
+        if history_dates:
+            archive_tasks += history_archive_tasks(history_dates, args.page_size, history_related)
+            archive_dates += history_dates
+        chunks = write_card_chunks(results, args.main_initial, args.main_limit, today_related)
+        tasks = (
+            main_page_tasks(results, archives, date_str, args.main_limit, counts, today_related, chunks)
+            + page_tasks
+            + archive_tasks
+            + archive_index_tasks()
+            + edition_redirect_tasks(editions)
+        )
+        stage['items'] = len(tasks)
+    
+    if not edition:
+        report_page_favicons(tasks, icons, origins)
+    
+    with REPORT.stage('render_pages') as stage:
+        run_build_tasks(tasks, args.jobs)
+        for batch in batched(streamed, STREAM_BATCH * max(1, args.jobs)):
+            if not edition:
+                report_page_favicons(batch, icons, origins)
+            run_build_tasks(batch, args.jobs)
+            # 只保留输出路径，用于清理旧分页
+            tasks += [task._replace(args=()) for task in batch]
+        if spool:
+            spool.cleanup()
+        
+        # 分页数减少时删除多出来的旧页面
+        for cat_id in CATEGORIES:
+            prune_pages(tasks, SITE_DIR, cat_id)
+        for date in archive_dates:
+            prune_pages(tasks, ARCHIVE_DIR, date)
+        prune_rollups(tasks)
+        stage['items'] = len(tasks)
+    
+    # 主页首屏文档的大小，以及滚动时才加载的分块
+    MAIN_PAGE_REPORT.update(
+        initial_bytes=os.path.getsize(f"{SITE_DIR}/index.html"),
+        chunks=len(chunks),
+        chunk_bytes=sum(os.path.getsize(f"{SITE_DIR}/{href}") for href, _ in chunks.values()),
+        deferred_cards=sum(len(tuple(results.get(cat_id, ()))[initial:args.main_limit]) for cat_id, (_, initial) in chunks.items())
+    )
+    
+    # 5. 用同一份数据生成 RSS（只依赖当天资讯，放在耗时较长的搜索索引之前）
+    with REPORT.stage('generate_rss') as stage:
+        if stream and record_count:
+            records = iter_snapshot_file(f"{DATA_DIR}/{date_str}.jsonl")
+        generate_rss.generate_rss(ctx, records)
+        stage['items'] = record_count
+    
+    # 6. 生成搜索索引
+    with REPORT.stage('generate_search_index'):
+        generate_search_index(full_rebuild=args.full_rebuild)
+    
+    # 7. 预压缩：只重新压缩内容哈希变化的输出
+    compress_report = None
+    if args.compress or args.size_budget:
+        with REPORT.stage('compress') as stage:
+            compress_report, compress_stats = compress.precompress()
+            compress.write_size_report(compress_report, budget=args.size_budget)
+            stage['items'] = compress_stats['compressed']
+        print(f"✅ 预压缩: 重新压缩 {compress_stats['compressed']} 个, 未变化 {compress_stats['unchanged']} 个, "
+              f"清理 {compress_stats['removed']} 个 ({', '.join(suffix for suffix, _ in compress.encodings())})")
+    
+    with REPORT.stage('save_state'):
+        CARD_CACHE.flush()
+        save_output_manifest()
+        save_page_keys()
+        save_catalog()
+        compress.save_state()
+    
+    if procs:
+        with REPORT.stage('editions') as stage:
+            finish_editions(procs)
+            stage['items'] = len(procs)
+    
+    # 8. 增量发布：在版本子目录也写完之后，对比上次发布的清单；有页面超出大小预算时不暂存
+    delta = None
+    over_budget = bool(compress_report is not None and args.size_budget
+                       and compress.over_budget(compress_report, args.size_budget))
+    if over_budget and (args.deploy or args.deploy_stage or args.deploy_tarball):
+        print("⚠️ 有页面超出大小预算，跳过增量发布")
+    elif args.deploy or args.deploy_stage or args.deploy_tarball:
+        with REPORT.stage('deploy') as stage:
+            delta, _ = deploy.prepare(stage=args.deploy_stage, tarball=args.deploy_tarball)
+            stage['items'] = len(deploy.changed(delta))
     
     print("\n🎉 全部生成完成!")
     
     # 统计
-    total = sum(len(v) for v in results.values() if isinstance(v, list))
+    total = sum(counts.values()) if counts is not None else sum(len(v) for v in results.values())
     print(f"\n📊 统计:")
-    print(f"   - 主页面: index.html ({total} 条)")
-    print(f"   - 分类页面: {len(CATEGORIES)} 个")
-    print(f"   - 每日存档: 1 个")
-    print(f"   - 归档索引: archive.html")
-    print(f"   - 搜索索引: search_index.json")
+    print(f"   - 主页面: index.html ({total} 条, 首屏文档 {MAIN_PAGE_REPORT['initial_bytes']} 字节, "
+          f"延迟加载 {MAIN_PAGE_REPORT['chunks']} 个分块 / {MAIN_PAGE_REPORT['deferred_cards']} 张卡片 {MAIN_PAGE_REPORT['chunk_bytes']} 字节)")
+    print(f"   - 分类页面: {len(CATEGORIES)} 个分类 (每页 {args.page_size} 条)")
+    archive_pages = sum(1 for task in tasks if task.render in (render_daily_archive, render_snapshot_archive))
+    print(f"   - 每日存档: {archive_pages} 个页面 (含 data/ 快照)")
+    print(f"   - 归档索引: archive.html + archives/YYYY-MM.html、archives/YYYY.html 汇总页 ({len(load_catalog().months())} 个月)")
+    print(f"   - 样式表: {', '.join(STYLESHEETS.values())}")
+    for page, row in FAVICON_REPORT.get('pages', {}).items():
+        print(f"   - 图标 {page}: {row['cards']} 张卡片, {row['domains']} 个域名, 缓存命中 {row['cache_hits']}, "
+              f"省去 {row['requests_saved']} 个第三方请求 ({row['bytes_saved']} 字节)")
+    print(f"   - 搜索索引: search/ (分片倒排索引)")
+    print(f"   - Feed: feed.xml / atom.xml / feed.json (含 feeds/ 存档分页)")
+    card_stats = CARD_CACHE.stats
+    print(f"   - 卡片缓存: 命中 {card_stats['hits']} 次, 磁盘命中 {card_stats['disk_hits']} 次, 渲染 {card_stats['misses']} 次")
+    for code, row in EDITION_REPORT.items():
+        print(f"   - 版本 {code}/: 用时 {row['wall_seconds']:.2f}s (与主站同时渲染), 写入 {row['files_written']} 个文件")
+    print(f"   - 写入文件: {OUTPUT_STATS['written']} 个, 未变化跳过: {OUTPUT_STATS['skipped']} 个")
+    if compress_report is not None:
+        print(f"   - 输出大小 (size_report.json):")
+        compress.print_size_report(compress_report)
+        if args.size_budget:
+            compress.check_budget(compress_report, args.size_budget)
+    if delta is not None:
+        targets = [path for path in (args.deploy_stage, args.deploy_tarball) if path]
+        print(f"   - 增量发布 (deploy_delta.json{', 暂存到 ' + ', '.join(targets) if targets else ''}; 发布后运行 deploy.py --commit 确认):")
+        deploy.print_report(delta)
+    return ctx
+
+def scan_inputs(input_path=SEARCH_RESULTS):
+    """watch 模式监视的输入文件及其 (mtime, 大小)：搜索结果（input_path，即 --input）、每日快照和旧存档页面"""
+    found = {}
+    try:
+        st = os.stat(input_path)
+        found[input_path] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    for directory, pattern in ((DATA_DIR, SNAPSHOT_RE), (ARCHIVE_DIR, DATE_PAGE_RE)):
+        if not os.path.exists(directory):
+            continue
+        for entry in os.scandir(directory):
+            if pattern.match(entry.name):
+                st = entry.stat()
+                found[entry.path] = (st.st_mtime_ns, st.st_size)
+    return found
+
+def watch(args):
+    """常驻运行：轮询输入文件，变化时在同一进程里重建
+
+    模板、卡片片段、页面键、输出清单、去重索引、搜索索引和快照条数都留在内存里，
+    每次只重新读取变化的输入；页面键没变的页面、内容没变的索引分片都不会重写。
+    搜索结果变化重建当天的页面、Feed 和搜索索引，历史快照变化重建那一天的存档页、
+    所在月份、年份的汇总页、归档索引和搜索索引，新增的旧存档页面先补建快照。
+    """
+    # 预热搜索索引：之后的改动只需重新切分变化的月份
+    SEARCH_INDEX.update(search_index_items(load_search_index_manifest()['snapshots']))
+    input_path = args.input
+    print(f"\n👀 监视 {input_path}、{DATA_DIR}/、{ARCHIVE_DIR}/ (每 {args.interval}s 轮询, Ctrl-C 退出)")
+    seen = scan_inputs(input_path)
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = scan_inputs(input_path)
+            if current == seen:
+                continue
+            # 编辑器保存可能分几次写入，等文件不再变化
+            while True:
+                time.sleep(WATCH_SETTLE)
+                settled = scan_inputs(input_path)
+                if settled == current:
+                    break
+                current = settled
+            changed = {path for path in current.keys() | seen.keys() if current.get(path) != seen.get(path)}
+            changed_dates = {os.path.basename(path)[:10] for path in changed if path.startswith(DATA_DIR + os.sep)}
+            start = time.perf_counter()
+            written = OUTPUT_STATS['written']
+            try:
+                build(args, changed_dates)
+            except (OSError, ValueError) as e:
+                # 文件写到一半或内容有误时保持运行，下次保存再重建
+                print(f"❌ 重建失败: {e}")
+            after = scan_inputs(input_path)
+            # 构建自己写入的快照和存档页不算新变化；搜索结果只由外部修改，构建期间的保存留到下一轮
+            seen = {path: meta for path, meta in after.items() if path != input_path}
+            if input_path in current:
+                seen[input_path] = current[input_path]
+            names = ', '.join(sorted(os.path.relpath(path, SITE_DIR) for path in changed))
+            print(f"⚡ {names} → 写入 {OUTPUT_STATS['written'] - written} 个文件, "
+                  f"用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n👋 停止监视")
 
 if __name__ == "__main__":
     main()
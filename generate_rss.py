@@ -1,94 +1,332 @@
 #!/usr/bin/env python3
 """
 AI 日报 RSS Feed 生成脚本
+滚动窗口：新资讯并入持久化的 feed_state.json，同一次构建输出 RSS、Atom 和 JSON Feed；
+滚出窗口的资讯按 RFC 5005 写入不再变化的 Atom 存档分页 feeds/archive-N.xml
 """
 
+import argparse
+import hashlib
 import json
 import os
-from datetime import datetime
-from urllib.parse import urlparse
-
-SEARCH_RESULTS = "/Users/alex/.openclaw/workspace/ai-daily-news/search_results.json"
-OUTPUT_FILE = "/Users/alex/.openclaw/workspace/ai-daily-news/feed.xml"
-
-def extract_domain(url):
-    try:
-        return urlparse(url).netloc.replace('www.', '')
-    except:
-        return ''
-
-def load_search_results():
-    if os.path.exists(SEARCH_RESULTS):
-        with open(SEARCH_RESULTS, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def generate_rss():
-    data = load_search_results()
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    # 收集所有文章
-    all_items = []
-    categories = {
-        'news': '📰 新闻',
-        'tech': '💻 技术', 
-        'tutorial': '📚 教程',
-        'fun': '🎉 趣闻',
-        'products': '🚀 AI产品',
-        'funding': '💰 融资',
-        'people': '👤 人物',
-        'opinions': '💡 观点'
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape, quoteattr
+
+from core import (
+    SITE_DIR, BuildContext, get_snapshot_dates, load_day_snapshot, load_history,
+    load_search_results, open_output, save_output_manifest
+)
+
+OUTPUT_FILE = f"{SITE_DIR}/feed.xml"
+ATOM_FILE = f"{SITE_DIR}/atom.xml"
+JSON_FEED_FILE = f"{SITE_DIR}/feed.json"
+FEED_ARCHIVE_DIR = f"{SITE_DIR}/feeds"
+FEED_STATE = f"{SITE_DIR}/feed_state.json"
+FEED_HEADERS = f"{SITE_DIR}/feed_headers.json"
+FEED_STATE_VERSION = 1
+SITE_URL = "https://wallerwvw-cell.github.io/ai-daily-news/"
+FEED_TITLE = "AI 日报"
+FEED_DESCRIPTION = "每日AI新闻、技术文章、产品融资、人物观点 - 您的AI资讯助手"
+# RSS/Atom 和 JSON Feed 的语言标记
+FEED_LANGUAGE = 'zh-cn'
+JSON_FEED_LANGUAGE = 'zh-CN'
+# 当前 feed 至少保留最新的 FEED_SIZE 条；滚出的资讯攒满 ARCHIVE_FEED_SIZE 条写成一页存档
+FEED_SIZE = 50
+ARCHIVE_FEED_SIZE = 50
+CATEGORY_LABELS = {
+    'news': '📰 新闻',
+    'tech': '💻 技术',
+    'tutorial': '📚 教程',
+    'fun': '🎉 趣闻',
+    'products': '🚀 AI产品',
+    'funding': '💰 融资',
+    'people': '👤 人物',
+    'opinions': '💡 观点'
+}
+CONTENT_TYPES = {
+    '.xml': 'application/xml; charset=utf-8',
+    '.json': 'application/feed+json; charset=utf-8'
+}
+
+def configure_locale(messages, site_url=SITE_URL):
+    """其他语言版本的 Feed：标题、描述、分类名、语言和站点地址取自 locales.MESSAGES"""
+    global SITE_URL, FEED_TITLE, FEED_DESCRIPTION, FEED_LANGUAGE, JSON_FEED_LANGUAGE, CATEGORY_LABELS
+    SITE_URL = site_url
+    FEED_TITLE = messages['site_title']
+    FEED_DESCRIPTION = messages['description']
+    FEED_LANGUAGE = messages['feed_language']
+    JSON_FEED_LANGUAGE = messages['html_lang']
+    CATEGORY_LABELS = messages['feed_categories']
+
+def load_latest_snapshot():
+    """读取最新一天的快照 data/YYYY-MM-DD.jsonl"""
+    dates = get_snapshot_dates()
+    return load_day_snapshot(dates[0]) if dates else []
+
+def item_guid(item):
+    """稳定的 GUID：有链接时用链接本身，否则用日期和标题生成 tag URI"""
+    if item.url.startswith(('http://', 'https://')):
+        return item.url
+    digest = hashlib.sha256(item.title.encode('utf-8')).hexdigest()[:16]
+    return f"tag:wallerwvw-cell.github.io,{item.date or '2026-01-01'}:{digest}"
+
+def feed_entry(item, ctx):
+    """资讯 -> 存入 feed 状态的记录（第一次出现时确定，之后不再变化）"""
+    summary = item.summary
+    if len(summary) > 300:
+        summary = summary[:300] + '...'
+    return {
+        'guid': item_guid(item),
+        'date': item.date or ctx.date_str,
+        'time': item.time or ctx.item_time(item),
+        'category': item.category,
+        'title': item.title,
+        'summary': summary,
+        'url': item.url,
+        'source': item.source
     }
-    
-    for cat_key, cat_name in categories.items():
-        if cat_key in data and isinstance(data[cat_key], list):
-            for item in data[cat_key]:
-                item['category'] = cat_name
-                all_items.append(item)
-    
-    # 按时间排序（最新的在前）
-    all_items.sort(key=lambda x: x.get('time', ''), reverse=True)
-    
-    # 生成 RSS
-    rss = '''<?xml version="1.0" encoding="UTF-8"?>
+
+def guid_key(guid):
+    """已存档资讯在状态文件里只记短摘要"""
+    return hashlib.blake2b(guid.encode('utf-8'), digest_size=6).hexdigest()
+
+def entry_sort_key(entry):
+    return (entry['date'], entry['time'], entry['guid'])
+
+def entry_datetime(entry):
+    return datetime.strptime(f"{entry['date']} {entry['time']}", "%Y-%m-%d %H:%M")
+
+def rfc822(dt):
+    return dt.strftime("%a, %d %b %Y %H:%M:%S +0000")
+
+def rfc3339(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def http_date(dt):
+    return dt.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+def load_feed_state():
+    if os.path.exists(FEED_STATE):
+        try:
+            with open(FEED_STATE, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == FEED_STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+    return None
+
+def save_feed_state(state):
+    with open(FEED_STATE + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(state, ensure_ascii=False, separators=(',', ':')))
+    os.replace(FEED_STATE + '.tmp', FEED_STATE)
+
+def roll_window(entries, feed_size=FEED_SIZE, feed_days=None, archive_size=ARCHIVE_FEED_SIZE):
+    """把窗口外攒满一页的最旧资讯切出去，返回 (留在当前 feed 的资讯, [存档页资讯])
+
+    entries 为最新在前。窗口为最新的 feed_size 条，给定 feed_days 时改为最近 feed_days 天，
+    窗口外不足一页的资讯继续留在当前 feed，保证当前 feed 与存档页之间没有缺口。
+    """
+    window = min(feed_size, len(entries))
+    if feed_days is not None and entries:
+        cutoff = (datetime.strptime(entries[0]['date'], "%Y-%m-%d") - timedelta(days=feed_days - 1)).strftime("%Y-%m-%d")
+        window = sum(1 for entry in entries if entry['date'] >= cutoff)
+    pages = []
+    while len(entries) - window >= archive_size:
+        pages.insert(0, entries[-archive_size:])
+        entries = entries[:-archive_size]
+    return entries, pages
+
+def archive_href(page):
+    return f"feeds/archive-{page}.xml"
+
+def write_rss(out, entries, updated, archives=0):
+    """把 RSS 逐条写入 out（文件或 io.StringIO）"""
+    out.write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
 <channel>
-    <title>AI 日报</title>
-    <link>https://wallerwvw-cell.github.io/ai-daily-news/</link>
-    <description>每日AI新闻、技术文章、产品融资、人物观点 - 您的AI资讯助手</description>
-    <language>zh-cn</language>
-    <lastBuildDate>''' + datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000") + '''</lastBuildDate>
-    <atom:link href="https://wallerwvw-cell.github.io/ai-daily-news/feed.xml" rel="self" type="application/rss+xml"/>
-'''
-    
-    for item in all_items[:50]:  # 最多50条
-        title = item.get('title', '').replace('<', '&lt;').replace('>', '&gt;')
-        url = item.get('url', '#')
-        summary = item.get('summary', '') or item.get('snippet', '')
-        if len(summary) > 300:
-            summary = summary[:300] + '...'
-        summary = summary.replace('<', '&lt;').replace('>', '&gt;')
-        source = item.get('source', '') or extract_domain(url)
-        category = item.get('category', '📰 新闻')
-        
-        rss += f'''    <item>
+    <title>{FEED_TITLE}</title>
+    <link>{SITE_URL}</link>
+    <description>{FEED_DESCRIPTION}</description>
+    <language>{FEED_LANGUAGE}</language>
+    <lastBuildDate>{rfc822(updated)}</lastBuildDate>
+    <atom:link href="{SITE_URL}feed.xml" rel="self" type="application/rss+xml"/>
+''')
+    if archives:
+        out.write(f'    <atom:link href="{SITE_URL}{archive_href(archives)}" rel="prev-archive" type="application/atom+xml"/>\n')
+
+    for entry in entries:
+        title = entry['title'].replace('<', '&lt;').replace('>', '&gt;')
+        summary = entry['summary'].replace('<', '&lt;').replace('>', '&gt;')
+        category = CATEGORY_LABELS.get(entry['category'], CATEGORY_LABELS['news'])
+        permalink = 'true' if entry['guid'] == entry['url'] else 'false'
+
+        out.write(f'''    <item>
         <title><![CDATA[{title}]]></title>
-        <link>{url}</link>
+        <link>{escape(entry['url'])}</link>
         <description><![CDATA[{summary}]]></description>
-        <source>{source}</source>
+        <source>{escape(entry['source'])}</source>
         <category>{category}</category>
-        <guid isPermaLink="true">{url}</guid>
+        <pubDate>{rfc822(entry_datetime(entry))}</pubDate>
+        <guid isPermaLink="{permalink}">{escape(entry['guid'])}</guid>
     </item>
-'''
-    
-    rss += '''</channel>
-</rss>'''
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(rss)
-    
-    print(f"✅ RSS Feed 已生成: {OUTPUT_FILE}")
-    print(f"📡 共 {len(all_items)} 条资讯")
+''')
+
+    out.write('''</channel>
+</rss>''')
+
+def write_atom(out, entries, updated, self_href, links=(), archive=False):
+    """Atom feed；links 为 [(rel, href)]，archive 为真时标记为 RFC 5005 存档文档"""
+    out.write(f'''<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:fh="http://purl.org/syndication/history/1.0" xml:lang="{FEED_LANGUAGE}">
+    <title>{FEED_TITLE}</title>
+    <subtitle>{FEED_DESCRIPTION}</subtitle>
+    <id>{SITE_URL}atom.xml</id>
+    <updated>{rfc3339(updated)}</updated>
+    <author><name>{FEED_TITLE}</name></author>
+    <link href="{SITE_URL}" rel="alternate" type="text/html"/>
+    <link href="{SITE_URL}{self_href}" rel="self" type="application/atom+xml"/>
+''')
+    for rel, href in links:
+        out.write(f'    <link href="{SITE_URL}{href}" rel="{rel}" type="application/atom+xml"/>\n')
+    if archive:
+        out.write('    <fh:archive/>\n')
+
+    for entry in entries:
+        published = rfc3339(entry_datetime(entry))
+        out.write(f'''    <entry>
+        <title>{escape(entry['title'])}</title>
+        <id>{escape(entry['guid'])}</id>
+        <link href={quoteattr(entry['url'])}/>
+        <published>{published}</published>
+        <updated>{published}</updated>
+        <category term="{entry['category']}" label={quoteattr(CATEGORY_LABELS.get(entry['category'], CATEGORY_LABELS['news']))}/>
+        <summary>{escape(entry['summary'])}</summary>
+    </entry>
+''')
+
+    out.write('</feed>')
+
+def write_json_feed(out, entries):
+    """JSON Feed 1.1"""
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'home_page_url': SITE_URL,
+        'feed_url': f"{SITE_URL}feed.json",
+        'description': FEED_DESCRIPTION,
+        'language': JSON_FEED_LANGUAGE,
+        'items': [{
+            'id': entry['guid'],
+            'url': entry['url'],
+            'title': entry['title'],
+            'summary': entry['summary'],
+            'date_published': rfc3339(entry_datetime(entry)),
+            'tags': [CATEGORY_LABELS.get(entry['category'], CATEGORY_LABELS['news'])],
+            '_source': entry['source']
+        } for entry in entries]
+    }
+    out.write(json.dumps(feed, ensure_ascii=False, separators=(',', ':')))
+
+def write_archive_page(page, entries, headers):
+    """写入第 page 页存档；更新时间取页内最新资讯的时间，重建时内容也不会变化"""
+    path = f"{FEED_ARCHIVE_DIR}/archive-{page}.xml"
+    updated = entry_datetime(entries[0])
+    links = [('current', 'atom.xml')]
+    if page > 1:
+        links.append(('prev-archive', archive_href(page - 1)))
+    with open_output(path) as out:
+        write_atom(out, entries, updated, archive_href(page), links, archive=True)
+    headers[archive_href(page)] = {'digest': out.digest, 'updated': http_date(updated)}
+
+def generate_rss(ctx=None, items=None, feed_size=FEED_SIZE, feed_days=None, archive_size=ARCHIVE_FEED_SIZE, rebuild=False):
+    """把新资讯并入滚动窗口并生成 RSS/Atom/JSON Feed
+
+    items 为已加载的当天资讯，未传入时读取最新快照，再回退到搜索结果；
+    没有状态文件（或 rebuild）时用全部历史快照初始化窗口和存档分页。
+    """
+    ctx = ctx or BuildContext.from_env()
+    state = None if rebuild else load_feed_state()
+
+    if not items:
+        items = load_latest_snapshot()
+    if not items:
+        items = [ctx.stamp(item) for cat_items in load_search_results().values() for item in cat_items]
+    if state is None:
+        history = load_history()
+        items = [item for date in sorted(history) for item in history[date]] + list(items)
+        state = {'version': FEED_STATE_VERSION, 'archives': 0, 'digest': '', 'updated': '', 'entries': [], 'archived': [], 'headers': {}}
+
+    # 已在窗口里的资讯保留第一次出现时的记录，GUID 和时间不随重复运行变化
+    # 已滚入存档的资讯不会因为再次出现而回到当前 feed
+    archived = set(state['archived'])
+    entries = {entry['guid']: entry for entry in state['entries']}
+    new = 0
+    for item in items:
+        if item.category not in CATEGORY_LABELS:
+            continue
+        entry = feed_entry(item, ctx)
+        if entry['guid'] not in entries and guid_key(entry['guid']) not in archived:
+            entries[entry['guid']] = entry
+            new += 1
+    entries = sorted(entries.values(), key=entry_sort_key, reverse=True)
+    entries, pages = roll_window(entries, feed_size, feed_days, archive_size)
+
+    # 内容不变时沿用上次的更新时间，输出逐字节相同，轮询方可以得到 304
+    archives = state['archives'] + len(pages)
+    digest = hashlib.sha256(json.dumps([archives, entries], ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    if digest == state['digest'] and state['updated']:
+        updated = datetime.fromisoformat(state['updated'])
+    else:
+        updated = ctx.build_time
+
+    headers = state.get('headers', {})
+    for i, page_entries in enumerate(pages, state['archives'] + 1):
+        state['archived'].extend(guid_key(entry['guid']) for entry in page_entries)
+        write_archive_page(i, page_entries, headers)
+
+    links = [('prev-archive', archive_href(archives))] if archives else []
+    outputs = [
+        ('feed.xml', OUTPUT_FILE, lambda out: write_rss(out, entries, updated, archives)),
+        ('atom.xml', ATOM_FILE, lambda out: write_atom(out, entries, updated, 'atom.xml', links)),
+        ('feed.json', JSON_FEED_FILE, lambda out: write_json_feed(out, entries))
+    ]
+    for name, path, write in outputs:
+        with open_output(path) as out:
+            write(out)
+        headers[name] = {'digest': out.digest, 'updated': http_date(updated)}
+
+    # 条件请求所需的响应头：ETag 取内容摘要，Last-Modified 取内容最后变化的时间
+    with open_output(FEED_HEADERS) as out:
+        out.write(json.dumps({
+            name: {
+                'ETag': f'"{meta["digest"][:32]}"',
+                'Last-Modified': meta['updated'],
+                'Content-Type': CONTENT_TYPES[os.path.splitext(name)[1]]
+            } for name, meta in sorted(headers.items())
+        }, ensure_ascii=False, indent=2))
+
+    state.update({
+        'archives': archives,
+        'digest': digest,
+        'updated': updated.isoformat(),
+        'entries': entries,
+        'headers': headers
+    })
+    save_feed_state(state)
+
+    print(f"✅ RSS Feed 已生成: {OUTPUT_FILE} (Atom / JSON Feed 同步生成)")
+    print(f"📡 共 {len(entries)} 条资讯, 新增 {new} 条, 存档 {archives} 页")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 日报 RSS/Atom/JSON Feed 生成")
+    parser.add_argument('--feed-size', type=int, default=FEED_SIZE, help="当前 feed 至少保留的最新资讯条数")
+    parser.add_argument('--feed-days', type=int, help="改为保留最近若干天的资讯")
+    parser.add_argument('--archive-size', type=int, default=ARCHIVE_FEED_SIZE, help="每页存档 feed 的资讯条数")
+    parser.add_argument('--rebuild', action='store_true', help="忽略 feed_state.json，用全部历史快照重建")
+    args = parser.parse_args(argv)
+    generate_rss(feed_size=args.feed_size, feed_days=args.feed_days, archive_size=args.archive_size, rebuild=args.rebuild)
+    save_output_manifest()
 
 if __name__ == "__main__":
-    generate_rss()
+    main()
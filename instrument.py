@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+AI 日报构建报告
+按阶段记录墙钟/CPU 时间、tracemalloc 峰值、读写的文件数和字节数、资讯条数，
+按渲染函数汇总页面任务，最后写出 build_report.json；未启用时 stage() 不做任何记录
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from core import INPUT_STATS, OUTPUT_STATS
+
+def cpu_seconds():
+    """本进程加上已回收子进程（进程池）的 CPU 时间"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+def peak_rss_kb():
+    # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+class BuildReport:
+    def __init__(self):
+        self.enabled = False
+        self.stages = []
+        self.tasks = {}
+        self._start = None
+
+    def enable(self, trace_memory=True):
+        self.enabled = True
+        self._start = (time.perf_counter(), cpu_seconds())
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _counters(self):
+        return (time.perf_counter(), cpu_seconds(), dict(INPUT_STATS), dict(OUTPUT_STATS))
+
+    @contextmanager
+    def stage(self, name):
+        """记录一个阶段；with 块内可以设置 stage['items'] 为处理的资讯条数"""
+        if not self.enabled:
+            yield {}
+            return
+        stage = {'stage': name, 'items': None}
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall, cpu, inputs, outputs = self._counters()
+        try:
+            yield stage
+        finally:
+            wall_end, cpu_end, inputs_end, outputs_end = self._counters()
+            stage.update({
+                'wall_seconds': round(wall_end - wall, 4),
+                'cpu_seconds': round(cpu_end - cpu, 4),
+                'tracemalloc_peak_kb': tracemalloc.get_traced_memory()[1] // 1024 if tracemalloc.is_tracing() else None,
+                'files_read': inputs_end['files'] - inputs['files'],
+                'bytes_read': inputs_end['bytes'] - inputs['bytes'],
+                'files_written': outputs_end['written'] - outputs['written'],
+                'files_skipped': outputs_end['skipped'] - outputs['skipped'],
+                'bytes_written': outputs_end['bytes'] - outputs['bytes']
+            })
+            self.stages.append(stage)
+
+    def task(self, kind, seconds, size, written):
+        """按渲染函数汇总单个页面任务（子进程里的任务由主进程按返回值记录）"""
+        if not self.enabled:
+            return
+        entry = self.tasks.setdefault(kind, {'count': 0, 'written': 0, 'seconds': 0.0, 'bytes': 0})
+        entry['count'] += 1
+        entry['seconds'] += seconds
+        if written:
+            entry['written'] += 1
+            entry['bytes'] += size
+
+    def write(self, path, **extra):
+        wall, cpu = self._start
+        report = {
+            **extra,
+            'wall_seconds': round(time.perf_counter() - wall, 4),
+            'cpu_seconds': round(cpu_seconds() - cpu, 4),
+            'peak_rss_kb': peak_rss_kb(),
+            'input': dict(INPUT_STATS),
+            'output': dict(OUTPUT_STATS),
+            'stages': self.stages,
+            'tasks': {kind: {**entry, 'seconds': round(entry['seconds'], 4)} for kind, entry in sorted(self.tasks.items())}
+        }
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+
+REPORT = BuildReport()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+AI 日报多语言版本
+页面和 Feed 用到的界面文字按语言存放；EDITIONS 列出与主站一起构建的各语言版本，
+每个版本有自己的搜索结果文件，输出到站点目录下同名的子目录
+"""
+
+MESSAGES = {
+    'zh': {
+        'html_lang': 'zh-CN',
+        'site_title': 'AI 日报',
+        'subtitle': '每日 AI 新闻资讯、技术文章、产品融资和人物观点',
+        'description': '每日AI新闻、技术文章、产品融资、人物观点 - 您的AI资讯助手',
+        'footer': '🤖 由 <strong>AI 日报</strong> 自动生成',
+        'read_online': '在线阅读',
+        'summary_placeholder': '点击查看详细内容...',
+        'prev_page': '← 上一页',
+        'next_page': '下一页 →',
+        'page_of': '第 {page} / {pages} 页',
+        'archive_title': '归档 - AI 日报',
+        'archive_subtitle': '历史资讯存档',
+        'archive_heading': '📂 资讯归档',
+        'archive_hint': '点击日期查看当天所有资讯',
+        'archive_link': '📂 归档',
+        'long_date': '{y}年{m}月{d}日',
+        'short_date': '{m}月{d}日',
+        'day_count': '共 {n} 条资讯',
+        'count': '共 {n} 条',
+        'no_archives': '暂无存档',
+        'month_name': '{y}年{m}月',
+        'year_name': '{y}年',
+        'month_count': '{days} 天 · 共 {n} 条资讯',
+        'by_month': '📆 按月份浏览',
+        'rollup_title': '{name}归档 - AI 日报',
+        'category_title': '{name} - AI 日报',
+        'category_subtitle': 'AI {name}精选',
+        'back_home': '← 返回首页',
+        'empty_title': '暂无相关内容',
+        'empty_hint': '目前该分类下还没有资讯，请稍后再来~',
+        'daily_title': '{date} - AI 日报',
+        'daily_subtitle': '{date} 日AI资讯',
+        'main_title': 'AI 日报 - {date} | 每日AI资讯',
+        'subscribe': '📬 订阅获得最新AI资讯 | <strong>每日更新</strong> | 精选全球AI新闻',
+        'nav_logo': '🤖 <span>AI 日报</span>',
+        'nav_date': '{date} · {total}条资讯',
+        'no_content': '暂无内容',
+        'no_categories': '暂无分类',
+        'sidebar_categories': '📂 分类',
+        'sidebar_archives': '📅 归档',
+        'view_all_archives': '查看全部 →',
+        'view_all': '查看全部 {n} 条 →',
+        'load_more': '加载更多 {n} 条',
+        'main_footer': '汇聚 {total} 条精选AI资讯 · 每天早上8点更新',
+        'home_edition': '主站',
+        'related': '🔗 相关报道',
+        'feed_language': 'zh-cn',
+        'categories': {
+            'news': '📰 新闻',
+            'tech': '💻 技术',
+            'products': '🚀 产品',
+            'funding': '💰 融资',
+            'people': '👤 人物',
+            'opinions': '💡 观点',
+            'tutorial': '📚 教程',
+            'fun': '🎉 趣闻'
+        },
+        'feed_categories': {
+            'news': '📰 新闻',
+            'tech': '💻 技术',
+            'tutorial': '📚 教程',
+            'fun': '🎉 趣闻',
+            'products': '🚀 AI产品',
+            'funding': '💰 融资',
+            'people': '👤 人物',
+            'opinions': '💡 观点'
+        }
+    },
+    'en': {
+        'html_lang': 'en',
+        'site_title': 'AI Daily',
+        'subtitle': 'Daily AI news, tech articles, product launches, funding and people',
+        'description': 'Daily AI news, tech articles, products, funding and opinions - your AI briefing',
+        'footer': '🤖 Generated by <strong>AI Daily</strong>',
+        'read_online': 'Read online',
+        'summary_placeholder': 'Click to read more...',
+        'prev_page': '← Previous',
+        'next_page': 'Next →',
+        'page_of': 'Page {page} / {pages}',
+        'archive_title': 'Archive - AI Daily',
+        'archive_subtitle': 'Past issues',
+        'archive_heading': '📂 Archive',
+        'archive_hint': 'Pick a date to see every story from that day',
+        'archive_link': '📂 Archive',
+        'long_date': '{y}-{m}-{d}',
+        'short_date': '{m}/{d}',
+        'day_count': '{n} stories',
+        'count': '{n} stories',
+        'no_archives': 'No archives yet',
+        'month_name': '{y}-{m}',
+        'year_name': '{y}',
+        'month_count': '{days} days · {n} stories',
+        'by_month': '📆 Browse by month',
+        'rollup_title': 'Archive {name} - AI Daily',
+        'category_title': '{name} - AI Daily',
+        'category_subtitle': 'Selected AI {name}',
+        'back_home': '← Home',
+        'empty_title': 'Nothing here yet',
+        'empty_hint': 'There are no stories in this category yet, please check back later.',
+        'daily_title': '{date} - AI Daily',
+        'daily_subtitle': 'AI news for {date}',
+        'main_title': 'AI Daily - {date} | Daily AI news',
+        'subscribe': '📬 Subscribe for the latest AI news | <strong>Updated daily</strong> | Curated from around the world',
+        'nav_logo': '🤖 <span>AI Daily</span>',
+        'nav_date': '{date} · {total} stories',
+        'no_content': 'No content yet',
+        'no_categories': 'No categories',
+        'sidebar_categories': '📂 Categories',
+        'sidebar_archives': '📅 Archive',
+        'view_all_archives': 'View all →',
+        'view_all': 'View all {n} →',
+        'load_more': 'Load {n} more',
+        'main_footer': '{total} curated AI stories · updated every morning at 8:00',
+        'home_edition': 'Main',
+        'related': '🔗 Related',
+        'feed_language': 'en',
+        'categories': {
+            'news': '📰 News',
+            'tech': '💻 Tech',
+            'products': '🚀 Products',
+            'funding': '💰 Funding',
+            'people': '👤 People',
+            'opinions': '💡 Opinions',
+            'tutorial': '📚 Tutorials',
+            'fun': '🎉 Fun'
+        },
+        'feed_categories': {
+            'news': '📰 News',
+            'tech': '💻 Tech',
+            'tutorial': '📚 Tutorials',
+            'fun': '🎉 Fun',
+            'products': '🚀 AI Products',
+            'funding': '💰 Funding',
+            'people': '👤 People',
+            'opinions': '💡 Opinions'
+        }
+    }
+}
+
+# 版本代号 -> (搜索结果文件名, 界面语言, 切换链接上显示的名称)；主站本身不在这里
+EDITIONS = {
+    'cn': ('search_results_cn.json', 'zh', '中文'),
+    'en': ('search_results_en.json', 'en', 'English')
+}
+DEFAULT_LANG = 'zh'
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+AI 日报相关报道
+把每条历史资讯的标题和摘要切成词项（英文单词 + 中文字二元组），哈希到定长维度得到 TF-IDF 向量，
+用倒排（稀疏矩阵按列存放）为每条资讯找出之前几天里最相近的 k 条；
+结果按天分片持久化，新的一天只计算当天的资讯，之前的分片不变
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain, repeat
+from operator import mul
+
+from core import DATA_DIR, SITE_DIR, iter_snapshot_file, read_input
+from dedup import normalize_url
+from search import tokenize
+
+RELATED_DIR = f"{SITE_DIR}/.related"
+RELATED_VERSION = 1
+# 哈希维度：词项不必建词表，持久化的向量与词表无关
+DIM = 1 << 20
+# 每条资讯保留权重最高的若干维（向量按这些维重新归一化）
+MAX_FEATURES = 32
+# 找候选时只用权重最高的若干维，每一维只看最近的若干条
+QUERY_FEATURES = 16
+MAX_POSTINGS = 256
+# 候选按共有维数预筛，再对前若干个精确计算余弦相似度
+CANDIDATES = 48
+RELATED_K = 3
+MIN_SCORE = 0.2
+# 标题里的词项计两次
+TITLE_WEIGHT = 2
+
+def bucket(term):
+    return zlib.crc32(term.encode('utf-8')) & (DIM - 1)
+
+def term_counts(title, summary):
+    """标题和摘要的哈希词频"""
+    return Counter(bucket(term) for term in tokenize(title) * TITLE_WEIGHT + tokenize(summary))
+
+def vectorize(counts, df, n):
+    """次线性词频乘以 IDF（df、n 为之前各天的文档频率和文档数），保留前 MAX_FEATURES 维后 L2 归一化
+
+    返回按维升序的 (array('i') 维, array('f') 权重)；权重先取 5 位小数，从分片读回时得到相同的值。
+    """
+    weighted = [
+        (-(1 + math.log(c)) * (math.log((n + 1) / (len(df.get(b, ())) + 1)) + 1), b)
+        for b, c in counts.items()
+    ]
+    top = sorted(weighted)[:MAX_FEATURES]
+    norm = math.sqrt(sum(w * w for w, _ in top)) or 1.0
+    pairs = sorted((b, round(-w / norm, 5)) for w, b in top)
+    return array('i', [b for b, _ in pairs]), array('f', [w for _, w in pairs])
+
+
+def chain_digest(previous, date, sha256):
+    """把之前各天的快照哈希串起来：分片只有在之前各天都没变时才有效"""
+    return hashlib.blake2b(f"{previous}|{date}|{sha256}".encode(), digest_size=16).hexdigest()
+
+class RelatedIndex:
+    """常驻内存的相关报道索引
+
+    文档按日期顺序编号；postings 为 {维: array(文档编号)}，即按列存放的稀疏矩阵，编号递增。
+    每一天的资讯只和之前各天比较，某一天的快照变化时只需从这一天起重新计算，
+    之前各天的结果和磁盘上的分片保持不变；长驻进程（watch 模式）里再次 update 不必重新读取分片。
+    """
+    def __init__(self, shard_dir=RELATED_DIR, k=RELATED_K):
+        self.shard_dir = shard_dir
+        self.k = k
+        self.days = []
+        self.day_starts = []
+        self.starts = {}
+        self.shards = {}
+        self.titles = []
+        self.keys = []
+        self.buckets = []
+        self.weights = []
+        self.postings = {}
+        self.loaded = False
+
+    def _shard_path(self, date):
+        return os.path.join(self.shard_dir, f"{date}.json")
+
+    def _read_shard(self, date):
+        try:
+            with open(self._shard_path(date), 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if shard.get('version') != RELATED_VERSION or shard.get('k') != self.k:
+            return None
+        return shard
+
+    def _write_shard(self, date, shard):
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = self._shard_path(date)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(shard, ensure_ascii=False, separators=(',', ':')))
+        os.replace(path + '.tmp', path)
+
+    def _truncate(self, keep):
+        """只保留前 keep 天的文档"""
+        if keep >= len(self.days):
+            return
+        first = self.day_starts[keep]
+        for doc in range(first, len(self.buckets)):
+            for b in self.buckets[doc]:
+                postings = self.postings.get(b)
+                if postings is None:
+                    continue
+                del postings[bisect_left(postings, first):]
+                if not postings:
+                    del self.postings[b]
+        for date in self.days[keep:]:
+            del self.starts[date]
+            del self.shards[date]
+        del self.days[keep:], self.day_starts[keep:]
+        for column in (self.titles, self.keys, self.buckets, self.weights):
+            del column[first:]
+
+    def _append(self, date, shard):
+        """把一天的文档并入索引"""
+        start = len(self.buckets)
+        self.days.append(date)
+        self.day_starts.append(start)
+        self.starts[date] = start
+        self.shards[date] = shard
+        for doc, (title, _, key, buckets, weights, _) in enumerate(shard['docs'], start):
+            buckets = array('i', buckets)
+            self.titles.append(title)
+            self.keys.append(key)
+            self.buckets.append(buckets)
+            self.weights.append(array('f', weights))
+            for b in buckets:
+                postings = self.postings.get(b)
+                if postings is None:
+                    postings = self.postings[b] = array('i')
+                postings.append(doc)
+
+    def _locate(self, doc):
+        """文档编号 -> [日期, 当天序号]"""
+        i = bisect_left(self.day_starts, doc + 1) - 1
+        return [self.days[i], doc - self.day_starts[i]]
+
+    def neighbours(self, buckets, weights, key=''):
+        """之前各天里与该向量最相近的 k 个文档 [(编号, 相似度)]，相同链接的文档除外
+
+        先按共有维数从倒排里取候选（只用权重最高的 QUERY_FEATURES 维，每维最近的 MAX_POSTINGS 条），
+        再对前 CANDIDATES 个候选计算余弦相似度。
+        """
+        if not self.buckets:
+            return []
+        top = sorted(range(len(buckets)), key=lambda i: -weights[i])[:QUERY_FEATURES]
+        postings = self.postings
+        candidates = Counter(chain.from_iterable(
+            postings[buckets[i]][-MAX_POSTINGS:] for i in top if buckets[i] in postings))
+        get = dict(zip(buckets, weights)).get
+        scored = []
+        for doc, _ in candidates.most_common(CANDIDATES):
+            if key and self.keys[doc] == key:
+                continue
+            score = sum(map(mul, self.weights[doc], map(get, self.buckets[doc], repeat(0.0))))
+            if score >= MIN_SCORE:
+                scored.append((-score, doc))
+        scored.sort()
+        return [(doc, -score) for score, doc in scored[:self.k]]
+
+    def compute_day(self, path, meta):
+        """计算一天的分片：整批按之前各天的文档频率向量化、找近邻，算完才并入索引（同一天的资讯互不相关）"""
+        n = len(self.buckets)
+        docs = []
+        for item in iter_snapshot_file(path):
+            key = normalize_url(item.url)
+            buckets, weights = vectorize(term_counts(item.title, item.summary), self.postings, n)
+            related = [self._locate(doc) + [round(score, 4)] for doc, score in self.neighbours(buckets, weights, key)]
+            docs.append([item.title, item.url, key, buckets.tolist(), [round(w, 5) for w in weights], related])
+        return dict(meta, version=RELATED_VERSION, k=self.k, docs=docs)
+
+    def update(self, data_dir=DATA_DIR, full_rebuild=False):
+        """按快照目录更新索引，返回统计 {'docs', 'days', 'computed', 'computed_docs'}，computed 为重新计算的日期
+
+        快照的 mtime/大小未变时不读取内容；从第一个没有有效分片的日期起，之后各天都重新计算。
+        """
+        snapshots = {}
+        if os.path.exists(data_dir):
+            for entry in os.scandir(data_dir):
+                if entry.name.endswith('.jsonl'):
+                    st = entry.stat()
+                    snapshots[entry.name[:-len('.jsonl')]] = (entry.path, st.st_mtime_ns, st.st_size)
+        dates = sorted(snapshots)
+        if full_rebuild:
+            self._truncate(0)
+        loaded = self.loaded and not full_rebuild
+        self.loaded = True
+
+        # 有效的前缀：每天的分片存在，快照内容没变，且之前各天也都没变
+        previous = ''
+        valid = []
+        for date in dates:
+            if full_rebuild:
+                break
+            shard = self.shards.get(date) if loaded else self._read_shard(date)
+            if shard is None:
+                break
+            path, mtime, size = snapshots[date]
+            if (shard['mtime'], shard['size']) != (mtime, size):
+                if hashlib.sha256(read_input(path)).hexdigest() != shard['sha256']:
+                    break
+                shard = dict(shard, mtime=mtime, size=size)
+                self._write_shard(date, shard)
+            if shard['chain'] != chain_digest(previous, date, shard['sha256']):
+                break
+            previous = shard['chain']
+            valid.append((date, shard))
+
+        keep = 0
+        while keep < min(len(self.days), len(valid)) and self.days[keep] == valid[keep][0]:
+            self.shards[self.days[keep]] = valid[keep][1]
+            keep += 1
+        self._truncate(keep)
+        for date, shard in valid[keep:]:
+            self._append(date, shard)
+
+        computed, computed_docs = [], 0
+        for date in dates[len(valid):]:
+            path, mtime, size = snapshots[date]
+            digest = hashlib.sha256(read_input(path)).hexdigest()
+            previous = chain_digest(previous, date, digest)
+            shard = self.compute_day(path, {'mtime': mtime, 'size': size, 'sha256': digest, 'chain': previous})
+            self._write_shard(date, shard)
+            self._append(date, shard)
+            computed.append(date)
+            computed_docs += len(shard['docs'])
+
+        if os.path.exists(self.shard_dir):
+            for entry in os.scandir(self.shard_dir):
+                if entry.name.endswith('.json') and entry.name[:-len('.json')] not in snapshots:
+                    os.remove(entry.path)
+        return {'docs': len(self.buckets), 'days': len(dates), 'computed': computed, 'computed_docs': computed_docs}
+
+    def links(self, date):
+        """某一天各条资讯的相关报道 {链接: ((日期, 当天序号, 标题), ...)}，没有相关报道的资讯不在其中"""
+        shard = self.shards.get(date)
+        if shard is None:
+            return {}
+        found = {}
+        for _, url, _, _, _, related in shard['docs']:
+            if related:
+                found[url] = tuple((day, pos, self.titles[self.starts[day] + pos]) for day, pos, _ in related)
+        return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="更新相关报道索引，或列出某一天各条资讯的相关报道")
+    parser.add_argument('date', nargs='?', help="要列出的日期（YYYY-MM-DD），默认为最新的快照")
+    parser.add_argument('--full-rebuild', action='store_true', help="忽略已有分片，从头计算")
+    args = parser.parse_args(argv)
+
+    index = RelatedIndex()
+    start = time.perf_counter()
+    stats = index.update(full_rebuild=args.full_rebuild)
+    print(f"✅ 相关报道: {stats['docs']} 条资讯, {stats['days']} 天, 计算 {len(stats['computed'])} 天 "
+          f"({stats['computed_docs']} 条), 用时 {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    date = args.date or (index.days[-1] if index.days else None)
+    if date not in index.starts:
+        return
+    titles = index.titles[index.starts[date]:]
+    for (url, related), title in zip(((doc[1], doc[5]) for doc in index.shards[date]['docs']), titles):
+        print(f"{title}\n    {url}")
+        for day, pos, score in related:
+            print(f"    → [{day}] {index.titles[index.starts[day] + pos]} ({score})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+AI 日报搜索索引
+分片倒排索引的构建与查询：中文按字二元组切分，英文按单词切分
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+
+from core import SITE_DIR
+
+SEARCH_DIR = f"{SITE_DIR}/search"
+INDEX_VERSION = 1
+TERM_SHARDS = 64
+
+WORD_RE = re.compile(r'[a-z0-9]+(?:[.+#-][a-z0-9]+)*')
+CJK_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+
+def tokenize(text):
+    """切分文本：英文单词（小写）+ 中文字二元组，单字词保留单字"""
+    if not text:
+        return []
+    text = text.lower()
+    tokens = WORD_RE.findall(text)
+    for run in CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+def term_shard(term):
+    """词项所在的分片编号（crc32 取模，浏览器端可用同样算法定位）"""
+    return f"{zlib.crc32(term.encode('utf-8')) % TERM_SHARDS:02x}"
+
+class IndexBuilder:
+    """常驻内存的分片索引
+
+    记住每个月的文档列表和该月的倒排，再次 update 时只重新切分文档列表有变化的月份，
+    并报告受影响的文档分片和词项分片；长驻进程（watch 模式）里的小改动不必重建整个索引。
+    """
+    def __init__(self):
+        self.doc_shards = {}
+        self.month_terms = {}
+        self.term_shards = {}
+
+    def _index_month(self, docs):
+        terms = {}
+        for i, doc in enumerate(docs):
+            for term in set(tokenize(doc['title']) + tokenize(doc.get('summary', ''))):
+                terms.setdefault(term, []).append(i)
+        return terms
+
+    def update(self, items):
+        """用全部文档更新索引，返回 (索引, 变化的月份, 变化的词项分片)"""
+        doc_shards = {}
+        for item in sorted(items, key=lambda x: x['date']):
+            doc_shards.setdefault(item['date'][:7], []).append(item)
+
+        months = {m for m in doc_shards.keys() | self.doc_shards.keys() if doc_shards.get(m) != self.doc_shards.get(m)}
+        shards = set()
+        for month in sorted(months):
+            for term in self.month_terms.pop(month, {}):
+                shard = term_shard(term)
+                postings = self.term_shards[shard]
+                del postings[term][month]
+                if not postings[term]:
+                    del postings[term]
+                shards.add(shard)
+            if month in doc_shards:
+                self.month_terms[month] = self._index_month(doc_shards[month])
+                for term, ids in self.month_terms[month].items():
+                    shard = term_shard(term)
+                    self.term_shards.setdefault(shard, {}).setdefault(term, {})[month] = ids
+                    shards.add(shard)
+        for shard in shards:
+            if not self.term_shards.get(shard):
+                self.term_shards.pop(shard, None)
+        self.doc_shards = doc_shards
+
+        manifest = {
+            'version': INDEX_VERSION,
+            'docs': sum(len(docs) for docs in doc_shards.values()),
+            'term_shards': TERM_SHARDS,
+            'months': {month: len(docs) for month, docs in sorted(doc_shards.items(), reverse=True)}
+        }
+        return (manifest, doc_shards, self.term_shards), months, shards
+
+def build_index(items):
+    """构建分片索引，返回 (manifest, {月份: 文档列表}, {分片: {词项: {月份: [序号]}}})
+
+    文档按月分片，月内按日期升序排列，新的一天只会追加到当月末尾，
+    已有文档的编号保持不变。
+    """
+    return IndexBuilder().update(items)[0]
+
+def write_index(index, out_dir, open_func, months=None, shards=None):
+    """把索引写成 manifest.json、docs/YYYY-MM.json、terms/xx.json
+
+    open_func(path) 返回可 write 的上下文管理器，生成脚本传入原子写入器；
+    months/shards 不为 None 时只写这些文档分片和词项分片（其余分片内容未变）。
+    返回当前索引全部分片的路径列表，调用方可据此清理过期分片。
+    """
+    manifest, doc_shards, term_shards = index
+    paths = []
+    for sub in ('docs', 'terms'):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+    for month, docs in doc_shards.items():
+        path = os.path.join(out_dir, 'docs', f"{month}.json")
+        if months is None or month in months:
+            with open_func(path) as f:
+                f.write(json.dumps(docs, ensure_ascii=False, separators=(',', ':')))
+        paths.append(path)
+    for shard, postings in term_shards.items():
+        path = os.path.join(out_dir, 'terms', f"{shard}.json")
+        if shards is None or shard in shards:
+            with open_func(path) as f:
+                f.write(json.dumps(postings, ensure_ascii=False, separators=(',', ':'), sort_keys=True))
+        paths.append(path)
+    path = os.path.join(out_dir, 'manifest.json')
+    with open_func(path) as f:
+        f.write(json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+    paths.append(path)
+    return paths
+
+class SearchIndex:
+    """按需加载分片的查询器：只读取查询词所在的词项分片和命中的月份文档"""
+    def __init__(self, index_dir=SEARCH_DIR):
+        self.index_dir = index_dir
+        self._shards = {}
+        self._docs = {}
+        with open(os.path.join(index_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+    def _load(self, cache, sub, name):
+        if name not in cache:
+            path = os.path.join(self.index_dir, sub, f"{name}.json")
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cache[name] = json.load(f)
+            except FileNotFoundError:
+                cache[name] = {}
+        return cache[name]
+
+    def postings(self, term):
+        """词项命中的 (月份, 序号) 集合"""
+        by_month = self._load(self._shards, 'terms', term_shard(term)).get(term, {})
+        return {(month, i) for month, ids in by_month.items() for i in ids}
+
+    def search(self, query, limit=20):
+        """所有查询词都命中的文档，最新的在前"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        hits = None
+        for term in sorted(terms, key=len, reverse=True):
+            found = self.postings(term)
+            hits = found if hits is None else hits & found
+            if not hits:
+                return []
+        results = []
+        for month, i in sorted(hits, reverse=True)[:limit]:
+            results.append(self._load(self._docs, 'docs', month)[i])
+        return results
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("用法: python search.py <关键词>")
+        return
+    for doc in SearchIndex().search(' '.join(args)):
+        print(f"[{doc['date']}] {doc['title']}\n    {doc['url']}")
+
+if __name__ == "__main__":
+    main()
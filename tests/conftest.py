@@ -0,0 +1,129 @@
+"""
+测试共用的夹具：在临时站点目录里用固定的搜索结果和构建时间运行 generate.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from deploy import publishable  # noqa: E402
+
+BUILD_TIME = '2026-03-23T08:00'
+CATEGORY_IDS = ('news', 'tech', 'products', 'funding', 'people', 'opinions', 'tutorial', 'fun')
+WRITTEN_RE = re.compile(r'写入文件: (\d+) 个')
+
+def sample_results(per_category=3):
+    """每个分类若干条资讯，链接和标题互不相同"""
+    return {
+        cat_id: [
+            {
+                'title': f"{cat_id} story {i}",
+                'url': f"https://example{i}.com/{cat_id}/{i}",
+                'snippet': f"Summary of {cat_id} story {i}, long enough to show on the card."
+            }
+            for i in range(per_category)
+        ]
+        for cat_id in CATEGORY_IDS
+    }
+
+def write_results(site, results):
+    with open(os.path.join(site, 'search_results.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False)
+
+@pytest.fixture
+def site(tmp_path):
+    """带有搜索结果的空站点目录"""
+    path = tmp_path / 'site'
+    path.mkdir()
+    write_results(path, sample_results())
+    return path
+
+def run_build(site, *args, env=None):
+    """在 site 里运行一次构建，返回标准输出；未指定 SOURCE_DATE_EPOCH 时固定 --build-time"""
+    env = dict(os.environ, AI_DAILY_NEWS_DIR=str(site), PYTHONIOENCODING='utf-8', **(env or {}))
+    argv = [sys.executable, os.path.join(REPO_DIR, 'generate.py'), '--offline-favicons',
+            '--input', os.path.join(site, 'search_results.json'), *args]
+    if 'SOURCE_DATE_EPOCH' not in env and '--build-time' not in args:
+        argv += ['--build-time', BUILD_TIME]
+    proc = subprocess.run(argv, cwd=site, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return proc.stdout
+
+def files_written(stdout):
+    """主站写入的文件数（版本子进程的统计在前，主站的在最后）"""
+    return int(WRITTEN_RE.findall(stdout)[-1])
+
+def site_digests(site):
+    """站点里要发布的文件 {相对路径: sha256}，不含构建状态和缓存"""
+    found = {}
+    for root, dirs, files in os.walk(site):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__']
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, site).replace(os.sep, '/')
+            if rel != 'search_results.json' and publishable(rel):
+                with open(path, 'rb') as f:
+                    found[rel] = hashlib.sha256(f.read()).hexdigest()
+    return found
+
+class StubHandler(BaseHTTPRequestHandler):
+    """本地桩服务器：/slow 超过测试的超时才响应，其他路径按 server.routes 返回 (类型, 内容)，
+    带 ETag，请求的 If-None-Match 匹配时返回 304"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests[self.path] += 1
+        server.conditional[self.path] += 'If-None-Match' in self.headers
+        if self.path.startswith('/slow'):
+            time.sleep(1.0)
+        route = server.routes.get(self.path.split('?')[0])
+        if route is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        content_type, body = route
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    """在随机端口上运行的桩服务器，server.url 为根地址，requests/conditional 记录各路径的请求次数"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.requests = Counter()
+    server.conditional = Counter()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
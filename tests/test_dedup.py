@@ -0,0 +1,37 @@
+"""
+跨天去重：默认不记录标题分段，第一次打开 --near-dup 时用历史快照补齐
+"""
+
+import json
+import os
+
+import pytest
+
+from conftest import run_build, sample_results, write_results
+
+def dedupe_line(stdout):
+    return next(line for line in stdout.splitlines() if '去重' in line)
+
+def moved_results():
+    """与样例标题相同、链接不同的资讯"""
+    results = sample_results()
+    for items in results.values():
+        for item in items:
+            item['url'] = item['url'].replace('https://', 'https://mirror.')
+    return results
+
+def test_default_index_has_no_title_bands(site):
+    run_build(site)
+    with open(os.path.join(site, 'url_index.json'), 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['bands'] is False
+    assert state['entries'] and not any(key.startswith('t:') for key in state['entries'])
+
+@pytest.mark.parametrize('args', [(), ('--bloom',)], ids=['exact', 'bloom'])
+def test_near_dup_backfills_history(site, args):
+    run_build(site, *args)
+    # 第二天先不检查近似重复，同一天再打开 --near-dup：补齐的是之前各天的标题分段
+    run_build(site, *args, '--build-time', '2026-03-24T08:00')
+    write_results(site, moved_results())
+    stdout = run_build(site, *args, '--near-dup', '--build-time', '2026-03-24T08:00')
+    assert '标题近似 24 条' in dedupe_line(stdout)
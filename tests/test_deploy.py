@@ -0,0 +1,69 @@
+"""
+增量发布：用本地目录代替发布目标，未变化的构建不暂存任何文件，改动的页面出现在 deploy_delta.json 里
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from conftest import REPO_DIR, run_build, sample_results, write_results
+from deploy import scan
+
+def run_deploy(site, *args):
+    env = dict(os.environ, AI_DAILY_NEWS_DIR=str(site), PYTHONIOENCODING='utf-8')
+    proc = subprocess.run([sys.executable, os.path.join(REPO_DIR, 'deploy.py'), *args],
+                          cwd=site, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return proc.stdout
+
+def read_delta(stage):
+    with open(os.path.join(stage, 'deploy_delta.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def target_digests(target):
+    return {rel: row['sha256'] for rel, row in scan(str(target)).items()}
+
+def test_delta_against_local_target(site, tmp_path):
+    stage = tmp_path / 'stage'
+    target = tmp_path / 'target'
+
+    run_build(site, '--deploy-stage', str(stage))
+    first = read_delta(stage)
+    assert first['added'] and not first['modified'] and not first['deleted']
+    assert 'output_manifest.json' not in first['added']
+    run_deploy(site, '--apply', str(target))
+    assert target_digests(target) == {rel: row['sha256'] for rel, row in first['added'].items()}
+
+    # 没有变化：暂存目录里只有增量清单
+    run_build(site, '--deploy-stage', str(stage))
+    second = read_delta(stage)
+    assert not (second['added'] or second['modified'] or second['deleted'])
+    assert second['base'] == second['target']
+    assert os.listdir(stage) == ['deploy_delta.json']
+    run_deploy(site, '--commit')
+
+    results = sample_results()
+    results['news'][0]['title'] = 'news story 0, updated'
+    write_results(site, results)
+    run_build(site, '--deploy-stage', str(stage))
+    third = read_delta(stage)
+    assert 'news.html' in third['modified']
+    assert 'archive.html' not in third['modified']
+    assert os.path.exists(os.path.join(stage, 'news.html'))
+    run_deploy(site, '--apply', str(target))
+    assert target_digests(target)['news.html'] == third['modified']['news.html']['sha256']
+
+def test_bloom_index_is_not_published(site, tmp_path):
+    stage = tmp_path / 'stage'
+    target = tmp_path / 'target'
+    run_build(site, '--bloom', '--deploy-stage', str(stage))
+    assert os.path.exists(os.path.join(site, 'url_index.json.bloom'))
+    assert os.path.exists(os.path.join(site, 'url_index.json.pending.json'))
+
+    delta = read_delta(stage)
+    run_deploy(site, '--apply', str(target))
+    for name in ('url_index.json.bloom', 'url_index.json.pending.json'):
+        assert name not in delta['added']
+        assert not os.path.exists(os.path.join(stage, name))
+        assert not os.path.exists(os.path.join(target, name))
@@ -0,0 +1,48 @@
+"""
+站点图标：对本地桩服务器验证缓存命中、过期后的 ETag 条件请求（304）、离线模式和超时
+"""
+
+from favicons import load_favicons
+
+ICON = b'\x89PNG\r\n\x1a\n stub icon'
+
+def load(server, cache_dir, domains, path='/icon', **kwargs):
+    source = server.url + path + '?domain={domain}'
+    icons, fetcher = load_favicons(set(domains), cache_dir=str(cache_dir), source=source, retries=0, **kwargs)
+    return icons, fetcher
+
+def test_cache_hit_skips_request(stub_server, tmp_path):
+    stub_server.routes['/icon'] = ('image/png', ICON)
+
+    icons, fetcher = load(stub_server, tmp_path, ['a.com'])
+    assert icons['a.com']['type'] == 'image/png'
+    assert fetcher.origins == {'a.com': 'fetched'}
+
+    icons, fetcher = load(stub_server, tmp_path, ['a.com'])
+    assert 'a.com' in icons
+    assert fetcher.origins == {'a.com': 'cache'}
+    assert stub_server.requests['/icon?domain=a.com'] == 1
+
+def test_expired_entry_revalidates_with_304(stub_server, tmp_path):
+    stub_server.routes['/icon'] = ('image/png', ICON)
+    load(stub_server, tmp_path, ['a.com'])
+
+    icons, fetcher = load(stub_server, tmp_path, ['a.com'], ttl=0)
+    assert 'a.com' in icons
+    assert fetcher.stats['revalidated'] == 1
+    assert stub_server.conditional['/icon?domain=a.com'] == 1
+
+def test_offline_uses_cache_only(stub_server, tmp_path):
+    stub_server.routes['/icon'] = ('image/png', ICON)
+    load(stub_server, tmp_path, ['a.com'])
+
+    icons, fetcher = load(stub_server, tmp_path, ['a.com', 'b.com'], offline=True)
+    assert set(icons) == {'a.com'}
+    assert fetcher.origins == {'a.com': 'cache', 'b.com': 'missing'}
+    assert stub_server.requests['/icon?domain=b.com'] == 0
+
+def test_timeout_falls_back_to_placeholder(stub_server, tmp_path):
+    stub_server.routes['/slow'] = ('image/png', ICON)
+    icons, fetcher = load(stub_server, tmp_path, ['a.com'], path='/slow', timeout=0.2)
+    assert icons == {}
+    assert fetcher.origins == {'a.com': 'failed'}
@@ -0,0 +1,50 @@
+"""
+摘要抓取：对本地桩服务器验证磁盘缓存命中、ETag 条件请求（304）和超时
+"""
+
+import asyncio
+
+from fetch_summaries import ResponseCache, SummaryFetcher, extract_summary
+
+PAGE = b'<html><head><meta name="description" content="It&#8217;s a stub&nbsp;page"></head></html>'
+
+def fetch(cache_dir, url, **kwargs):
+    fetcher = SummaryFetcher(ResponseCache(str(cache_dir)), rate=0, retries=0, **kwargs)
+    try:
+        return asyncio.run(fetcher.fetch(url)), fetcher.stats
+    finally:
+        fetcher.close()
+
+def test_cache_hit_skips_request(stub_server, tmp_path):
+    stub_server.routes['/story'] = ('text/html; charset=utf-8', PAGE)
+    url = stub_server.url + '/story'
+
+    summary, stats = fetch(tmp_path, url)
+    assert summary == "It’s a stub page"
+    assert stats['fetched'] == 1
+
+    summary, stats = fetch(tmp_path, url)
+    assert summary == "It’s a stub page"
+    assert stats['cache_hits'] == 1
+    assert stub_server.requests['/story'] == 1
+
+def test_revalidate_gets_304(stub_server, tmp_path):
+    stub_server.routes['/story'] = ('text/html', PAGE)
+    url = stub_server.url + '/story'
+    fetch(tmp_path, url)
+
+    summary, stats = fetch(tmp_path, url, revalidate=True)
+    assert summary == "It’s a stub page"
+    assert stats['revalidated'] == 1 and stats['fetched'] == 0
+    assert stub_server.requests['/story'] == 2
+    assert stub_server.conditional['/story'] == 1
+
+def test_timeout_counts_as_failure(stub_server, tmp_path):
+    stub_server.routes['/slow'] = ('text/html', PAGE)
+    summary, stats = fetch(tmp_path, stub_server.url + '/slow', timeout=0.2)
+    assert summary == ''
+    assert stats['failed'] == 1
+
+def test_quote_inside_meta_content():
+    assert extract_summary('<meta name="description" content="OpenAI\'s new model is here">') == "OpenAI's new model is here"
+    assert extract_summary("<meta content='A \"quoted\" launch' property='og:description'>") == 'A "quoted" launch'
@@ -0,0 +1,29 @@
+"""
+增量构建：输入没有变化时再次构建不写入任何文件，存档页面不被改写
+"""
+
+import os
+
+from conftest import files_written, run_build
+
+def archive_mtimes(site):
+    found = {}
+    for directory in ('archives', 'data'):
+        for entry in os.scandir(os.path.join(site, directory)):
+            found[entry.path] = entry.stat().st_mtime_ns
+    return found
+
+def test_no_change_run_writes_nothing(site):
+    assert files_written(run_build(site)) > 0
+    before = archive_mtimes(site)
+    assert before
+
+    assert files_written(run_build(site)) == 0
+    assert archive_mtimes(site) == before
+
+def test_no_change_stream_run_writes_nothing(site):
+    run_build(site, '--stream')
+    before = archive_mtimes(site)
+
+    assert files_written(run_build(site, '--stream')) == 0
+    assert archive_mtimes(site) == before
@@ -0,0 +1,28 @@
+"""
+可重复构建：相同输入和构建时间在不同目录、串行、多进程和流式构建下得到逐字节相同的站点
+"""
+
+import pytest
+
+from conftest import run_build, sample_results, site_digests, write_results
+
+def build_site(tmp_path, name, *args, env=None):
+    path = tmp_path / name
+    path.mkdir()
+    write_results(path, sample_results())
+    run_build(path, *args, env=env)
+    return site_digests(path)
+
+def test_same_input_same_bytes(tmp_path):
+    first = build_site(tmp_path, 'first')
+    assert 'index.html' in first
+    assert build_site(tmp_path, 'second') == first
+
+@pytest.mark.parametrize('args', [('-j', '2'), ('--stream',)], ids=['jobs', 'stream'])
+def test_build_modes_match_serial(tmp_path, args):
+    assert build_site(tmp_path, 'mode', *args) == build_site(tmp_path, 'serial')
+
+def test_source_date_epoch(tmp_path):
+    env = {'SOURCE_DATE_EPOCH': '1774252800'}
+    first = build_site(tmp_path, 'first', env=env)
+    assert build_site(tmp_path, 'second', env=env) == first